@@ -3,8 +3,10 @@ from django.contrib import admin
 from theatre.models import (
     Actor,
     Genre,
+    ImageJob,
     Performance,
     Play,
+    SeatHold,
     Ticket,
     TheatreHall,
     Reservation
@@ -23,7 +25,9 @@ class OrderAdmin(admin.ModelAdmin):
 
 admin.site.register(Actor)
 admin.site.register(Genre)
+admin.site.register(ImageJob)
 admin.site.register(Performance)
 admin.site.register(Play)
+admin.site.register(SeatHold)
 admin.site.register(Ticket)
 admin.site.register(TheatreHall)
@@ -0,0 +1,185 @@
+"""
+Async versions of the hot read endpoints, for the ASGI profile.
+
+Under ASGI every sync view runs in Django's single thread for sync code,
+so a few slow requests hold up all others. With ``THEATRE_ASYNC_READS``
+the URLs of the performance list and detail and of the play list are
+served by ``async_route`` views instead: GETs run on the event loop and
+read through the async ORM and cache APIs, other methods go to the usual
+DRF view. Authentication, permissions, throttling, conditional requests,
+the response cache, pagination and the row converters are the same
+code as on the sync path, so responses are identical.
+"""
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from theatre.cache import CachedListModelMixin, CachedRetrieveModelMixin
+from theatre.fast_serializers import RowConverter
+from user.authentication import StatelessJWTAuthentication
+
+
+async def authenticate_jwt(authenticator, request):
+    """``JWTAuthentication.authenticate`` loading the user asynchronously."""
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+
+    validated_token = authenticator.get_validated_token(raw_token)
+    if isinstance(
+        authenticator, StatelessJWTAuthentication
+    ) and authenticator.is_stateless(validated_token):
+        # Built from the claims, without touching the database.
+        return authenticator.get_user(validated_token), validated_token
+
+    try:
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(
+            "Token contained no recognizable user identification"
+        )
+
+    try:
+        user = await authenticator.user_model.objects.aget(
+            **{jwt_settings.USER_ID_FIELD: user_id}
+        )
+    except authenticator.user_model.DoesNotExist:
+        raise exceptions.AuthenticationFailed(
+            "User not found", code="user_not_found"
+        )
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed(
+            "User is inactive", code="user_inactive"
+        )
+
+    return user, validated_token
+
+
+async def authenticate(request):
+    """Authenticate a DRF request like ``Request._authenticate``."""
+    for authenticator in request.authenticators:
+        try:
+            if isinstance(authenticator, JWTAuthentication):
+                user_auth = await authenticate_jwt(authenticator, request)
+            else:
+                user_auth = await sync_to_async(authenticator.authenticate)(
+                    request
+                )
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+
+        if user_auth is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth
+            return
+
+    request._not_authenticated()
+
+
+async def initial(view, request):
+    """``APIView.initial`` with authentication and throttling awaited."""
+    view.format_kwarg = view.get_format_suffix(**view.kwargs)
+    request.accepted_renderer, request.accepted_media_type = (
+        view.perform_content_negotiation(request)
+    )
+    request.version, request.versioning_scheme = view.determine_version(
+        request, *view.args, **view.kwargs
+    )
+    await authenticate(request)
+    view.check_permissions(request)
+    await sync_to_async(view.check_throttles)(request)
+
+
+async def list_rows(view, request, *args, **kwargs):
+    """``RowListModelMixin.list`` on the async ORM."""
+    # Plays searched without PostgreSQL rank through an in-process index
+    # that is loaded from the database.
+    queryset = await sync_to_async(view.get_queryset)()
+    converter = RowConverter.for_serializer(view.get_serializer_class())
+    queryset = converter.values(view.filter_queryset(queryset))
+
+    page = await view.paginator.apaginate_queryset(queryset, request, view)
+    if converter.relations:
+        data = await sync_to_async(converter.convert)(page, request)
+    else:
+        data = converter.convert(page, request)
+
+    return view.get_paginated_response(data)
+
+
+async def retrieve_object(view, request, *args, **kwargs):
+    """``RetrieveModelMixin.retrieve`` on the async ORM."""
+    queryset = view.filter_queryset(view.get_queryset())
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    instance = await queryset.filter(
+        **{view.lookup_field: view.kwargs[lookup_url_kwarg]}
+    ).afirst()
+    if instance is None:
+        raise exceptions.NotFound()
+
+    view.check_object_permissions(request, instance)
+    return Response(view.get_serializer(instance).data)
+
+
+ASYNC_ACTIONS = {
+    "list": (list_rows, CachedListModelMixin),
+    "retrieve": (retrieve_object, CachedRetrieveModelMixin),
+}
+
+
+def async_route(viewset_class, actions: dict, **initkwargs):
+    """
+    Return a view for one router route of ``viewset_class`` (``actions``
+    and ``initkwargs`` as given to ``as_view``) answering GETs
+    asynchronously.
+    """
+    sync_view = viewset_class.as_view(actions, **initkwargs)
+    action = actions["get"]
+    handler, cached_mixin = ASYNC_ACTIONS[action]
+
+    async def view(request, *args, **kwargs):
+        if request.method != "GET":
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        viewset = viewset_class(**initkwargs)
+        viewset.action_map = actions
+        for method, method_action in actions.items():
+            setattr(viewset, method, getattr(viewset, method_action))
+        viewset.args = args
+        viewset.kwargs = kwargs
+        request = viewset.initialize_request(request, *args, **kwargs)
+        viewset.request = request
+        viewset.headers = viewset.default_response_headers
+
+        try:
+            await initial(viewset, request)
+            response = await viewset.aversioned_response(
+                partial(handler, viewset),
+                request,
+                *args,
+                cache_data=isinstance(viewset, cached_mixin),
+                **kwargs
+            )
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        viewset.response = viewset.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return viewset.response.render()
+
+    view.cls = viewset_class
+    view.actions = actions
+    view.initkwargs = initkwargs
+    view.csrf_exempt = True
+    return view
@@ -0,0 +1,224 @@
+"""
+Synthetic data and measurements for the ``benchmark_api`` command.
+
+Every endpoint is requested with an empty response cache, so the numbers
+describe the work an uncached request does: query count, p50/p95
+latency and the size of the serialized body.
+"""
+import statistics
+import time
+from datetime import timedelta
+from itertools import cycle, islice
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from theatre.cache import get_cache
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.urls import router
+
+SCALES = {
+    "small": {"performances": 10, "tickets_per_reservation": 10},
+    "medium": {"performances": 1_000, "tickets_per_reservation": 100},
+    "large": {"performances": 100_000, "tickets_per_reservation": 500},
+}
+HALL_SIZES = [(10, 10), (20, 30), (40, 50)]
+BATCH_SIZE = 5_000
+BENCHMARK_EMAIL = "benchmark@theatre.local"
+BENCHMARK_PASSWORD = "benchmark-pass"
+
+
+def seed(scale: str):
+    """Fill the (empty) database with data of the given scale."""
+    sizes = SCALES[scale]
+    performance_count = sizes["performances"]
+    user = get_user_model().objects.create_user(
+        BENCHMARK_EMAIL, BENCHMARK_PASSWORD, is_staff=True
+    )
+
+    halls = TheatreHall.objects.bulk_create(
+        TheatreHall(name=f"Hall {rows}x{seats}", rows=rows, seats_in_row=seats)
+        for rows, seats in HALL_SIZES
+    )
+    genres = Genre.objects.bulk_create(
+        Genre(name=f"Genre {index}") for index in range(20)
+    )
+    actors = Actor.objects.bulk_create(
+        Actor(first_name="Actor", last_name=str(index))
+        for index in range(200)
+    )
+    plays = Play.objects.bulk_create(
+        (
+            Play(title=f"Play {index}", description=f"Description {index}")
+            for index in range(max(10, performance_count // 10))
+        ),
+        batch_size=BATCH_SIZE
+    )
+    Play.genres.through.objects.bulk_create(
+        (
+            Play.genres.through(play=play, genre=genre)
+            for index, play in enumerate(plays)
+            for genre in islice(cycle(genres), index % 20, index % 20 + 3)
+        ),
+        batch_size=BATCH_SIZE
+    )
+    Play.actors.through.objects.bulk_create(
+        (
+            Play.actors.through(play=play, actor=actor)
+            for index, play in enumerate(plays)
+            for actor in islice(cycle(actors), index % 200, index % 200 + 5)
+        ),
+        batch_size=BATCH_SIZE
+    )
+    Play.refresh_summaries(play.id for play in plays)
+
+    start = timezone.now()
+    Performance.objects.bulk_create(
+        (
+            Performance(
+                play=plays[index % len(plays)],
+                theatre_hall=halls[index % len(halls)],
+                show_time=start + timedelta(hours=index)
+            )
+            for index in range(performance_count)
+        ),
+        batch_size=BATCH_SIZE
+    )
+
+    largest_hall = halls[-1]
+    booked = list(
+        Performance.objects.filter(theatre_hall=largest_hall)
+        .order_by("id")
+        .values_list("id", flat=True)[:10]
+    )
+    tickets_per_reservation = sizes["tickets_per_reservation"]
+    for performance_id in booked:
+        reservation = Reservation.objects.create(user=user)
+        Ticket.objects.bulk_create(
+            Ticket(
+                performance_id=performance_id,
+                reservation=reservation,
+                row=index // largest_hall.seats_in_row + 1,
+                seat=index % largest_hall.seats_in_row + 1
+            )
+            for index in range(tickets_per_reservation)
+        )
+    Performance.rebuild_seat_maps(booked)
+
+    return user
+
+
+def endpoints():
+    """Yield ``(name, method, url, data)`` for every routed endpoint."""
+    for _, viewset, basename in router.registry:
+        model = viewset.queryset.model
+        name = f"theatre-api:{basename}"
+        yield f"{name}-list", "get", reverse(f"{name}-list"), None
+
+        if hasattr(viewset, "retrieve"):
+            obj = model.objects.order_by("id").first()
+            if obj is not None:
+                yield (
+                    f"{name}-detail",
+                    "get",
+                    reverse(f"{name}-detail", args=[obj.pk]),
+                    None
+                )
+
+    yield "user:manage", "get", reverse("user:manage"), None
+    yield "user:token_obtain_pair", "post", reverse(
+        "user:token_obtain_pair"
+    ), {"email": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD}
+
+
+def _percentile(samples, percent: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[
+        percent - 1
+    ]
+
+
+def measure(client, method: str, url: str, data, repeat: int) -> dict:
+    timings = []
+    query_count = None
+    response = None
+
+    for _ in range(repeat):
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            if method == "post":
+                response = client.post(url, data, format="json")
+            else:
+                response = client.get(url)
+            content = response.getvalue()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        if query_count is None:
+            query_count = len(queries)
+
+    return {
+        "method": method.upper(),
+        "url": url,
+        "status": response.status_code,
+        "queries": query_count,
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "bytes": len(content),
+    }
+
+
+def run(client, repeat: int) -> dict:
+    return {
+        name: measure(client, method, url, data, repeat)
+        for name, method, url, data in endpoints()
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    query_threshold: int = 0,
+    latency_threshold: float = 0.25,
+    latency_floor_ms: float = 1.0
+) -> list:
+    """
+    Return human readable regressions of ``current`` against
+    ``baseline``: more queries than ``query_threshold`` allows, or a p95
+    latency worse by more than ``latency_threshold`` (relative) and
+    ``latency_floor_ms`` (absolute, to ignore jitter on fast endpoints).
+    """
+    regressions = []
+
+    for name, result in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+
+        if result["queries"] > before["queries"] + query_threshold:
+            regressions.append(
+                f"{name}: {before['queries']} -> {result['queries']} queries"
+            )
+
+        slower_by = result["p95_ms"] - before["p95_ms"]
+        if (
+            slower_by > latency_floor_ms
+            and slower_by > before["p95_ms"] * latency_threshold
+        ):
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms"
+            )
+
+    return regressions
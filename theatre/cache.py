@@ -0,0 +1,309 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import mixins, status
+from rest_framework.response import Response
+
+VERSION_KEY = "theatre:version:{}"
+RESPONSE_KEY = "theatre:response:{}"
+STATS_KEY = "theatre:response-cache:{}"
+OBJECT_VERSION_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def get_cache():
+    return caches[settings.THEATRE_RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(model, pk=None) -> str:
+    label = model._meta.label_lower
+    return VERSION_KEY.format(label if pk is None else f"{label}:{pk}")
+
+
+def get_versions(keys) -> dict:
+    """
+    Return the version stamps stored under ``keys``, creating missing
+    ones. Stamps are nanosecond timestamps of the last write.
+    """
+    cache = get_cache()
+    versions = cache.get_many(keys)
+
+    if len(versions) < len(keys):
+        now = time.time_ns()
+        for key in keys:
+            if key not in versions:
+                cache.add(key, now, timeout=OBJECT_VERSION_TIMEOUT)
+        versions = cache.get_many(keys)
+
+    return versions
+
+
+async def aget_versions(keys) -> dict:
+    """``get_versions`` through the async cache API."""
+    cache = get_cache()
+    versions = await cache.aget_many(keys)
+
+    if len(versions) < len(keys):
+        now = time.time_ns()
+        for key in keys:
+            if key not in versions:
+                await cache.aadd(key, now, timeout=OBJECT_VERSION_TIMEOUT)
+        versions = await cache.aget_many(keys)
+
+    return versions
+
+
+def get_version(model, pk=None) -> int:
+    """Return the version stamp of ``model`` (or of its object ``pk``)."""
+    key = _version_key(model, pk)
+    return get_versions([key])[key]
+
+
+def _stamp(model_key, object_key):
+    cache = get_cache()
+    now = time.time_ns()
+    cache.set(model_key, now, timeout=None)
+    if object_key is not None:
+        cache.set(object_key, now, timeout=OBJECT_VERSION_TIMEOUT)
+
+
+def touch(model, pk=None):
+    """
+    Give ``model`` (and the object ``pk`` of it, if given) a new version
+    stamp, now and again once the current transaction commits, so data
+    read before the commit is not served as current afterwards.
+    """
+    model_key = _version_key(model)
+    object_key = None if pk is None else _version_key(model, pk)
+
+    _stamp(model_key, object_key)
+    transaction.on_commit(lambda: _stamp(model_key, object_key))
+
+
+def _count(event: str):
+    cache = get_cache()
+    key = STATS_KEY.format(event)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+async def _acount(event: str):
+    cache = get_cache()
+    key = STATS_KEY.format(event)
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        pass
+
+
+def get_stats() -> dict:
+    cache = get_cache()
+    hits = cache.get(STATS_KEY.format("hits"), 0)
+    misses = cache.get(STATS_KEY.format("misses"), 0)
+    requests = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / requests if requests else None,
+    }
+
+
+def _digest(parts) -> str:
+    return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+
+class VersionedResponseMixin:
+    """
+    Derives ETag and Last-Modified from the version stamps of
+    ``cache_models``, answers matching conditional GETs with 304 before
+    the queryset runs and can cache response data per URL.
+
+    Detail responses use the stamp of the requested object instead of
+    the model-wide stamp of the viewset's own model.
+    """
+
+    cache_models = ()
+
+    def _version_keys(self):
+        own_model = self.queryset.model
+        lookup_value = self.kwargs.get(
+            self.lookup_url_kwarg or self.lookup_field
+        )
+        keys = []
+        for model in self.cache_models:
+            if model is own_model and lookup_value is not None:
+                keys.append(_version_key(model, lookup_value))
+            else:
+                keys.append(_version_key(model))
+
+        return keys
+
+    def _validators(self, request, versions):
+        """
+        Return the digest of the response data, the ``ETag`` and
+        ``Last-Modified`` headers and a 304/412 response if the request
+        conditions match them.
+        """
+        data_digest = _digest(
+            [request.build_absolute_uri()]
+            + [f"{key}={versions[key]}" for key in sorted(versions)]
+        )
+        etag = '"{}"'.format(
+            _digest(
+                [
+                    data_digest,
+                    request.accepted_renderer.format,
+                    str(request.user.pk),
+                ]
+            )
+        )
+        last_modified = max(versions.values(), default=0) // 10 ** 9
+        headers = {"ETag": etag, "Last-Modified": http_date(last_modified)}
+
+        conditional_response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if conditional_response is not None:
+            conditional_response = Response(
+                status=conditional_response.status_code,
+                headers=headers
+            )
+
+        return data_digest, headers, conditional_response
+
+    def versioned_response(
+        self, handler, request, *args, cache_data=False, **kwargs
+    ):
+        versions = get_versions(self._version_keys())
+        data_digest, headers, conditional_response = self._validators(
+            request, versions
+        )
+        if conditional_response is not None:
+            return conditional_response
+
+        if cache_data:
+            response = self._cached_handler(
+                data_digest, handler, request, *args, **kwargs
+            )
+        else:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+
+        return response
+
+    async def aversioned_response(
+        self, handler, request, *args, cache_data=False, **kwargs
+    ):
+        """``versioned_response`` for an async ``handler``."""
+        versions = await aget_versions(self._version_keys())
+        data_digest, headers, conditional_response = self._validators(
+            request, versions
+        )
+        if conditional_response is not None:
+            return conditional_response
+
+        if cache_data:
+            response = await self._acached_handler(
+                data_digest, handler, request, *args, **kwargs
+            )
+        else:
+            response = await handler(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+
+        return response
+
+    def _cached_handler(self, digest, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = RESPONSE_KEY.format(digest)
+
+        data = cache.get(key)
+        if data is not None:
+            _count("hits")
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        _count("misses")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                response.data,
+                timeout=settings.THEATRE_RESPONSE_CACHE_TIMEOUT
+            )
+        response["X-Cache"] = "MISS"
+
+        return response
+
+    async def _acached_handler(
+        self, digest, handler, request, *args, **kwargs
+    ):
+        cache = get_cache()
+        key = RESPONSE_KEY.format(digest)
+
+        data = await cache.aget(key)
+        if data is not None:
+            await _acount("hits")
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        await _acount("misses")
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(
+                key,
+                response.data,
+                timeout=settings.THEATRE_RESPONSE_CACHE_TIMEOUT
+            )
+        response["X-Cache"] = "MISS"
+
+        return response
+
+
+class ConditionalListModelMixin(
+    VersionedResponseMixin,
+    mixins.ListModelMixin
+):
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalRetrieveModelMixin(
+    VersionedResponseMixin,
+    mixins.RetrieveModelMixin
+):
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedListModelMixin(VersionedResponseMixin, mixins.ListModelMixin):
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().list, request, *args, cache_data=True, **kwargs
+        )
+
+
+class CachedRetrieveModelMixin(
+    VersionedResponseMixin,
+    mixins.RetrieveModelMixin
+):
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().retrieve, request, *args, cache_data=True, **kwargs
+        )
@@ -0,0 +1,172 @@
+"""
+Checks of the production profile for settings that cost performance,
+or that break it outright (errors).
+
+They run with ``manage.py check`` (and ``migrate``, ``runserver``), and
+``theatre_api.wsgi`` and ``theatre_api.asgi`` log them at startup, since
+application servers do not run system checks, and refuse to start on
+errors. Outside the production profile there is nothing to check.
+"""
+import logging
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+PERFORMANCE = "performance"
+CACHED_LOADER = "django.template.loaders.cached.Loader"
+LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+# Caches whose incr() is atomic across processes.
+COUNTER_CACHES = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+    "django_redis.cache.RedisCache",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _backend(alias: str) -> str:
+    cache = caches[alias]
+    return f"{type(cache).__module__}.{type(cache).__name__}"
+
+
+def _template_warnings():
+    for template in settings.TEMPLATES:
+        loaders = template.get("OPTIONS", {}).get("loaders")
+        if loaders and not any(
+            loader[0] == CACHED_LOADER for loader in loaders
+            if isinstance(loader, (list, tuple))
+        ):
+            yield checks.Warning(
+                "Templates are read and compiled on every render.",
+                hint=f"Wrap the template loaders in {CACHED_LOADER}.",
+                id="theatre.W005",
+            )
+
+
+def _database_warnings():
+    for alias in connections:
+        database = connections[alias].settings_dict
+        max_age = database["CONN_MAX_AGE"]
+        if max_age == 0 and not settings.THEATRE_ASYNC_READS:
+            yield checks.Warning(
+                f"Database '{alias}' opens a new connection for every "
+                "request.",
+                hint="Set DJANGO_CONN_MAX_AGE, or use a connection pooler.",
+                id="theatre.W003",
+            )
+        elif max_age != 0 and not database["CONN_HEALTH_CHECKS"]:
+            yield checks.Warning(
+                f"Persistent connections of database '{alias}' are not "
+                "checked before reuse, so a request may fail on a dropped "
+                "one.",
+                hint="Set CONN_HEALTH_CHECKS.",
+                id="theatre.W004",
+            )
+
+
+@checks.register(PERFORMANCE)
+def check_performance_settings(app_configs, **kwargs):
+    if settings.DJANGO_PROFILE != "production":
+        return []
+
+    warnings = []
+    if not settings.ALLOWED_HOSTS:
+        warnings.append(
+            checks.Error(
+                "ALLOWED_HOSTS is empty, so every request is refused.",
+                hint="Set DJANGO_ALLOWED_HOSTS, comma separated.",
+                id="theatre.E002",
+            )
+        )
+    if settings.DEBUG:
+        warnings.append(
+            checks.Warning(
+                "DEBUG is on: every SQL query is kept in memory.",
+                id="theatre.W001",
+            )
+        )
+    if "debug_toolbar" in settings.INSTALLED_APPS:
+        warnings.append(
+            checks.Warning(
+                "The debug toolbar is installed.",
+                hint="It instruments every request; remove it.",
+                id="theatre.W002",
+            )
+        )
+    warnings.extend(_database_warnings())
+    warnings.extend(_template_warnings())
+
+    db_logger = getattr(settings, "LOGGING", {}).get("loggers", {}).get(
+        "django.db.backends", {}
+    )
+    if db_logger.get("level") == "DEBUG":
+        warnings.append(
+            checks.Warning(
+                "SQL queries are logged.",
+                hint="Raise the level of the django.db.backends logger.",
+                id="theatre.W006",
+            )
+        )
+
+    if _backend(settings.THEATRE_RESPONSE_CACHE_ALIAS) in LOCAL_CACHES:
+        warnings.append(
+            checks.Error(
+                "Version stamps and cached responses are kept per process, "
+                "so a worker serves stale data after another one changes "
+                "it.",
+                hint="Point THEATRE_RESPONSE_CACHE_ALIAS at a cache shared "
+                "by all workers (redis, memcached, or FileBasedCache on a "
+                "single host).",
+                id="theatre.E001",
+            )
+        )
+    if not settings.THEATRE_THROTTLE_DB and (
+        _backend(settings.THEATRE_THROTTLE_CACHE_ALIAS) not in COUNTER_CACHES
+    ):
+        warnings.append(
+            checks.Warning(
+                "Throttle counters are not shared atomically between "
+                "workers, so together they allow more than the rate.",
+                hint="Keep them in a redis or memcached cache.",
+                id="theatre.W007",
+            )
+        )
+    if settings.THEATRE_INSTRUMENTATION_SAMPLE_RATE > 0.05:
+        warnings.append(
+            checks.Warning(
+                "More than 5% of the requests are instrumented.",
+                hint="Lower THEATRE_INSTRUMENTATION_SAMPLE_RATE.",
+                id="theatre.W008",
+            )
+        )
+    if settings.MEDIA_SERVE_MODE == "django":
+        warnings.append(
+            checks.Warning(
+                "Media files are sent by Django.",
+                hint="Set MEDIA_SERVE_MODE to x-accel-redirect or "
+                "x-sendfile, or serve theatre_api.media_asgi.",
+                id="theatre.W009",
+            )
+        )
+
+    return warnings
+
+
+def warn_at_startup() -> None:
+    """
+    Log the performance warnings of the current settings, and raise
+    ``ImproperlyConfigured`` on errors.
+    """
+    messages = checks.run_checks(tags=[PERFORMANCE])
+    for message in messages:
+        logger.warning("%s", message)
+    errors = [message for message in messages if message.is_serious()]
+    if errors:
+        raise ImproperlyConfigured(
+            "; ".join(str(error) for error in errors)
+        )
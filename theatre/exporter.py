@@ -0,0 +1,146 @@
+"""
+Streaming export of tickets for box-office reconciliation.
+
+``export_tickets`` reads every ticket of a show date range through
+``values_list().iterator()`` (a server-side cursor on PostgreSQL) and
+yields the encoded file in byte chunks, so memory does not depend on the
+number of rows. Formats:
+
+* ``csv``: a header line, then one line per ticket
+* ``jsonl``: one JSON object per ticket
+* ``columns``: one JSON object per chunk of rows, mapping every column
+  to the list of its values (a columnar layout that loads straight into
+  a data frame, without a Parquet dependency)
+
+``gzip_chunks`` compresses any of them on the fly.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from theatre.models import Ticket
+
+CHUNK_SIZE = 2000
+FORMATS = ("csv", "jsonl", "columns")
+COLUMNS = {
+    "id": "id",
+    "performance": "performance_id",
+    "show_time": "performance__show_time",
+    "play": "performance__play__title",
+    "theatre_hall": "performance__theatre_hall__name",
+    "row": "row",
+    "seat": "seat",
+    "reservation": "reservation_id",
+    "reserved_at": "reservation__created_at",
+}
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "columns": "application/x-ndjson",
+}
+
+
+def ticket_rows(date_from=None, date_to=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield ticket rows as tuples in ``COLUMNS`` order, for performances
+    shown from ``date_from`` to ``date_to`` (both included).
+    """
+    queryset = Ticket.objects.order_by("id")
+    current_timezone = timezone.get_current_timezone()
+    if date_from is not None:
+        queryset = queryset.filter(
+            performance__show_time__gte=timezone.make_aware(
+                datetime.combine(date_from, time.min), current_timezone
+            )
+        )
+    if date_to is not None:
+        queryset = queryset.filter(
+            performance__show_time__lt=timezone.make_aware(
+                datetime.combine(date_to + timedelta(days=1), time.min),
+                current_timezone
+            )
+        )
+
+    return queryset.values_list(*COLUMNS.values()).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def _batches(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for batch in batches:
+        writer.writerows(tuple(map(_iso, row)) for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _jsonl_chunks(batches):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    names = tuple(COLUMNS)
+    for batch in batches:
+        yield "".join(
+            encoder.encode(dict(zip(names, row))) + "\n" for row in batch
+        ).encode()
+
+
+def _column_chunks(batches):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    names = tuple(COLUMNS)
+    for batch in batches:
+        yield (
+            encoder.encode(dict(zip(names, map(list, zip(*batch))))) + "\n"
+        ).encode()
+
+
+def export_tickets(
+    file_format: str,
+    date_from=None,
+    date_to=None,
+    chunk_size: int = CHUNK_SIZE
+):
+    """Yield the tickets of the date range as ``file_format`` bytes."""
+    writers = {
+        "csv": _csv_chunks,
+        "jsonl": _jsonl_chunks,
+        "columns": _column_chunks,
+    }
+    if file_format not in writers:
+        raise ValueError(f"Unknown format '{file_format}', use {FORMATS}")
+
+    rows = ticket_rows(date_from, date_to, chunk_size=chunk_size)
+    return writers[file_format](_batches(rows, chunk_size))
+
+
+def gzip_chunks(chunks, level: int = 6):
+    """Compress byte ``chunks`` to a gzip stream, chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
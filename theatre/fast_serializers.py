@@ -0,0 +1,300 @@
+"""
+Fast path for read-only list serializers.
+
+``RowConverter.for_serializer`` reads a serializer class once and
+compiles it into a flat field table: the ``values()`` columns it needs
+and, per output key, the row key and the (rarely needed) transform. Each
+row then becomes the same dict the serializer would produce, without
+model instances or per-field ``to_representation`` dispatch.
+
+Supported are model columns and ``source`` paths across to-one
+relations, fields whose ``row_transform()`` returns the
+``transform(value, request)`` for their column, values a serializer
+computes from model properties when it declares an ORM equivalent in
+``row_expressions``, nested serializers over to-one relations and
+``many=True`` nested serializers over reverse foreign keys (one extra
+query per page). Anything else is rejected when
+the converter is built.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F, FileField
+from rest_framework import mixins, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation returns database values unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+# Fields whose to_representation depends on nothing but the value.
+CONTEXT_FREE_FIELDS = (
+    serializers.DateField,
+    serializers.DateTimeField,
+    serializers.DecimalField,
+    serializers.DurationField,
+    serializers.TimeField,
+    serializers.UUIDField,
+)
+
+_converters = {}
+
+
+def _prefixed(expression, prefix: str):
+    """Return ``expression`` with its ``F()`` references below ``prefix``."""
+    if isinstance(expression, F):
+        return F(prefix + expression.name)
+
+    expression = expression.copy()
+    expression.set_source_expressions(
+        [
+            _prefixed(source, prefix)
+            for source in expression.get_source_expressions()
+        ]
+    )
+    return expression
+
+
+def _model_field(model, lookup: str):
+    field = None
+    for name in lookup.split("__"):
+        if model is None:
+            raise FieldDoesNotExist(lookup)
+        field = model._meta.get_field(name)
+        model = field.related_model
+
+    return field
+
+
+def _is_passthrough(field) -> bool:
+    if isinstance(field, serializers.ListField):
+        return _is_passthrough(field.child)
+    return isinstance(field, PASSTHROUGH_FIELDS)
+
+
+def _context_free(field):
+    def transform(value, request):
+        return None if value is None else field.to_representation(value)
+
+    return transform
+
+
+def _file_url(field, model_field):
+    storage = model_field.storage
+    use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+
+    def transform(name, request):
+        if not name:
+            return None
+        if not use_url:
+            return name
+
+        url = storage.url(name)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    return transform
+
+
+class RowConverter:
+    """
+    Turns ``values()`` rows into the output of one serializer class.
+
+    ``fields`` holds ``(name, key, transform)`` in output order: the
+    value is ``row[key]`` without a transform, ``transform(row, request)``
+    for nested serializers (``key`` is ``None``) and otherwise
+    ``transform(row[key], request)``.
+    """
+
+    __slots__ = (
+        "serializer_class",
+        "model",
+        "prefix",
+        "pk_key",
+        "columns",
+        "expressions",
+        "fields",
+        "relations",
+    )
+
+    def __init__(self, serializer, prefix=""):
+        self.serializer_class = type(serializer)
+        self.model = serializer.Meta.model
+        self.prefix = prefix
+        self.pk_key = prefix + self.model._meta.pk.attname
+        self.columns = {self.pk_key}
+        self.expressions = {}
+        self.fields = []
+        self.relations = []
+
+        row_expressions = getattr(serializer, "row_expressions", {})
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in row_expressions:
+                key = f"{prefix}{name}".replace("__", "_") + "_row"
+                self.expressions[key] = _prefixed(
+                    row_expressions[name], prefix
+                )
+                self._add_value(name, key, field, None)
+            elif isinstance(field, serializers.ListSerializer):
+                self._add_many(name, field)
+            elif isinstance(field, serializers.Serializer):
+                self._add_one(name, field)
+            else:
+                self._add_column(name, field)
+
+        self.fields = tuple(self.fields)
+        self.relations = tuple(self.relations)
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        converter = _converters.get(serializer_class)
+        if converter is None:
+            converter = _converters[serializer_class] = cls(
+                serializer_class()
+            )
+
+        return converter
+
+    def _unsupported(self, name, reason):
+        return ImproperlyConfigured(
+            f"{self.serializer_class.__name__}.{name} has no fast path: "
+            f"{reason}"
+        )
+
+    def _lookup(self, name, field) -> str:
+        if field.source == "*":
+            raise self._unsupported(name, "source='*' is not supported")
+        return field.source.replace(".", "__")
+
+    def _add_value(self, name, key, field, model_field):
+        if _is_passthrough(field):
+            self.fields.append((name, key, None))
+        elif hasattr(field, "row_transform"):
+            self.fields.append((name, key, field.row_transform()))
+        elif isinstance(field, CONTEXT_FREE_FIELDS):
+            self.fields.append((name, key, _context_free(field)))
+        elif isinstance(field, serializers.FileField) and isinstance(
+            model_field, FileField
+        ):
+            self.fields.append((name, key, _file_url(field, model_field)))
+        else:
+            raise self._unsupported(
+                name, f"{type(field).__name__} is not supported"
+            )
+
+    def _add_column(self, name, field):
+        lookup = self._lookup(name, field)
+        try:
+            model_field = _model_field(self.model, lookup)
+        except FieldDoesNotExist:
+            raise self._unsupported(
+                name, f"'{lookup}' is not a column, add it to row_expressions"
+            )
+
+        if model_field.many_to_many or model_field.one_to_many:
+            raise self._unsupported(name, "to-many values are not supported")
+
+        key = self.prefix + lookup
+        self.columns.add(key)
+        self._add_value(name, key, field, model_field)
+
+    def _add_one(self, name, field):
+        lookup = self._lookup(name, field)
+        child = RowConverter(field, prefix=f"{self.prefix}{lookup}__")
+        if child.relations:
+            raise self._unsupported(
+                name, "to-many relations below to-one relations"
+            )
+
+        self.columns |= child.columns
+        self.expressions.update(child.expressions)
+        self.fields.append((name, None, child.convert_nested_row))
+
+    def _add_many(self, name, field):
+        lookup = self._lookup(name, field)
+        relation = self.model._meta.get_field(lookup)
+        if self.prefix or not relation.one_to_many:
+            raise self._unsupported(
+                name, "only reverse foreign keys of the listed model"
+            )
+
+        child = RowConverter(field.child)
+        self.fields.append((name, None, None))
+        self.relations.append(
+            (name, relation.related_model, relation.field.attname, child)
+        )
+
+    def values(self, queryset):
+        """Return ``queryset`` yielding the rows this converter reads."""
+        return queryset.prefetch_related(None).values(
+            *self.columns, **self.expressions
+        )
+
+    def convert_row(self, row, request):
+        data = {}
+        for name, key, transform in self.fields:
+            if transform is None:
+                data[name] = row[key] if key is not None else []
+            elif key is None:
+                data[name] = transform(row, request)
+            else:
+                data[name] = transform(row[key], request)
+
+        return data
+
+    def convert_nested_row(self, row, request):
+        if row[self.pk_key] is None:
+            return None
+        return self.convert_row(row, request)
+
+    def convert(self, rows, request=None) -> list:
+        """Convert ``rows`` read through ``values()`` to output dicts."""
+        rows = list(rows)
+        data = [self.convert_row(row, request) for row in rows]
+
+        for name, model, parent_key, child in self.relations:
+            by_parent = {
+                row[self.pk_key]: item for row, item in zip(rows, data)
+            }
+            children = defaultdict(list)
+            child_rows = model._default_manager.filter(
+                **{f"{parent_key}__in": list(by_parent)}
+            ).order_by("pk").values(
+                parent_key, *child.columns, **child.expressions
+            )
+            for row in child_rows:
+                children[row[parent_key]].append(row)
+
+            for parent_id, item in by_parent.items():
+                item[name] = child.convert(children[parent_id], request)
+
+        return data
+
+
+class RowListModelMixin(mixins.ListModelMixin):
+    """
+    Lists through the ``RowConverter`` of the serializer class instead of
+    instantiating the serializer, with identical output.
+    """
+
+    def list(self, request, *args, **kwargs):
+        converter = RowConverter.for_serializer(self.get_serializer_class())
+        queryset = converter.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                converter.convert(page, request)
+            )
+
+        return Response(converter.convert(queryset, request))
@@ -0,0 +1,29 @@
+from django.db.models import Exists, OuterRef
+
+
+def filter_related(queryset, relation: str, ids, match_all=False):
+    """
+    Keep the objects of ``queryset`` linked through the many-to-many
+    ``relation`` to any of ``ids`` (to all of them with ``match_all``).
+
+    Each condition is an EXISTS subquery on the through table, answered
+    from its unique (source, target) index, so matching objects are
+    neither joined to every link nor returned more than once.
+    """
+    field = queryset.model._meta.get_field(relation)
+    links = field.remote_field.through.objects.filter(
+        **{field.m2m_field_name(): OuterRef("pk")}
+    )
+    target = field.m2m_reverse_field_name()
+
+    if not match_all:
+        return queryset.filter(
+            Exists(links.filter(**{f"{target}__in": ids}))
+        )
+
+    for target_id in set(ids):
+        queryset = queryset.filter(
+            Exists(links.filter(**{target: target_id}))
+        )
+
+    return queryset
@@ -0,0 +1,142 @@
+"""
+Short-lived seat holds.
+
+Holding inserts one ``SeatHold`` row per seat with ``ON CONFLICT DO
+NOTHING`` semantics and then reads back which of the requested seats
+belong to the caller, so concurrent customers only ever wait on the
+unique index entries of the seats they both want. Booking claims its
+seats the same way before it inserts the tickets, which confirms the
+customer's own holds and never takes a seat someone else holds.
+"""
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from theatre.models import SeatHold, Ticket
+
+TICKET_FIELDS = ("performance_id", "row", "seat")
+
+
+class SeatsTaken(APIException):
+    """
+    409 listing the seats that could not be had, as dicts of ``fields``
+    built from the given tuples.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("Some of the requested seats are already taken.")
+    default_code = "seats_taken"
+
+    def __init__(self, seats, fields=("row", "seat")):
+        super().__init__()
+        self.detail = {
+            "detail": self.detail,
+            "taken": [dict(zip(fields, seat)) for seat in sorted(seats)],
+        }
+
+
+def _match(fields, values) -> Q:
+    """OR of exact matches of ``fields`` against each tuple in ``values``."""
+    return reduce(
+        or_, (Q(**dict(zip(fields, value))) for value in values)
+    )
+
+
+def claim_seats(tickets, user, expires_at=None) -> set:
+    """
+    Hold the ``(performance_id, row, seat)`` triples of ``tickets`` for
+    ``user`` in the current transaction, until ``expires_at``
+    (``SEAT_HOLD_MINUTES`` from now by default), and return the triples
+    that are sold or held by someone else.
+
+    The holds are inserted first, so a concurrent claim of the same seat
+    waits for this transaction on the unique index instead of slipping
+    in between a check and the booking; sold seats are looked up after
+    that wait.
+    """
+    tickets = set(tickets)
+    now = timezone.now()
+    if expires_at is None:
+        expires_at = now + timedelta(minutes=settings.SEAT_HOLD_MINUTES)
+
+    holds = SeatHold.objects.filter(_match(TICKET_FIELDS, tickets))
+    holds.filter(expires_at__lte=now).delete()
+    SeatHold.objects.bulk_create(
+        (
+            SeatHold(
+                performance_id=performance_id,
+                user=user,
+                row=row,
+                seat=seat,
+                expires_at=expires_at
+            )
+            # A fixed insertion order keeps overlapping claims from
+            # deadlocking on each other's index entries.
+            for performance_id, row, seat in sorted(tickets)
+        ),
+        ignore_conflicts=True
+    )
+    own_holds = set(holds.filter(user=user).values_list(*TICKET_FIELDS))
+    return (tickets - own_holds) | sold(tickets)
+
+
+def hold_seats(performance, user, seats):
+    """
+    Hold ``seats`` (``(row, seat)`` pairs) of ``performance`` for
+    ``user`` for ``SEAT_HOLD_MINUTES``, all or nothing, and return the
+    expiry. Seats the user already holds are extended. Raises
+    ``SeatsTaken`` with the seats that are sold or held by someone else.
+    """
+    seats = set(seats)
+    expires_at = timezone.now() + timedelta(
+        minutes=settings.SEAT_HOLD_MINUTES
+    )
+
+    seat_map = performance.get_seat_map()
+    sold_seats = {seat for seat in seats if seat_map.is_taken(*seat)}
+    if sold_seats:
+        raise SeatsTaken(sold_seats)
+
+    tickets = {(performance.id, row, seat) for row, seat in seats}
+    with transaction.atomic():
+        taken = claim_seats(tickets, user, expires_at)
+        if taken:
+            transaction.set_rollback(True)
+        else:
+            SeatHold.objects.filter(
+                _match(TICKET_FIELDS, tickets), user=user
+            ).update(expires_at=expires_at)
+
+    if taken:
+        raise SeatsTaken({ticket[1:] for ticket in taken})
+
+    return expires_at
+
+
+def release_seats(performance, user, seats):
+    SeatHold.objects.filter(
+        _match(("row", "seat"), set(seats)),
+        performance=performance,
+        user=user
+    ).delete()
+
+
+def sold(tickets) -> set:
+    """Return the ``(performance_id, row, seat)`` triples already booked."""
+    return set(
+        Ticket.objects.filter(_match(TICKET_FIELDS, tickets))
+        .values_list(*TICKET_FIELDS)
+    )
+
+
+def consume_holds(tickets, user):
+    """Delete the holds of ``user`` on the just booked ``tickets``."""
+    SeatHold.objects.filter(_match(TICKET_FIELDS, tickets), user=user).delete()
@@ -0,0 +1,193 @@
+"""
+Off-request processing of play images.
+
+Saving a play with a new image queues an ``ImageJob`` (see
+``theatre.signals``); ``python manage.py process_images`` drains the
+queue. For every job the image is decoded once with Pillow, rotated
+upright, and written as WebP variants (``PLAY_IMAGE_VARIANTS``, longest
+side in pixels, ``None`` keeps the size). Variants are encoded from the
+pixels only, so EXIF, GPS and other metadata of the upload are dropped.
+
+``Play.image_variants`` maps variant names to storage names and is
+filled once all variants are stored; until then lists render ``null``
+variants and clients fall back to ``image``.
+"""
+import io
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from theatre import cache
+from theatre.models import ImageJob, Play
+
+VARIANTS_DIR = "uploads/plays/variants/"
+# Running jobs not finished after this long belong to a dead worker.
+RUNNING_TIMEOUT = timedelta(minutes=10)
+
+
+def get_storage():
+    """Storage of the variants, which belong to one play each."""
+    return default_storage
+
+
+def variant_urls(variants: dict, request=None) -> dict:
+    """Return the URLs of the stored ``variants`` of an image."""
+    storage = get_storage()
+    urls = {}
+    for name in settings.PLAY_IMAGE_VARIANTS:
+        url = None
+        if variants and variants.get(name):
+            url = storage.url(variants[name])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+        urls[name] = url
+
+    return urls
+
+
+def render_variants(image_file) -> dict:
+    """Return the WebP bytes of every variant of an image file."""
+    with Image.open(image_file) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ("RGB", "RGBA"):
+            original = original.convert(
+                "RGBA" if "transparency" in original.info
+                or original.mode in ("LA", "PA")
+                else "RGB"
+            )
+        pixels = Image.new(original.mode, original.size)
+        pixels.paste(original)
+
+    rendered = {}
+    for name, size in settings.PLAY_IMAGE_VARIANTS.items():
+        variant = pixels
+        if size is not None and max(pixels.size) > size:
+            variant = pixels.copy()
+            variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        output = io.BytesIO()
+        variant.save(
+            output,
+            format="WEBP",
+            quality=settings.PLAY_IMAGE_WEBP_QUALITY,
+            method=4
+        )
+        rendered[name] = output.getvalue()
+
+    return rendered
+
+
+def delete_files(names) -> None:
+    storage = get_storage()
+    for name in names:
+        storage.delete(name)
+
+
+def queue_image(play) -> None:
+    """Queue the current image of ``play`` and drop its old variants."""
+    ImageJob.objects.create(play=play, source=play.image.name)
+    stale = list(play.image_variants.values())
+    if stale:
+        Play.objects.filter(id=play.id).update(image_variants={})
+        play.image_variants = {}
+        transaction.on_commit(lambda: delete_files(stale))
+
+
+def claim_job():
+    """Mark the oldest pending job as running and return it, or None."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ImageJob.PENDING)
+                | Q(
+                    status=ImageJob.RUNNING,
+                    updated_at__lt=now - RUNNING_TIMEOUT
+                )
+            )
+            .order_by("id")
+            .first()
+        )
+        if job is not None:
+            ImageJob.objects.filter(id=job.id).update(
+                status=ImageJob.RUNNING,
+                attempts=F("attempts") + 1,
+                updated_at=now
+            )
+            job.refresh_from_db()
+
+    return job
+
+
+def process_job(job) -> None:
+    """
+    Store the variants of the job's image and point the play at them.
+    A job whose play has a newer image by now is done without work.
+    """
+    storage = get_storage()
+    if not Play.objects.filter(id=job.play_id, image=job.source).exists():
+        return finish_job(job, ImageJob.DONE)
+
+    try:
+        source_storage = Play._meta.get_field("image").storage
+        with source_storage.open(job.source) as image_file:
+            rendered = render_variants(image_file)
+    except Exception as error:
+        status = ImageJob.PENDING
+        if job.attempts >= settings.PLAY_IMAGE_MAX_ATTEMPTS:
+            status = ImageJob.FAILED
+        return finish_job(
+            job, status, error=f"{type(error).__name__}: {error}"
+        )
+
+    stem = os.path.splitext(os.path.basename(job.source))[0]
+    variants = {
+        name: storage.save(
+            f"{VARIANTS_DIR}{stem}-{name}.webp", ContentFile(content)
+        )
+        for name, content in rendered.items()
+    }
+
+    with transaction.atomic():
+        play = (
+            Play.objects.select_for_update()
+            .filter(id=job.play_id, image=job.source)
+            .only("id", "image_variants")
+            .first()
+        )
+        if play is None:
+            stale = set(variants.values())
+        else:
+            stale = set(play.image_variants.values()) - set(variants.values())
+            Play.objects.filter(id=play.id).update(image_variants=variants)
+            cache.touch(Play, play.id)
+        finish_job(job, ImageJob.DONE)
+
+    delete_files(stale)
+
+
+def finish_job(job, status: str, error: str = "") -> None:
+    job.status = status
+    job.error = error
+    job.save(update_fields=["status", "error", "updated_at"])
+
+
+def process_pending(limit: int = None) -> int:
+    """Process pending jobs, at most ``limit``; return how many ran."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job()
+        if job is None:
+            break
+        process_job(job)
+        processed += 1
+
+    return processed
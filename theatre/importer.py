@@ -0,0 +1,283 @@
+"""
+Bulk import of season data from CSV or JSONL.
+
+Each file holds one kind of record:
+
+* ``actors``: ``first_name``, ``last_name``
+* ``halls``: ``name``, ``rows``, ``seats_in_row``
+* ``plays``: ``title``, ``description``, ``genres`` and ``actors``
+  (lists in JSONL, ``|`` separated in CSV; actors by full name, missing
+  genres are created)
+* ``performances``: ``play`` (title), ``theatre_hall`` (name),
+  ``show_time`` (ISO 8601, naive times are in ``TIME_ZONE``)
+
+Names are resolved to ids with in-memory maps loaded once per import,
+rows are inserted with ``bulk_create`` in batches, each batch in its own
+transaction. ``import_records`` yields after every committed batch how
+many records are done, so a failed import can resume by skipping them.
+Invalid records, including those the database refuses, raise
+``ImportRowError`` with their number.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from theatre import cache
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+BATCH_SIZE = 2000
+FORMATS = ("csv", "jsonl")
+LIST_SEPARATOR = "|"
+
+
+class ImportRowError(ValueError):
+    def __init__(self, line: int, message: str):
+        self.line = line
+        super().__init__(f"Record {line}: {message}")
+
+
+def read_records(lines, file_format: str):
+    """Yield the records of an iterable of text lines as dicts."""
+    if file_format == "csv":
+        yield from csv.DictReader(lines)
+    elif file_format == "jsonl":
+        records = (line for line in lines if line.strip())
+        for number, line in enumerate(records, start=1):
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                raise ImportRowError(number, f"invalid JSON: {error}")
+            if not isinstance(record, dict):
+                raise ImportRowError(number, "expected a JSON object")
+            yield record
+    else:
+        raise ValueError(f"Unknown format '{file_format}', use {FORMATS}")
+
+
+def _list(value) -> list:
+    if not value:
+        return []
+    if not isinstance(value, list):
+        value = [
+            item.strip()
+            for item in value.split(LIST_SEPARATOR)
+            if item.strip()
+        ]
+    return list(dict.fromkeys(value))
+
+
+def _required(record: dict, line: int, key: str):
+    value = record.get(key)
+    if value in (None, ""):
+        raise ImportRowError(line, f"'{key}' is required")
+    return value
+
+
+def _integer(record: dict, line: int, key: str) -> int:
+    value = _required(record, line, key)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(line, f"'{key}' must be an integer")
+    if value < 1:
+        raise ImportRowError(line, f"'{key}' must be positive")
+    return value
+
+
+class SeasonImporter:
+    kinds = ("actors", "halls", "plays", "performances")
+
+    def __init__(self, kind: str, batch_size: int = BATCH_SIZE):
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown kind '{kind}', use {self.kinds}")
+
+        self.kind = kind
+        self.batch_size = batch_size
+        self._maps = {}
+
+    def _map(self, name: str) -> dict:
+        if name not in self._maps:
+            if name == "genres":
+                rows = Genre.objects.values_list("name", "id")
+            elif name == "actors":
+                rows = (
+                    (f"{first_name} {last_name}", actor_id)
+                    for actor_id, first_name, last_name
+                    in Actor.objects.order_by("id").values_list(
+                        "id", "first_name", "last_name"
+                    )
+                )
+            elif name == "plays":
+                rows = Play.objects.order_by("id").values_list("title", "id")
+            else:
+                rows = TheatreHall.objects.order_by("id").values_list(
+                    "name", "id"
+                )
+            self._maps[name] = dict(rows)
+
+        return self._maps[name]
+
+    def _resolve(self, name: str, line: int, key: str, value):
+        try:
+            return self._map(name)[value]
+        except KeyError:
+            raise ImportRowError(line, f"unknown {key} '{value}'")
+
+    def import_records(self, records, skip: int = 0):
+        """
+        Import ``records`` after the first ``skip`` ones and yield the
+        number of records done after each committed batch.
+        """
+        records = enumerate(islice(records, skip, None), start=skip + 1)
+        done = skip
+        while batch := list(islice(records, self.batch_size)):
+            try:
+                self._import_batch(batch)
+            except (DataError, IntegrityError) as error:
+                raise self._row_error(batch, error) from error
+            done += len(batch)
+            yield done
+
+    def _import_batch(self, batch):
+        with transaction.atomic():
+            getattr(self, f"_import_{self.kind}")(batch)
+
+    def _row_error(self, batch, error) -> ImportRowError:
+        """
+        Find the record of a batch that the database refused by importing
+        the records one by one and rolling each back.
+        """
+        failed_line = batch[0][0]
+        for line, record in batch:
+            try:
+                with transaction.atomic():
+                    getattr(self, f"_import_{self.kind}")([(line, record)])
+                    transaction.set_rollback(True)
+            except (DataError, IntegrityError) as record_error:
+                failed_line, error = line, record_error
+                break
+        # The maps may hold ids of the rolled back rows.
+        self._maps.clear()
+        return ImportRowError(failed_line, str(error).strip())
+
+    def _import_actors(self, batch):
+        actors = Actor.objects.bulk_create(
+            Actor(
+                first_name=_required(record, line, "first_name"),
+                last_name=_required(record, line, "last_name")
+            )
+            for line, record in batch
+        )
+        if "actors" in self._maps:
+            for actor in actors:
+                self._maps["actors"][actor.full_name] = actor.id
+        cache.touch(Actor)
+
+    def _import_halls(self, batch):
+        halls = TheatreHall.objects.bulk_create(
+            TheatreHall(
+                name=_required(record, line, "name"),
+                rows=_integer(record, line, "rows"),
+                seats_in_row=_integer(record, line, "seats_in_row")
+            )
+            for line, record in batch
+        )
+        if "halls" in self._maps:
+            for hall in halls:
+                self._maps["halls"][hall.name] = hall.id
+        cache.touch(TheatreHall)
+
+    def _create_missing_genres(self, batch):
+        genre_ids = self._map("genres")
+        missing = {
+            name
+            for _, record in batch
+            for name in _list(record.get("genres"))
+            if name not in genre_ids
+        }
+        if missing:
+            Genre.objects.bulk_create(
+                (Genre(name=name) for name in missing),
+                ignore_conflicts=True
+            )
+            genre_ids.update(
+                Genre.objects.filter(name__in=missing).values_list(
+                    "name", "id"
+                )
+            )
+            cache.touch(Genre)
+
+    def _import_plays(self, batch):
+        self._create_missing_genres(batch)
+        rows = []
+        for line, record in batch:
+            genres = _list(record.get("genres"))
+            actors = _list(record.get("actors"))
+            rows.append(
+                (
+                    Play(
+                        title=_required(record, line, "title"),
+                        description=record.get("description")
+                        or Play._meta.get_field("description").default,
+                        genre_names=sorted(genres),
+                        actor_names=actors
+                    ),
+                    [self._map("genres")[name] for name in genres],
+                    [
+                        self._resolve("actors", line, "actor", name)
+                        for name in actors
+                    ],
+                )
+            )
+
+        plays = Play.objects.bulk_create(play for play, _, _ in rows)
+        Play.genres.through.objects.bulk_create(
+            Play.genres.through(play_id=play.id, genre_id=genre_id)
+            for play, genre_ids, _ in rows
+            for genre_id in genre_ids
+        )
+        Play.actors.through.objects.bulk_create(
+            Play.actors.through(play_id=play.id, actor_id=actor_id)
+            for play, _, actor_ids in rows
+            for actor_id in actor_ids
+        )
+        plays_map = self._map("plays")
+        for play in plays:
+            plays_map[play.title] = play.id
+        cache.touch(Play)
+
+    def _import_performances(self, batch):
+        current_timezone = timezone.get_current_timezone()
+        performances = []
+        for line, record in batch:
+            show_time = record.get("show_time")
+            try:
+                show_time = parse_datetime(show_time or "")
+            except ValueError:
+                show_time = None
+            if show_time is None:
+                raise ImportRowError(
+                    line, "'show_time' must be an ISO 8601 date and time"
+                )
+            if timezone.is_naive(show_time):
+                show_time = timezone.make_aware(show_time, current_timezone)
+
+            performances.append(
+                Performance(
+                    play_id=self._resolve(
+                        "plays", line, "play", record.get("play")
+                    ),
+                    theatre_hall_id=self._resolve(
+                        "halls", line, "theatre_hall",
+                        record.get("theatre_hall")
+                    ),
+                    show_time=show_time
+                )
+            )
+
+        Performance.objects.bulk_create(performances)
+        cache.touch(Performance)
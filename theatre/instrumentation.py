@@ -0,0 +1,303 @@
+"""
+Sampled per-request instrumentation for production.
+
+``InstrumentationMiddleware`` measures a share of the requests
+(``THEATRE_INSTRUMENTATION_SAMPLE_RATE``) in phases:
+
+* ``db``: time in SQL queries, and their number
+* ``view``: the rest of the view's time: authentication (JWT decoding,
+  password hashing on login), permission and throttle checks with
+  their cache round trips, building the queryset, and serializers and
+  row converters
+* ``render``: rendering the response
+* ``total``: the request through the whole middleware stack
+
+Sampled responses carry the phases in a ``Server-Timing`` header, and
+they are added to histograms per view and action that ``MetricsView``
+returns as JSON, or as Prometheus text with ``?format=prometheus``.
+
+Histograms are kept per process and live as long as it does. Their
+Prometheus series carry a ``pid`` label, so a scrape through a load
+balancer only shows the worker that answered it: scrape every worker
+(each one on its own address) and sum over ``pid`` in the queries.
+
+A request that is not sampled costs a random number, and each of its
+queries a context variable lookup. The middleware works in both sync
+and async mode, so it keeps the async read views on the event loop.
+"""
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PHASES = ("total", "db", "view", "render")
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_record = ContextVar("instrumentation_record", default=None)
+_lock = threading.Lock()
+_histograms = {}
+
+
+class Record:
+    __slots__ = (
+        "started",
+        "queries",
+        "db",
+        "view",
+        "action",
+        "view_started",
+        "db_before_view",
+        "view_db",
+        "view_ended",
+        "render_ended",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.view = None
+        self.action = None
+        self.view_started = None
+        self.db_before_view = 0.0
+        self.view_db = 0.0
+        self.view_ended = None
+        self.render_ended = None
+
+    def timings(self) -> dict:
+        ended = time.perf_counter()
+        view_ended = self.view_ended or ended
+        view_db = (
+            self.view_db if self.view_ended
+            else self.db - self.db_before_view
+        )
+        return {
+            "total": ended - self.started,
+            "db": self.db,
+            "view": max(view_ended - self.view_started - view_db, 0.0),
+            "render": (self.render_ended or view_ended) - view_ended,
+        }
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self) -> dict:
+        """Cumulative bucket counts by upper bound, Prometheus style."""
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip((*self.bounds, "+Inf"), self.counts):
+            cumulative += count
+            buckets[bound if bound == "+Inf" else f"{bound:g}"] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+def _record_query(execute, sql, params, many, context):
+    record = _record.get()
+    if record is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record.db += time.perf_counter() - started
+        record.queries += 1
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def observe(record: Record, timings: dict) -> None:
+    key = (record.view, record.action)
+    with _lock:
+        histograms = _histograms.get(key)
+        if histograms is None:
+            histograms = _histograms[key] = {
+                "queries": Histogram(QUERY_BUCKETS),
+                **{phase: Histogram(DURATION_BUCKETS) for phase in PHASES},
+            }
+        histograms["queries"].observe(record.queries)
+        for phase, seconds in timings.items():
+            histograms[phase].observe(seconds)
+
+
+def snapshot() -> dict:
+    with _lock:
+        views = [
+            {
+                "view": view,
+                "action": action,
+                "requests": histograms["total"].count,
+                "queries": histograms["queries"].as_dict(),
+                "seconds": {
+                    phase: histograms[phase].as_dict() for phase in PHASES
+                },
+            }
+            for (view, action), histograms in sorted(_histograms.items())
+        ]
+    return {
+        "pid": os.getpid(),
+        "sample_rate": settings.THEATRE_INSTRUMENTATION_SAMPLE_RATE,
+        "views": views,
+    }
+
+
+def _prometheus_histogram(name: str, labels: str, histogram: dict):
+    for bound, count in histogram["buckets"].items():
+        yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+    yield f"{name}_sum{{{labels}}} {histogram['sum']}"
+    yield f"{name}_count{{{labels}}} {histogram['count']}"
+
+
+def _labels(data: dict, view: dict) -> str:
+    return (
+        f'pid="{data["pid"]}",view="{view["view"]}",action="{view["action"]}"'
+    )
+
+
+def prometheus_text(data: dict) -> str:
+    """Render a ``snapshot()`` in the Prometheus text format."""
+    duration = "theatre_request_duration_seconds"
+    queries = "theatre_request_queries"
+    lines = [
+        f"# HELP {duration} Time of sampled requests by phase.",
+        f"# TYPE {duration} histogram",
+    ]
+    for view in data["views"]:
+        labels = _labels(data, view)
+        for phase, histogram in view["seconds"].items():
+            lines.extend(
+                _prometheus_histogram(
+                    duration, f'{labels},phase="{phase}"', histogram
+                )
+            )
+    lines += [
+        f"# HELP {queries} SQL queries of sampled requests.",
+        f"# TYPE {queries} histogram",
+    ]
+    for view in data["views"]:
+        labels = _labels(data, view)
+        lines.extend(_prometheus_histogram(queries, labels, view["queries"]))
+
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(record: Record, timings: dict) -> str:
+    return ", ".join(
+        f"{phase};dur={seconds * 1000:.1f}"
+        + (f';desc="{record.queries} queries"' if phase == "db" else "")
+        for phase, seconds in timings.items()
+    )
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    @staticmethod
+    def sampled() -> bool:
+        return random.random() < settings.THEATRE_INSTRUMENTATION_SAMPLE_RATE
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(None, connection)
+        record = Record()
+        token = _record.set(record)
+        try:
+            response = self.get_response(request)
+        finally:
+            _record.reset(token)
+        return self.finish(record, response)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        record = Record()
+        token = _record.set(record)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _record.reset(token)
+        return self.finish(record, response)
+
+    @staticmethod
+    def finish(record: Record, response):
+        if record.view_started is None:
+            # Not routed to a view.
+            return response
+
+        timings = record.timings()
+        observe(record, timings)
+        header = server_timing(record, timings)
+        if response.has_header("Server-Timing"):
+            header = f"{response['Server-Timing']}, {header}"
+        response["Server-Timing"] = header
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        record = _record.get()
+        if record is not None:
+            record.view = request.resolver_match.view_name
+            record.action = getattr(view_func, "actions", {}).get(
+                request.method.lower(), request.method.lower()
+            )
+            record.view_started = time.perf_counter()
+            record.db_before_view = record.db
+
+    def process_template_response(self, request, response):
+        record = _record.get()
+        if record is not None and record.view_started is not None:
+            record.view_ended = time.perf_counter()
+            record.view_db = record.db - record.db_before_view
+
+            def rendered(response):
+                record.render_ended = time.perf_counter()
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    async def aprocess_view(self, *args):
+        return self.process_view(*args)
+
+    async def aprocess_template_response(self, *args):
+        return self.process_template_response(*args)
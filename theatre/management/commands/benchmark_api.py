@@ -0,0 +1,92 @@
+import json
+import platform
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from theatre import benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Seed a throwaway test database with synthetic data, request every
+    API endpoint and report query counts, p50/p95 latency and response
+    sizes as JSON. With --compare the run fails when it regresses
+    against a previous report.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            choices=sorted(benchmarks.SCALES),
+            default="small",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--output",
+            help="Write the JSON report to this file instead of stdout"
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help="JSON report of a previous run to compare against"
+        )
+        parser.add_argument(
+            "--query-threshold",
+            type=int,
+            default=0,
+            help="Extra queries per endpoint allowed before failing"
+        )
+        parser.add_argument(
+            "--latency-threshold",
+            type=float,
+            default=0.25,
+            help="Relative p95 slowdown allowed before failing"
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = benchmarks.seed(options["scale"])
+            client = APIClient()
+            client.force_authenticate(user)
+            report = {
+                "scale": options["scale"],
+                "repeat": options["repeat"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "endpoints": benchmarks.run(client, options["repeat"]),
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as baseline_file:
+                baseline = json.load(baseline_file)
+
+            regressions = benchmarks.compare(
+                baseline,
+                report,
+                query_threshold=options["query_threshold"],
+                latency_threshold=options["latency_threshold"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Performance regressions:\n" + "\n".join(regressions)
+                )
+            self.stderr.write("No regressions against the baseline")
@@ -0,0 +1,39 @@
+from itertools import islice
+
+from django.core.management import BaseCommand
+
+from theatre.models import Play
+from theatre.storage import release_blobs
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """
+    Delete stored play images that no play references any more, such as
+    images of plays deleted with raw SQL or uploads that were never saved.
+    Blobs written within the storage grace period are kept.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the orphans without deleting them"
+        )
+
+    def handle(self, *args, **options):
+        storage = Play._meta.get_field("image").storage
+        blobs = storage.blobs()
+        deleted = 0
+
+        while batch := list(islice(blobs, BATCH_SIZE)):
+            orphans = release_blobs(
+                storage, batch, dry_run=options["dry_run"]
+            )
+            for name in orphans:
+                self.stdout.write(name)
+            deleted += len(orphans)
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(f"{verb} {deleted} orphaned images")
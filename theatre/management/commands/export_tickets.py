@@ -0,0 +1,57 @@
+import sys
+import time
+from datetime import date
+
+from django.core.management import BaseCommand
+
+from theatre.exporter import CHUNK_SIZE, FORMATS, export_tickets, gzip_chunks
+
+
+class Command(BaseCommand):
+    """
+    Export the tickets of a show date range as CSV, JSONL or columnar
+    JSONL chunks, optionally gzipped, to a file or stdout.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from", dest="date_from", type=date.fromisoformat
+        )
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat)
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--output", "-o", help="File to write (default: stdout)"
+        )
+
+    def handle(self, *args, **options):
+        chunks = export_tickets(
+            options["format"],
+            options["date_from"],
+            options["date_to"],
+            chunk_size=options["chunk_size"]
+        )
+        if options["gzip"]:
+            chunks = gzip_chunks(chunks)
+
+        started = time.perf_counter()
+        size = 0
+        if options["output"]:
+            output = open(options["output"], "wb")
+        else:
+            output = sys.stdout.buffer
+
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+                size += len(chunk)
+        finally:
+            if options["output"]:
+                output.close()
+            else:
+                output.flush()
+
+        self.stderr.write(
+            f"Exported {size} bytes in {time.perf_counter() - started:.1f}s"
+        )
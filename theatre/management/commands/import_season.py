@@ -0,0 +1,82 @@
+import csv
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from theatre.importer import (
+    BATCH_SIZE,
+    FORMATS,
+    SeasonImporter,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    """
+    Import actors, halls, plays or performances from a CSV or JSONL
+    file. Progress is checkpointed after every batch; running the same
+    command again after a failure resumes after the last committed batch.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=SeasonImporter.kinds)
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format (guessed from the extension when omitted)"
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--checkpoint",
+            help="Progress file (default: <path>.checkpoint)"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = (
+            options["format"] or os.path.splitext(path)[1].lstrip(".")
+        )
+        if file_format not in FORMATS:
+            raise CommandError(f"Cannot tell the format of {path}")
+
+        checkpoint = options["checkpoint"] or f"{path}.checkpoint"
+        skip = 0
+        if os.path.exists(checkpoint):
+            with open(checkpoint) as checkpoint_file:
+                skip = int(checkpoint_file.read() or 0)
+            self.stdout.write(f"Resuming after {skip} records")
+
+        importer = SeasonImporter(
+            options["kind"], batch_size=options["batch_size"]
+        )
+        started = time.perf_counter()
+        done = skip
+
+        with open(path, newline="", encoding="utf-8-sig") as import_file:
+            try:
+                for done in importer.import_records(
+                    read_records(import_file, file_format), skip=skip
+                ):
+                    with open(checkpoint, "w") as checkpoint_file:
+                        checkpoint_file.write(str(done))
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{done} records imported "
+                        f"({(done - skip) / elapsed:.0f}/s)"
+                    )
+            except (ValueError, csv.Error) as error:
+                raise CommandError(
+                    f"{error}. {done} records are imported, run the "
+                    f"command again to resume."
+                )
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {done - skip} {options['kind']} in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+DEFAULT_PATHS = (
+    "/api/theatre/performances/",
+    "/api/theatre/plays/",
+)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def fetch(host, port, request: bytes, write_delay, read_delay):
+    """
+    Send one request like a slow client: the request in two halves
+    ``write_delay`` apart, the response read in small pieces with
+    ``read_delay`` pauses. Return the status code.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        half = len(request) // 2
+        writer.write(request[:half])
+        await writer.drain()
+        await asyncio.sleep(write_delay)
+        writer.write(request[half:])
+        await writer.drain()
+
+        status_line = await reader.readline()
+        while await reader.read(4096):
+            await asyncio.sleep(read_delay)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_target(url, paths, token, options):
+    parts = urlsplit(url)
+    if parts.scheme != "http":
+        raise CommandError(f"Only http:// targets are supported: {url}")
+    host, port = parts.hostname, parts.port or 80
+    requests = [
+        (
+            f"GET {parts.path.rstrip('/')}{path} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Accept: application/json\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode()
+        for path in paths
+    ]
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + options["duration"]
+
+    async def client(number):
+        nonlocal errors
+        sent = number
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(
+                    fetch(
+                        host,
+                        port,
+                        requests[sent % len(requests)],
+                        options["write_delay"],
+                        options["read_delay"],
+                    ),
+                    timeout=options["timeout"]
+                )
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = None
+            sent += 1
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(client(number) for number in range(options["concurrency"]))
+    )
+    elapsed = time.perf_counter() - started
+
+    return {
+        "url": url,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": _ms(percentile(latencies, 0.5)),
+        "p95_ms": _ms(percentile(latencies, 0.95)),
+        "p99_ms": _ms(percentile(latencies, 0.99)),
+        "mean_ms": _ms(statistics.fmean(latencies) if latencies else None),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+class Command(BaseCommand):
+    """
+    Load test running servers with many concurrent slow clients, to
+    compare deployment profiles, e.g. the WSGI and ASGI ones:
+
+        python manage.py runserver 8000 --noreload
+        uvicorn theatre_api.asgi:application --port 8001
+        python manage.py load_test --user test@test.com \\
+            --target wsgi=http://127.0.0.1:8000 \\
+            --target asgi=http://127.0.0.1:8001
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=http://host:port of a server to test, repeatable"
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            help="Path to request, repeatable (default: the hot lists)"
+        )
+        token = parser.add_mutually_exclusive_group(required=True)
+        token.add_argument("--token", help="JWT access token to send")
+        token.add_argument(
+            "--user", help="Email of a user to mint an access token for"
+        )
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="Seconds per target"
+        )
+        parser.add_argument(
+            "--write-delay",
+            type=float,
+            default=0.05,
+            help="Seconds a client pauses while sending its request"
+        )
+        parser.add_argument(
+            "--read-delay",
+            type=float,
+            default=0.01,
+            help="Seconds a client pauses between reads of the response"
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        token = options["token"]
+        if token is None:
+            try:
+                user = get_user_model().objects.get(email=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user {options['user']}")
+            token = str(RefreshToken.for_user(user).access_token)
+
+        paths = options["path"] or DEFAULT_PATHS
+        report = {}
+        for target in options["target"]:
+            name, _, url = target.partition("=")
+            if not url:
+                raise CommandError(f"Expected name=url, got '{target}'")
+            self.stderr.write(f"Testing {name} at {url}")
+            report[name] = asyncio.run(
+                run_target(url, paths, token, options)
+            )
+
+        self.stdout.write(json.dumps(report, indent=2))
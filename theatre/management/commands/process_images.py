@@ -0,0 +1,35 @@
+import time
+
+from django.core.management import BaseCommand
+
+from theatre.images import process_pending
+
+
+class Command(BaseCommand):
+    """
+    Make the WebP variants of uploaded play images. Runs as a worker
+    polling the job table unless --once is given; start as many workers
+    as needed, jobs are claimed with SKIP LOCKED.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the pending jobs and exit"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending()
+            if processed:
+                self.stdout.write(f"Processed {processed} images")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from theatre.models import SeatHold
+
+
+class Command(BaseCommand):
+    """
+    Delete expired seat holds. Expired holds never block anyone, this
+    only keeps the table small; run it from cron on busy installations.
+    """
+
+    def handle(self, *args, **options):
+        deleted, _ = SeatHold.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+
+        self.stdout.write(f"Deleted {deleted} expired seat holds")
@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand
+
+from theatre.models import Performance
+
+
+class Command(BaseCommand):
+    """
+    Recompute performance seat maps and sold ticket counters from the
+    ticket rows, fixing any drift of the denormalized columns.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "performance_ids",
+            nargs="*",
+            type=int,
+            help="Performances to recount (all when omitted)"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Performances locked and recounted per transaction"
+        )
+
+    def handle(self, *args, **options):
+        queryset = Performance.objects.order_by("id")
+        if options["performance_ids"]:
+            queryset = queryset.filter(id__in=options["performance_ids"])
+
+        performance_ids = list(queryset.values_list("id", flat=True))
+        batch_size = options["batch_size"]
+
+        for start in range(0, len(performance_ids), batch_size):
+            Performance.rebuild_seat_maps(
+                performance_ids[start:start + batch_size]
+            )
+
+        self.stdout.write(
+            f"Recounted tickets of {len(performance_ids)} performances"
+        )
@@ -0,0 +1,319 @@
+"""
+Serving of uploaded media.
+
+``prepare`` answers a GET/HEAD for a file below ``MEDIA_ROOT``: it
+resolves the path safely, sets ``ETag``, ``Last-Modified`` and
+``Cache-Control`` (immutable for content-addressed blobs, see
+``theatre.storage``), and handles conditional and single range requests.
+It is shared by two front ends:
+
+* ``serve_media``, a Django view. Depending on ``MEDIA_SERVE_MODE`` it
+  returns the file itself (``django``, full files go out through the
+  WSGI server's ``sendfile``), or an empty response naming the file for
+  the web server to send (``x-accel-redirect`` for nginx below
+  ``MEDIA_ACCEL_PREFIX``, ``x-sendfile`` for Apache and lighttpd).
+* ``MediaApp``, a standalone ASGI application (``theatre_api.media_asgi``)
+  that never touches Django's request stack. It sends files with the
+  ASGI ``http.response.zerocopysend`` extension (``os.sendfile`` in the
+  server) where the server offers it, otherwise in chunks read in a
+  thread.
+"""
+import asyncio
+import mimetypes
+import os
+import posixpath
+import stat
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+from theatre.storage import IMMUTABLE_CACHE_CONTROL, is_blob
+
+CHUNK_SIZE = 64 * 1024
+SERVE_MODES = ("django", "x-accel-redirect", "x-sendfile")
+
+
+class MediaResponse(NamedTuple):
+    status: int
+    headers: dict
+    path: Optional[str] = None
+    offset: int = 0
+    length: int = 0
+
+
+def resolve(path: str, document_root=None) -> Optional[str]:
+    """Return the file system path of ``path`` below the root, or None."""
+    document_root = os.path.realpath(document_root or settings.MEDIA_ROOT)
+    path = posixpath.normpath(path).lstrip("/")
+    if path.startswith("..") or "\x00" in path:
+        return None
+
+    full_path = os.path.realpath(os.path.join(document_root, path))
+    if os.path.commonpath([document_root, full_path]) != document_root:
+        return None
+    return full_path
+
+
+def _etag(path: str, file_stat) -> str:
+    if is_blob(path):
+        return '"{}"'.format(
+            os.path.splitext(posixpath.basename(path))[0]
+        )
+    return f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _byte_range(header: str, size: int):
+    """
+    Return ``(start, end)`` of a single ``bytes=`` range, ``None`` for
+    anything else (served in full) and ``()`` when it is unsatisfiable.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    start, _, end = ranges.strip().partition("-")
+    try:
+        if not start:
+            suffix = int(end)
+            if suffix <= 0:
+                return ()
+            return max(size - suffix, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+
+    if start > end or start >= size:
+        return ()
+    return start, min(end, size - 1)
+
+
+def prepare(path: str, request_headers: dict, document_root=None):
+    """
+    Plan the response to a GET of media ``path``; ``request_headers``
+    maps lower case header names to values.
+    """
+    full_path = resolve(path, document_root)
+    try:
+        file_stat = os.stat(full_path) if full_path else None
+    except OSError:
+        file_stat = None
+    if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+        return MediaResponse(404, {"Content-Type": "text/plain"})
+
+    size = file_stat.st_size
+    etag = _etag(path, file_stat)
+    content_type, encoding = mimetypes.guess_type(full_path)
+    headers = {
+        "Content-Type": content_type or "application/octet-stream",
+        "ETag": etag,
+        "Last-Modified": http_date(file_stat.st_mtime),
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if is_blob(path)
+            else settings.MEDIA_CACHE_CONTROL
+        ),
+        "Accept-Ranges": "bytes",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return MediaResponse(304, headers)
+    else:
+        modified_since = parse_http_date_safe(
+            request_headers.get("if-modified-since", "")
+        )
+        if modified_since is not None and int(
+            file_stat.st_mtime
+        ) <= modified_since:
+            return MediaResponse(304, headers)
+
+    byte_range = None
+    if_range = request_headers.get("if-range")
+    if "range" in request_headers and (if_range is None or if_range == etag):
+        byte_range = _byte_range(request_headers["range"], size)
+
+    if byte_range == ():
+        headers["Content-Range"] = f"bytes */{size}"
+        return MediaResponse(416, headers)
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return MediaResponse(206, headers, full_path, start, end - start + 1)
+
+    headers["Content-Length"] = str(size)
+    return MediaResponse(200, headers, full_path, 0, size)
+
+
+def read_chunks(path: str, offset: int, length: int):
+    with open(path, "rb") as media_file:
+        media_file.seek(offset)
+        while length > 0:
+            chunk = media_file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Serve media ``path`` the way ``MEDIA_SERVE_MODE`` asks for."""
+    request_headers = {
+        name.lower(): value for name, value in request.headers.items()
+    }
+    mode = settings.MEDIA_SERVE_MODE
+    if mode not in SERVE_MODES:
+        raise ImproperlyConfigured(
+            f"MEDIA_SERVE_MODE must be one of {SERVE_MODES}"
+        )
+    if mode != "django":
+        # The web server handles ranges and conditions of its own.
+        request_headers = {}
+
+    planned = prepare(path, request_headers, document_root)
+    if planned.status == 404:
+        raise Http404("Media not found")
+
+    if mode == "x-accel-redirect":
+        response = HttpResponse()
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_ACCEL_PREFIX + path.lstrip("/")
+        )
+    elif mode == "x-sendfile":
+        response = HttpResponse()
+        response["X-Sendfile"] = planned.path
+    elif planned.status == 200 and request.method != "HEAD":
+        response = FileResponse(open(planned.path, "rb"))
+    elif planned.status == 206 and request.method != "HEAD":
+        response = StreamingHttpResponse(
+            read_chunks(planned.path, planned.offset, planned.length),
+            status=206
+        )
+    else:
+        response = HttpResponse(status=planned.status)
+
+    for name, value in planned.headers.items():
+        if mode != "django" and name in ("Content-Length", "Accept-Ranges"):
+            continue
+        response[name] = value
+    return response
+
+
+class MediaApp:
+    """
+    ASGI application serving ``MEDIA_ROOT`` below ``MEDIA_URL``.
+
+    Only file system work runs here: no middleware, sessions or database,
+    and the event loop never blocks on disk reads.
+    """
+
+    def __init__(self, prefix=None, document_root=None):
+        self.prefix = "/" + (prefix or settings.MEDIA_URL).strip("/") + "/"
+        self.document_root = document_root
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] not in ("GET", "HEAD"):
+            return await self.respond(send, 405, {"Allow": "GET, HEAD"})
+        if not scope["path"].startswith(self.prefix):
+            return await self.respond(send, 404, {})
+
+        request_headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        planned = await asyncio.get_running_loop().run_in_executor(
+            None,
+            prepare,
+            scope["path"][len(self.prefix):],
+            request_headers,
+            self.document_root,
+        )
+        if planned.path is None or scope["method"] == "HEAD":
+            return await self.respond(send, planned.status, planned.headers)
+
+        await self.respond(
+            send, planned.status, planned.headers, more_body=True
+        )
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(planned.path, "rb") as media_file:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": media_file,
+                        "offset": planned.offset,
+                        "count": planned.length,
+                    }
+                )
+            return
+
+        await self.send_chunks(send, planned)
+
+    @staticmethod
+    async def respond(send, status, headers, more_body=False):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers.items()
+                ],
+            }
+        )
+        if not more_body:
+            await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def send_chunks(send, planned):
+        loop = asyncio.get_running_loop()
+        descriptor = await loop.run_in_executor(
+            None, os.open, planned.path, os.O_RDONLY
+        )
+        try:
+            offset, remaining = planned.offset, planned.length
+            while remaining > 0:
+                chunk = await loop.run_in_executor(
+                    None,
+                    os.pread,
+                    descriptor,
+                    min(CHUNK_SIZE, remaining),
+                    offset
+                )
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": True,
+                    }
+                )
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            os.close(descriptor)
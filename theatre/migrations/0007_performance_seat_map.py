@@ -0,0 +1,37 @@
+# Generated by Django 4.2.3 on 2026-10-17 07:41
+
+from django.db import migrations, models
+
+from theatre.seat_map import SeatMap
+
+
+def build_seat_maps(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    Ticket = apps.get_model("theatre", "Ticket")
+
+    for performance in Performance.objects.select_related("theatre_hall"):
+        seat_map = SeatMap(
+            performance.theatre_hall.rows,
+            performance.theatre_hall.seats_in_row,
+        )
+        tickets = Ticket.objects.filter(performance=performance)
+        for row, seat in tickets.values_list("row", "seat"):
+            if seat_map.has_seat(row, seat):
+                seat_map.occupy(row, seat)
+        performance.seat_map = bytes(seat_map)
+        performance.save(update_fields=["seat_map"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0006_play_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="seat_map",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(build_seat_maps, migrations.RunPython.noop),
+    ]
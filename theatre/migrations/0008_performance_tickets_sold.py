@@ -0,0 +1,33 @@
+# Generated by Django 4.2.3 on 2026-10-17 07:42
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_tickets_sold(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+
+    for performance in Performance.objects.annotate(sold=Count("tickets")):
+        performance.tickets_sold = performance.sold
+        performance.save(update_fields=["tickets_sold"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0007_performance_seat_map"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["play", "show_time"], name="performance_play_show_time"
+            ),
+        ),
+        migrations.RunPython(count_tickets_sold, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_COLUMNS = ("title", "description")
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS theatre_play_{column}_trgm "
+            f"ON theatre_play USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS theatre_play_{column}_trgm"
+        )
+
+
+class Migration(migrations.Migration):
+    """
+    Trigram GIN indexes behind ``?search=`` and ``?title=`` of plays. They
+    only exist on PostgreSQL, other databases search in process.
+    """
+
+    dependencies = [
+        ("theatre", "0010_seathold"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.3 on 2026-10-17 07:59
+
+from django.db import migrations, models
+
+
+def fill_play_summaries(apps, schema_editor):
+    Play = apps.get_model("theatre", "Play")
+    summaries = {
+        play_id: ([], []) for play_id in Play.objects.values_list("id", flat=True)
+    }
+
+    for play_id, name in Play.genres.through.objects.order_by(
+        "genre__name"
+    ).values_list("play_id", "genre__name"):
+        summaries[play_id][0].append(name)
+
+    for play_id, first_name, last_name in Play.actors.through.objects.order_by(
+        "id"
+    ).values_list("play_id", "actor__first_name", "actor__last_name"):
+        summaries[play_id][1].append(f"{first_name} {last_name}")
+
+    for play_id, (genre_names, actor_names) in summaries.items():
+        Play.objects.filter(id=play_id).update(
+            genre_names=genre_names, actor_names=actor_names
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0011_play_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="play",
+            name="actor_names",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name="play",
+            name="genre_names",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(fill_play_summaries, migrations.RunPython.noop),
+    ]
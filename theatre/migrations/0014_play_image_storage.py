@@ -0,0 +1,23 @@
+# Generated by Django 4.2.3 on 2026-10-17 08:33
+
+from django.db import migrations, models
+import theatre.models
+import theatre.storage
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0013_play_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="play",
+            name="image",
+            field=models.ImageField(
+                null=True,
+                storage=theatre.storage.ContentAddressedStorage(),
+                upload_to=theatre.models.play_image_file_path,
+            ),
+        ),
+    ]
@@ -1,11 +1,16 @@
 import os.path
 import uuid
+from collections import defaultdict
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models, transaction
 from django.utils.text import slugify
 
+from theatre import cache
+from theatre.seat_map import SeatMap
+from theatre.storage import ContentAddressedStorage
+
 
 class TheatreHall(models.Model):
     name = models.CharField(max_length=63)
@@ -58,22 +63,244 @@ class Play(models.Model):
     description = models.TextField(default="Beautiful performance")
     genres = models.ManyToManyField(Genre, related_name="plays")
     actors = models.ManyToManyField(Actor, related_name="plays")
-    image = models.ImageField(null=True, upload_to=play_image_file_path)
+    image = models.ImageField(
+        null=True,
+        upload_to=play_image_file_path,
+        storage=ContentAddressedStorage()
+    )
+    genre_names = models.JSONField(default=list, editable=False)
+    actor_names = models.JSONField(default=list, editable=False)
+    image_variants = models.JSONField(default=dict, editable=False)
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=["title", "id"], name="play_title_id")
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored image name, to release it when the image changes.
+        instance._loaded_image = instance.__dict__.get("image")
+        return instance
+
+    @classmethod
+    def refresh_summaries(cls, play_ids):
+        """
+        Recompute the denormalized genre and actor names of the plays
+        from the many-to-many rows.
+        """
+        play_ids = set(play_ids)
+        if not play_ids:
+            return
+
+        genre_links = cls.genres.through.objects.filter(
+            play_id__in=play_ids
+        ).order_by("genre__name")
+        genre_names = defaultdict(list)
+        for play_id, name in genre_links.values_list("play_id", "genre__name"):
+            genre_names[play_id].append(name)
+
+        actor_links = cls.actors.through.objects.filter(
+            play_id__in=play_ids
+        ).order_by("id")
+        actor_names = defaultdict(list)
+        for play_id, first_name, last_name in actor_links.values_list(
+            "play_id", "actor__first_name", "actor__last_name"
+        ):
+            actor_names[play_id].append(f"{first_name} {last_name}")
+
+        cls.objects.bulk_update(
+            [
+                cls(
+                    id=play_id,
+                    genre_names=genre_names[play_id],
+                    actor_names=actor_names[play_id]
+                )
+                for play_id in play_ids
+            ],
+            ["genre_names", "actor_names"],
+            batch_size=500
+        )
 
     def __str__(self):
         return self.title
 
 
+def _set_bits(field: str, mask: bytes, value: bool):
+    """
+    PostgreSQL expression of the bytea ``field``, zero padded to the
+    length of ``mask``, with the bits of ``mask`` set, or cleared if
+    ``value`` is false.
+    """
+    padded = models.Func(
+        models.Value(bytes(len(mask)), output_field=models.BinaryField()),
+        models.F(field),
+        template="overlay(%(expressions)s from 1)",
+        arg_joiner=" placing ",
+        output_field=models.BinaryField()
+    )
+    expression = padded
+    for index, byte in enumerate(mask):
+        if byte:
+            current = models.Func(
+                padded,
+                models.Value(index),
+                function="get_byte",
+                output_field=models.IntegerField()
+            )
+            expression = models.Func(
+                expression,
+                models.Value(index),
+                current.bitor(byte) if value else current.bitand(~byte & 0xFF),
+                function="set_byte",
+                output_field=models.BinaryField()
+            )
+    return expression
+
+
 class Performance(models.Model):
     play = models.ForeignKey(Play, on_delete=models.CASCADE)
     theatre_hall = models.ForeignKey(TheatreHall, on_delete=models.CASCADE)
     show_time = models.DateTimeField()
+    seat_map = models.BinaryField(default=bytes, editable=False)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [
+            models.Index(
+                fields=["play", "show_time"],
+                name="performance_play_show_time"
+            ),
+            models.Index(
+                fields=["show_time", "id"],
+                name="performance_show_time_id"
+            ),
+        ]
+
+    def get_seat_map(self) -> SeatMap:
+        return SeatMap(
+            self.theatre_hall.rows,
+            self.theatre_hall.seats_in_row,
+            self.seat_map
+        )
+
+    @property
+    def tickets_available(self) -> int:
+        return self.theatre_hall.capacity - self.tickets_sold
+
+    @classmethod
+    def locked_seat_maps(cls, performance_ids) -> dict:
+        """
+        Lock the performance rows until the end of the current
+        transaction and return their seat maps by performance id.
+        """
+        performances = (
+            cls.objects.select_for_update(of=("self",))
+            .select_related("theatre_hall")
+            .filter(id__in=performance_ids)
+        )
+        return {
+            performance.id: performance.get_seat_map()
+            for performance in performances
+        }
+
+    @classmethod
+    def save_seat_maps(cls, seat_maps: dict):
+        for performance_id, seat_map in seat_maps.items():
+            cls.objects.filter(id=performance_id).update(
+                seat_map=bytes(seat_map),
+                tickets_sold=seat_map.taken_count
+            )
+            cache.touch(cls, performance_id)
+
+    @classmethod
+    def occupy_seats(cls, performance, seats):
+        """
+        Mark the ``(row, seat)`` pairs of ``performance`` as sold once the
+        current transaction commits, with a single UPDATE.
+
+        The seat map and ``tickets_sold`` are derived from the tickets,
+        whose unique constraint keeps two bookings of a seat apart, so
+        bookings of one performance do not wait for each other on its
+        row. Until the UPDATE runs the seat map lags behind the tickets;
+        ``manage.py recount_tickets`` repairs it if the UPDATE is lost.
+        """
+        cls._mark_seats_on_commit(performance, seats, True)
+
+    @classmethod
+    def release_seats(cls, performance, seats):
+        """Mark seats as free again, like ``occupy_seats``."""
+        cls._mark_seats_on_commit(performance, seats, False)
+
+    @classmethod
+    def _mark_seats_on_commit(cls, performance, seats, taken: bool):
+        seats = list(seats)
+        transaction.on_commit(
+            lambda: cls._mark_seats(performance, seats, taken)
+        )
+
+    @classmethod
+    def _mark_seats(cls, performance, seats, taken: bool):
+        hall = performance.theatre_hall
+        mask = SeatMap(hall.rows, hall.seats_in_row)
+        seats = [seat for seat in seats if mask.has_seat(*seat)]
+        for row, seat in seats:
+            mask.occupy(row, seat)
+        if not seats:
+            return
+
+        performances = cls.objects.filter(id=performance.id)
+        if connections[performances.db].vendor == "postgresql":
+            sold = mask.taken_count if taken else -mask.taken_count
+            performances.update(
+                seat_map=_set_bits("seat_map", bytes(mask), taken),
+                tickets_sold=models.F("tickets_sold") + sold
+            )
+        else:
+            # SQLite lets one transaction write at a time: writing first
+            # makes this one the writer before it reads the seat map.
+            with transaction.atomic(using=performances.db):
+                if not performances.update(
+                    tickets_sold=models.F("tickets_sold")
+                ):
+                    return
+                seat_map = SeatMap(
+                    hall.rows,
+                    hall.seats_in_row,
+                    performances.values_list("seat_map", flat=True).get()
+                )
+                for row, seat in seats:
+                    if taken:
+                        seat_map.occupy(row, seat)
+                    else:
+                        seat_map.release(row, seat)
+                performances.update(
+                    seat_map=bytes(seat_map),
+                    tickets_sold=seat_map.taken_count
+                )
+        cache.touch(cls, performance.id)
+
+    @classmethod
+    def rebuild_seat_maps(cls, performance_ids):
+        """Recompute seat maps and sold counters from the ticket rows."""
+        with transaction.atomic():
+            seat_maps = {
+                performance_id: SeatMap(seat_map.rows, seat_map.seats_in_row)
+                for performance_id, seat_map in cls.locked_seat_maps(
+                    performance_ids
+                ).items()
+            }
+            tickets = Ticket.objects.filter(
+                performance_id__in=seat_maps
+            ).values_list("performance_id", "row", "seat")
+            for performance_id, row, seat in tickets:
+                seat_map = seat_maps[performance_id]
+                if seat_map.has_seat(row, seat):
+                    seat_map.occupy(row, seat)
+            cls.save_seat_maps(seat_maps)
 
     def __str__(self):
         return self.play.title + " " + str(self.show_time)
@@ -87,6 +314,12 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="reservation_user_created_id"
+            )
+        ]
 
     def __str__(self):
         return str(self.created_at)
@@ -109,6 +342,17 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ["performance", "row", "seat"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored seat, to move it in the seat maps when it changes.
+        instance._loaded_seat = (
+            instance.__dict__.get("performance_id"),
+            instance.__dict__.get("row"),
+            instance.__dict__.get("seat"),
+        )
+        return instance
+
     @staticmethod
     def validate_ticket(
             row: int,
@@ -158,3 +402,66 @@ class Ticket(models.Model):
         return (
             f"{str(self.performance)} (row: {self.row}, seat: {self.seat})"
         )
+
+
+class SeatHold(models.Model):
+    """A seat kept for a customer for a few minutes before they book."""
+
+    performance = models.ForeignKey(
+        Performance,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ["performance", "row", "seat"]
+
+    def __str__(self):
+        return (
+            f"{str(self.performance)} (row: {self.row}, seat: {self.seat}) "
+            f"until {self.expires_at}"
+        )
+
+
+class ImageJob(models.Model):
+    """
+    A play image waiting for its resized variants, drained by
+    ``python manage.py process_images``, see ``theatre.images``.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    play = models.ForeignKey(
+        Play, on_delete=models.CASCADE, related_name="image_jobs"
+    )
+    source = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=7, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="imagejob_status_id")
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
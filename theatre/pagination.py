@@ -0,0 +1,247 @@
+from base64 import b64decode
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    LimitOffsetPagination,
+    _reverse_ordering,
+)
+from rest_framework.utils.urls import replace_query_param
+
+
+async def _alist(queryset) -> list:
+    return [row async for row in queryset]
+
+
+class OptionalCountLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination that skips the ``COUNT(*)`` query when the
+    client passes ``?count=false``. ``count`` is then ``null`` and the
+    next link is derived from fetching one row past the page.
+    """
+
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.count_query_param) != "false":
+            return super().paginate_queryset(queryset, request, view)
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = None
+        self.offset = self.get_offset(request)
+        self.request = request
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+
+        return page[:self.limit]
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` running its queries on the async ORM."""
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+        if request.query_params.get(self.count_query_param) == "false":
+            self.count = None
+            page = await _alist(
+                queryset[self.offset:self.offset + self.limit + 1]
+            )
+            self.has_next = len(page) > self.limit
+            return page[:self.limit]
+
+        self.count = await queryset.acount()
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return await _alist(queryset[self.offset:self.offset + self.limit])
+
+    def paginate_queryset_lazily(self, queryset, request, view=None):
+        """
+        Like ``paginate_queryset``, but return the page as a sliced,
+        unevaluated queryset that can be iterated in chunks.
+        """
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+        if request.query_params.get(self.count_query_param) != "false":
+            self.count = self.get_count(queryset)
+        else:
+            self.count = None
+            self.has_next = queryset[self.offset + self.limit:].exists()
+
+        return queryset[self.offset:self.offset + self.limit]
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+
+        offset = self.offset + self.limit
+        return replace_query_param(url, self.offset_query_param, offset)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        return response_schema
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the model ordering with an ``id``
+    tie-breaker; pages cost the same at any depth and never count rows.
+    The cursor holds the whole ordering key of the boundary row, so rows
+    sharing the leading value are sought by ``id`` rather than skipped
+    with an OFFSET.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    # DRF's paginate_queryset, split around its one query so that the
+    # query can also run on the async ORM.
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(await _alist(queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the unevaluated queryset of the page plus one row."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            if len(current_position) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self.seek(current_position, reverse))
+
+        self._page_cursor = offset, reverse, current_position
+        return queryset[offset:offset + self.page_size + 1]
+
+    def seek(self, position, reverse) -> Q:
+        """
+        Match the rows after ``position`` in the page direction: the row
+        comparison ``(a, b, id) > (x, y, pk)`` spelled out as
+        ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > pk)``.
+        """
+        seek = Q()
+        equal = {}
+        for order, value in zip(self.ordering, position):
+            attr = order.lstrip("-")
+            lookup = "__lt" if reverse != order.startswith("-") else "__gt"
+            seek |= Q(**equal, **{attr + lookup: value})
+            equal[attr] = value
+        return seek
+
+    def decode_cursor(self, request):
+        """
+        Read a cursor holding one position value per ordering field.
+        The position of a row is unique, so the offset is always 0.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        position = tokens.get("p")
+        if position is not None:
+            position = tuple(position)
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        attrs = [order.lstrip("-") for order in ordering]
+        if isinstance(instance, dict):
+            return tuple(str(instance[attr]) for attr in attrs)
+        return tuple(str(getattr(instance, attr)) for attr in attrs)
+
+    def set_page(self, results) -> list:
+        """Take the page and the cursor positions from the fetched rows."""
+        offset, reverse, current_position = self._page_cursor
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class PerformanceCursorPagination(KeysetPagination):
+    ordering = ("-show_time", "-id")
+
+
+class PlayCursorPagination(KeysetPagination):
+    ordering = ("title", "id")
+
+
+class ReservationCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,41 @@
+class QueryPlan:
+    """
+    Relations a serializer reads, declared next to its fields so the
+    viewset can load them up front instead of lazily per object.
+
+    With ``values`` the queryset yields dicts of just those columns, for
+    serializers that need no model instances at all.
+    """
+
+    def __init__(
+        self, select_related=(), prefetch_related=(), defer=(), values=()
+    ):
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.defer = tuple(defer)
+        self.values = tuple(values)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.defer:
+            queryset = queryset.defer(*self.defer)
+        if self.values:
+            queryset = queryset.values(*self.values)
+
+        return queryset
+
+
+class QueryPlanMixin:
+    """Applies the ``query_plan`` of the action's serializer class."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query_plan = getattr(self.get_serializer_class(), "query_plan", None)
+
+        if query_plan is None:
+            return queryset
+
+        return query_plan.apply(queryset)
@@ -0,0 +1,83 @@
+"""
+JSON renderers.
+
+``FastJSONRenderer`` encodes with ``orjson`` when it is installed and
+the output would be the same as the stdlib encoder's (compact, UTF-8),
+otherwise it is the stock DRF renderer. ``StreamingJSONRenderer`` also
+renders list pages incrementally for ``StreamingListModelMixin``.
+``PrometheusRenderer`` renders instrumentation metrics as text.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from theatre import instrumentation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Datetimes and anything orjson cannot encode go through the DRF
+        # encoder, so values render exactly as with the stdlib.
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    streaming = True
+
+    def render_stream(self, envelope, batches):
+        """
+        Yield compact JSON of ``envelope`` with ``results`` (rendered
+        last) made of the items of ``batches``, one batch of serialized
+        items at a time. Without an envelope the items form a bare list.
+        """
+        if envelope is None:
+            head = b"["
+            tail = b"]"
+        else:
+            envelope = {
+                key: value
+                for key, value in envelope.items()
+                if key != "results"
+            }
+            head = self.render(envelope)[:-1]
+            head += b',"results":[' if envelope else b'"results":['
+            tail = b"]}"
+
+        yield head
+        separator = b""
+        for batch in batches:
+            if batch:
+                yield separator + self.render(batch)[1:-1]
+                separator = b","
+        yield tail
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"  # noqa: VNE003
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or "views" not in data:
+            # Errors, such as a denied permission.
+            return f"# {data}\n".encode()
+        return instrumentation.prometheus_text(data).encode()
@@ -0,0 +1,141 @@
+"""
+Ranked play search over titles and descriptions.
+
+On PostgreSQL the database does the work with ``pg_trgm`` word
+similarity, served by the trigram GIN indexes of migration 0011. Other
+databases fall back to an inverted index kept in process memory, rebuilt
+whenever the ``Play`` version stamp of ``theatre.cache`` changes.
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from theatre import cache
+from theatre.models import Play
+
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.5
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    return _WORD_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """Maps each word to the plays using it and the weight of its field."""
+
+    __slots__ = ("postings", "words")
+
+    def __init__(self, plays):
+        postings = defaultdict(dict)
+        for play_id, title, description in plays:
+            for weight, text in (
+                (DESCRIPTION_WEIGHT, description),
+                (TITLE_WEIGHT, title),
+            ):
+                for word in tokenize(text):
+                    postings[word][play_id] = weight
+
+        self.postings = dict(postings)
+        self.words = sorted(postings)
+
+    def _words_starting_with(self, prefix: str):
+        start = bisect_left(self.words, prefix)
+        for word in islice(self.words, start, None):
+            if not word.startswith(prefix):
+                break
+            yield word
+
+    def search(self, query: str) -> dict:
+        """
+        Return ``{play id: rank}`` of the plays having a word starting
+        with every word of ``query``. Exact words and title words rank
+        higher than word prefixes and description words.
+        """
+        ranks = None
+        for term in set(tokenize(query)):
+            term_ranks = {}
+            for word in self._words_starting_with(term):
+                closeness = len(term) / len(word)
+                for play_id, weight in self.postings[word].items():
+                    term_ranks[play_id] = max(
+                        term_ranks.get(play_id, 0), weight * closeness
+                    )
+
+            if ranks is None:
+                ranks = term_ranks
+            else:
+                ranks = {
+                    play_id: rank + term_ranks[play_id]
+                    for play_id, rank in ranks.items()
+                    if play_id in term_ranks
+                }
+
+        return ranks or {}
+
+
+_index = None
+
+
+def get_index() -> InvertedIndex:
+    global _index
+
+    version = cache.get_version(Play)
+    if _index is None or _index[0] != version:
+        _index = (
+            version,
+            InvertedIndex(
+                Play.objects.values_list("id", "title", "description")
+                .iterator()
+            ),
+        )
+
+    return _index[1]
+
+
+def _rank_in_database(queryset, query: str):
+    return queryset.filter(
+        Q(title__trigram_word_similar=query)
+        | Q(description__trigram_word_similar=query)
+    ).annotate(
+        search_rank=Greatest(
+            TrigramWordSimilarity(query, "title") * TITLE_WEIGHT,
+            TrigramWordSimilarity(query, "description") * DESCRIPTION_WEIGHT
+        )
+    )
+
+
+def _rank_in_process(queryset, query: str):
+    ranks = get_index().search(query)
+
+    return queryset.filter(id__in=ranks).annotate(
+        search_rank=Case(
+            *(
+                When(id=play_id, then=Value(rank))
+                for play_id, rank in ranks.items()
+            ),
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    )
+
+
+def search_plays(queryset, query: str):
+    """
+    Filter ``queryset`` of plays to those matching ``query``, annotated
+    with ``search_rank`` and ordered best match first.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        queryset = _rank_in_database(queryset, query)
+    else:
+        queryset = _rank_in_process(queryset, query)
+
+    return queryset.order_by("-search_rank", "title", "id")
@@ -0,0 +1,58 @@
+import base64
+
+
+class SeatMap:
+    """
+    Packed occupancy bitmap of a theatre hall, one bit per seat.
+
+    Seat (row, seat) maps to bit index
+    ``(row - 1) * seats_in_row + (seat - 1)``, stored least significant
+    bit first: bit ``i`` lives in byte ``i // 8`` under mask ``1 << i % 8``.
+    """
+
+    __slots__ = ("rows", "seats_in_row", "_bits")
+
+    def __init__(self, rows: int, seats_in_row: int, data: bytes = b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self._bits = bytearray(bytes(data)[:size]).ljust(size, b"\0")
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def taken_count(self) -> int:
+        return int.from_bytes(self._bits, "little").bit_count()
+
+    @property
+    def available_count(self) -> int:
+        return self.capacity - self.taken_count
+
+    def has_seat(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _position(self, row: int, seat: int):
+        if not self.has_seat(row, seat):
+            raise IndexError(f"Seat ({row}, {seat}) is not in the hall")
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 1 << (index & 7)
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        byte, mask = self._position(row, seat)
+        return bool(self._bits[byte] & mask)
+
+    def occupy(self, row: int, seat: int):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] |= mask
+
+    def release(self, row: int, seat: int):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] &= ~mask
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self._bits).decode()
+
+    def __bytes__(self):
+        return bytes(self._bits)
@@ -1,7 +1,16 @@
+import os
+from collections import defaultdict
+
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
 
+from theatre import cache, exporter, holds, images, importer
 from theatre.models import (
     Actor,
     Genre,
@@ -11,6 +20,18 @@ from theatre.models import (
     Play,
     Reservation
 )
+from theatre.query_plan import QueryPlan
+
+
+SEAT_FIELDS = ("performance", "row", "seat")
+
+
+def ticket_seats(tickets) -> list:
+    """``(performance_id, row, seat)`` of validated ticket data."""
+    return [
+        (ticket["performance"].id, ticket["row"], ticket["seat"])
+        for ticket in tickets
+    ]
 
 
 class ActorSerializer(serializers.ModelSerializer):
@@ -35,35 +56,107 @@ class TheatreHallSerializer(serializers.ModelSerializer):
 
 
 class PlaySerializer(serializers.ModelSerializer):
+    query_plan = QueryPlan(prefetch_related=["genres", "actors"])
 
     class Meta:
         model = Play
         fields = ["id", "title", "image", "description", "genres", "actors", ]
 
 
+class StoredImageField(serializers.ImageField):
+    """Also renders bare storage names, as read with ``values()``."""
+
+    def to_representation(self, value):
+        if isinstance(value, str) and value:
+            model_field = self.parent.Meta.model._meta.get_field(self.source)
+            value = model_field.attr_class(None, model_field, value)
+
+        return super().to_representation(value)
+
+
+@extend_schema_field(
+    {"type": "object", "additionalProperties": OpenApiTypes.URI}
+)
+class ImageVariantsField(serializers.Field):
+    """
+    URLs of the WebP variants of an image by variant name, ``null``
+    until ``process_images`` has made them, see ``theatre.images``.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return images.variant_urls(value, self.context.get("request"))
+
+    def row_transform(self):
+        return images.variant_urls
+
+
 class PlayListSerializer(PlaySerializer):
-    genres = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="name"
+    """
+    Renders the denormalized genre and actor names, so a page of plays
+    is read with a single ``values()`` query.
+    """
+
+    genres = serializers.ListField(
+        source="genre_names",
+        child=serializers.CharField(),
+        read_only=True
     )
-    actors = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="full_name"
+    actors = serializers.ListField(
+        source="actor_names",
+        child=serializers.CharField(),
+        read_only=True
     )
+    image = StoredImageField(read_only=True)
+    image_variants = ImageVariantsField()
+    query_plan = QueryPlan(
+        values=[
+            "id",
+            "title",
+            "image",
+            "image_variants",
+            "description",
+            "genre_names",
+            "actor_names",
+        ]
+    )
+
+    class Meta:
+        model = Play
+        fields = [
+            "id",
+            "title",
+            "image",
+            "image_variants",
+            "description",
+            "genres",
+            "actors",
+        ]
 
 
 class PlayDetailSerializer(PlaySerializer):
     genres = GenreSerializer(many=True, read_only=True)
     actors = ActorSerializer(many=True, read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Play
-        fields = ["id", "title", "image", "description", "genres", "actors"]
+        fields = [
+            "id",
+            "title",
+            "image",
+            "image_variants",
+            "description",
+            "genres",
+            "actors",
+        ]
 
 
 class PlayImageSerializer(PlaySerializer):
+    query_plan = None
 
     class Meta:
         model = Play
@@ -79,6 +172,7 @@ class GenrePlaysSerializer(PlayListSerializer):
 
 class GenreDetailSerializer(GenreSerializer):
     plays = GenrePlaysSerializer(read_only=True, many=True)
+    query_plan = QueryPlan(prefetch_related=["plays"])
 
     class Meta:
         model = Genre
@@ -99,6 +193,13 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ["id", "row", "seat", "performance"]
+        extra_kwargs = {
+            "performance": {
+                "queryset": Performance.objects.select_related(
+                    "theatre_hall"
+                )
+            }
+        }
 
 
 class TicketSeatSerializer(TicketSerializer):
@@ -108,6 +209,125 @@ class TicketSeatSerializer(TicketSerializer):
         fields = ["row", "seat"]
 
 
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+    def validate(self, attrs):
+        Ticket.validate_ticket(
+            attrs["row"],
+            attrs["seat"],
+            self.context["performance"].theatre_hall,
+            ValidationError
+        )
+        return attrs
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    seats = SeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+
+class PreloadedPerformanceField(serializers.PrimaryKeyRelatedField):
+    """Resolves performances from a map filled by the parent list."""
+
+    def __init__(self, **kwargs):
+        self.preloaded = {}
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, bool):
+            try:
+                return self.preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return super().to_internal_value(data)
+
+
+class TicketBulkListSerializer(serializers.ListSerializer):
+    """
+    Validates a whole batch of seats with a single query that loads
+    the performances with their halls; taken seats are looked up in
+    the performance seat maps.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.fields["performance"].preloaded = (
+                self._load_performances(data)
+            )
+
+        tickets = super().to_internal_value(data)
+
+        errors = self.repeated_seat_errors(tickets)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        seat_maps = {
+            ticket["performance"].id: ticket["performance"].get_seat_map()
+            for ticket in tickets
+        }
+        taken = {
+            seat for seat in ticket_seats(tickets)
+            if seat_maps[seat[0]].is_taken(*seat[1:])
+        }
+        if taken:
+            raise holds.SeatsTaken(taken, fields=SEAT_FIELDS)
+
+        return tickets
+
+    @staticmethod
+    def _load_performances(data):
+        performance_ids = set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            try:
+                performance_ids.add(int(item.get("performance")))
+            except (TypeError, ValueError):
+                continue
+
+        return Performance.objects.select_related(
+            "theatre_hall"
+        ).in_bulk(performance_ids)
+
+    @staticmethod
+    def repeated_seat_errors(tickets) -> list:
+        """Per-ticket errors for seats listed more than once."""
+        message = UniqueTogetherValidator.message.format(
+            field_names="performance, row, seat"
+        )
+        errors = []
+        seen = set()
+        for seat in ticket_seats(tickets):
+            if seat in seen:
+                errors.append(
+                    {
+                        api_settings.NON_FIELD_ERRORS_KEY: [
+                            serializers.ErrorDetail(message, code="unique")
+                        ]
+                    }
+                )
+            else:
+                seen.add(seat)
+                errors.append({})
+
+        return errors
+
+
+class ReservationTicketSerializer(TicketSerializer):
+    performance = PreloadedPerformanceField(
+        queryset=Performance.objects.select_related("theatre_hall")
+    )
+
+    class Meta:
+        model = Ticket
+        fields = ["id", "row", "seat", "performance"]
+        validators = []
+        list_serializer_class = TicketBulkListSerializer
+
+
 class PerformanceSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -121,6 +341,7 @@ class PerformanceListSerializer(PerformanceSerializer):
         read_only=True
     )
     poster = serializers.ImageField(source="play.image", read_only=True)
+    poster_variants = ImageVariantsField(source="play.image_variants")
     theatre_hall = serializers.CharField(
         source="theatre_hall.name",
         read_only=True
@@ -130,6 +351,19 @@ class PerformanceListSerializer(PerformanceSerializer):
         read_only=True
     )
     tickets_available = serializers.IntegerField(read_only=True)
+    query_plan = QueryPlan(
+        select_related=["play", "theatre_hall"],
+        defer=["seat_map"]
+    )
+    row_expressions = {
+        "theatre_hall_capacity": (
+            F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+        ),
+        "tickets_available": (
+            F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+            - F("tickets_sold")
+        ),
+    }
 
     class Meta:
         model = Performance
@@ -137,6 +371,7 @@ class PerformanceListSerializer(PerformanceSerializer):
             "id",
             "play",
             "poster",
+            "poster_variants",
             "show_time",
             "theatre_hall",
             "theatre_hall_capacity",
@@ -144,22 +379,42 @@ class PerformanceListSerializer(PerformanceSerializer):
         ]
 
 
+class SeatMapField(serializers.Field):
+    """Seat map as a base64 encoded bitmap, see ``theatre.seat_map``."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return value.to_base64()
+
+
 class PerformanceDetailSerializer(PerformanceSerializer):
     play = PlayListSerializer(many=False, read_only=True)
     theatre_hall = TheatreHallSerializer(many=False, read_only=True)
-    taken_places = TicketSeatSerializer(
-        many=True,
-        read_only=True,
-        source="tickets"
-    )
+    tickets_available = serializers.IntegerField(read_only=True)
+    seat_map = SeatMapField(source="get_seat_map")
+    query_plan = QueryPlan(select_related=["play", "theatre_hall"])
 
     class Meta:
         model = Performance
-        fields = ["id", "play", "theatre_hall", "taken_places"]
+        fields = [
+            "id",
+            "play",
+            "theatre_hall",
+            "tickets_available",
+            "seat_map"
+        ]
 
 
 class ReservationSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    tickets = ReservationTicketSerializer(
+        many=True,
+        read_only=False,
+        allow_empty=False
+    )
+    query_plan = QueryPlan(prefetch_related=["tickets"])
 
     class Meta:
         model = Reservation
@@ -168,9 +423,32 @@ class ReservationSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def create(self, validated_data):
         tickets_data = validated_data.pop("tickets")
+        seats = ticket_seats(tickets_data)
+        taken = holds.claim_seats(seats, validated_data["user"])
+        if taken:
+            raise holds.SeatsTaken(taken, fields=SEAT_FIELDS)
+
         reservation = Reservation.objects.create(**validated_data)
+        try:
+            with transaction.atomic():
+                Ticket.objects.bulk_create(
+                    Ticket(reservation=reservation, **ticket_data)
+                    for ticket_data in tickets_data
+                )
+        except IntegrityError:
+            # Booked since validation.
+            raise holds.SeatsTaken(
+                holds.sold(seats) or seats, fields=SEAT_FIELDS
+            )
+        holds.consume_holds(seats, validated_data["user"])
+        seats_by_performance = defaultdict(list)
         for ticket_data in tickets_data:
-            Ticket.objects.create(reservation=reservation, **ticket_data)
+            seats_by_performance[ticket_data["performance"]].append(
+                (ticket_data["row"], ticket_data["seat"])
+            )
+        for performance, performance_seats in seats_by_performance.items():
+            Performance.occupy_seats(performance, performance_seats)
+        cache.touch(Ticket)
         return reservation
 
 
@@ -180,3 +458,54 @@ class TicketListSerializer(TicketSerializer):
 
 class ReservationListSerializer(ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+    query_plan = QueryPlan(
+        prefetch_related=[
+            Prefetch(
+                "tickets",
+                queryset=Ticket.objects.select_related(
+                    "performance__play", "performance__theatre_hall"
+                ).defer("performance__seat_map")
+            )
+        ]
+    )
+
+
+class BulkImportSerializer(serializers.Serializer):
+    upload = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=importer.FORMATS, required=False
+    )
+    skip = serializers.IntegerField(min_value=0, default=0)
+
+    def validate(self, attrs):
+        if "file_format" not in attrs:
+            extension = os.path.splitext(attrs["upload"].name)[1].lstrip(".")
+            if extension not in importer.FORMATS:
+                raise serializers.ValidationError(
+                    {
+                        "file_format": "Give the format, one of "
+                        f"{importer.FORMATS}"
+                    }
+                )
+            attrs["file_format"] = extension
+        return attrs
+
+
+class TicketExportSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    file_format = serializers.ChoiceField(
+        choices=exporter.FORMATS, default="csv"
+    )
+    gzip = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if (
+            "date_from" in attrs
+            and "date_to" in attrs
+            and attrs["date_from"] > attrs["date_to"]
+        ):
+            raise serializers.ValidationError(
+                {"date_to": "Must not be before date_from"}
+            )
+        return attrs
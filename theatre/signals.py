@@ -0,0 +1,216 @@
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from theatre import cache, images
+from theatre.storage import release_blobs
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+VERSIONED_MODELS = (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+
+# Per thread: the seats of reservations being deleted, released once per
+# performance after their tickets are gone, and the performances being
+# deleted, whose seat maps go with them.
+_deleting = threading.local()
+
+
+def _deleting_state():
+    if not hasattr(_deleting, "reservations"):
+        _deleting.reservations = {}
+        _deleting.performances = set()
+    return _deleting
+
+
+def _performance_with_hall(performance_id):
+    return Performance.objects.select_related("theatre_hall").filter(
+        id=performance_id
+    ).first()
+
+
+@receiver(post_save, sender=Ticket)
+def occupy_ticket_seat(sender, instance, created, **kwargs):
+    seat = (instance.performance_id, instance.row, instance.seat)
+    loaded_seat = instance.__dict__.get("_loaded_seat", (None,))
+    if not created and None in loaded_seat:
+        # The stored seat is unknown.
+        Performance.rebuild_seat_maps([instance.performance_id])
+    elif created or loaded_seat != seat:
+        if not created:
+            performance = _performance_with_hall(loaded_seat[0])
+            if performance is not None:
+                Performance.release_seats(performance, [loaded_seat[1:]])
+        Performance.occupy_seats(instance.performance, [seat[1:]])
+    instance._loaded_seat = seat
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    state = _deleting_state()
+    if (
+        instance.reservation_id in state.reservations
+        or instance.performance_id in state.performances
+    ):
+        return
+
+    performance = _performance_with_hall(instance.performance_id)
+    if performance is not None:
+        Performance.release_seats(
+            performance, [(instance.row, instance.seat)]
+        )
+
+
+@receiver(pre_delete, sender=Reservation)
+def remember_reservation_seats(sender, instance, **kwargs):
+    seats = defaultdict(list)
+    tickets = Ticket.objects.filter(reservation=instance).select_related(
+        "performance__theatre_hall"
+    )
+    for ticket in tickets:
+        seats[ticket.performance].append((ticket.row, ticket.seat))
+    _deleting_state().reservations[instance.pk] = seats
+
+
+@receiver(post_delete, sender=Reservation)
+def release_reservation_seats(sender, instance, **kwargs):
+    state = _deleting_state()
+    seats = state.reservations.pop(instance.pk, {})
+    for performance, performance_seats in seats.items():
+        if performance.id not in state.performances:
+            Performance.release_seats(performance, performance_seats)
+
+
+@receiver(pre_delete, sender=Performance)
+def remember_deleted_performance(sender, instance, **kwargs):
+    _deleting_state().performances.add(instance.pk)
+
+
+@receiver(post_delete, sender=Performance)
+def forget_deleted_performance(sender, instance, **kwargs):
+    _deleting_state().performances.discard(instance.pk)
+
+
+@receiver(post_save, sender=Play)
+def queue_play_image(sender, instance, **kwargs):
+    # Runs before release_replaced_play_image updates _loaded_image.
+    if instance.image and instance.image.name != instance.__dict__.get(
+        "_loaded_image"
+    ):
+        images.queue_image(instance)
+
+
+def release_play_images(names):
+    storage = Play._meta.get_field("image").storage
+    transaction.on_commit(lambda: release_blobs(storage, names))
+
+
+@receiver(post_save, sender=Play)
+def release_replaced_play_image(sender, instance, **kwargs):
+    loaded_image = instance.__dict__.get("_loaded_image")
+    current_image = instance.image.name or None
+    if loaded_image and loaded_image != current_image:
+        release_play_images([loaded_image])
+    instance._loaded_image = current_image
+
+
+@receiver(post_delete, sender=Play)
+def release_deleted_play_image(sender, instance, **kwargs):
+    if instance.image:
+        release_play_images([instance.image.name])
+
+
+@receiver(post_save, sender=Performance)
+def rebuild_performance_seat_map(sender, instance, created, **kwargs):
+    if not created:
+        Performance.rebuild_seat_maps([instance.id])
+
+
+@receiver(post_save, sender=TheatreHall)
+def rebuild_hall_seat_maps(sender, instance, created, **kwargs):
+    if not created:
+        Performance.rebuild_seat_maps(
+            instance.performance_set.values_list("id", flat=True)
+        )
+
+
+def refresh_linked_play_summaries(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "pre_clear" and reverse:
+        instance._cleared_play_ids = list(
+            instance.plays.values_list("id", flat=True)
+        )
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if reverse:
+            Play.refresh_summaries(
+                pk_set or instance.__dict__.pop("_cleared_play_ids", ())
+            )
+        else:
+            Play.refresh_summaries([instance.pk])
+            instance.refresh_from_db(fields=["genre_names", "actor_names"])
+
+
+def refresh_tag_play_summaries(sender, instance, created, **kwargs):
+    if not created:
+        Play.refresh_summaries(instance.plays.values_list("id", flat=True))
+
+
+def remember_tag_plays(sender, instance, **kwargs):
+    instance._deleted_play_ids = list(
+        instance.plays.values_list("id", flat=True)
+    )
+
+
+def refresh_deleted_tag_play_summaries(sender, instance, **kwargs):
+    Play.refresh_summaries(instance.__dict__.pop("_deleted_play_ids", ()))
+
+
+def touch_instance(sender, instance, **kwargs):
+    cache.touch(sender, instance.pk)
+
+
+def touch_play_relation(sender, instance, **kwargs):
+    cache.touch(type(instance), instance.pk)
+    cache.touch(Play)
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(touch_instance, sender=model)
+    post_delete.connect(touch_instance, sender=model)
+
+m2m_changed.connect(touch_play_relation, sender=Play.genres.through)
+m2m_changed.connect(touch_play_relation, sender=Play.actors.through)
+
+for relation in (Play.genres, Play.actors):
+    m2m_changed.connect(
+        refresh_linked_play_summaries, sender=relation.through
+    )
+
+for model in (Genre, Actor):
+    post_save.connect(refresh_tag_play_summaries, sender=model)
+    pre_delete.connect(remember_tag_plays, sender=model)
+    post_delete.connect(refresh_deleted_tag_play_summaries, sender=model)
@@ -0,0 +1,130 @@
+"""
+Content-addressed storage for play images.
+
+``ContentAddressedStorage.save`` streams the upload into a temporary
+file in chunks while hashing it, then moves it to
+``<upload dir>/<aa>/<sha256><ext>``. The same bytes uploaded for any
+number of plays are stored once, and a name never changes content, so
+it may be cached forever (see ``theatre.media``).
+
+A blob is referenced by every ``Play`` whose ``image`` is its name.
+Replacing or deleting an image releases the old blob, which is deleted
+once nothing references it; ``python manage.py collect_media`` deletes
+orphans left behind by anything that bypasses the signals. Blobs written
+or re-uploaded within ``GRACE_PERIOD`` are kept, so an upload that is
+not saved on its play yet is never collected.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.utils.deconstruct import deconstructible
+
+CHUNK_SIZE = 64 * 1024
+GRACE_PERIOD = timedelta(hours=1)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+BLOB_NAME = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$")
+
+
+def is_blob(name: str) -> bool:
+    return bool(BLOB_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def blob_name(self, name: str, digest: str) -> str:
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower().lstrip(".")
+        filename = f"{digest}.{ext}" if ext else digest
+        return os.path.join(directory, digest[:2], filename).replace(
+            "\\", "/"
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        directory = os.path.dirname(self.path(name))
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=directory, prefix=".upload-"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as temporary_file:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temporary_file.write(chunk)
+
+            blob_name = self.blob_name(name, digest.hexdigest())
+            validate_file_name(blob_name, allow_relative_path=True)
+            blob_path = self.path(blob_name)
+            if os.path.exists(blob_path):
+                # Restart the grace period of a blob that is in use again.
+                os.utime(blob_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temporary_path, self.file_permissions_mode)
+                os.replace(temporary_path, blob_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        return blob_name
+
+    def is_recent(self, name: str) -> bool:
+        try:
+            modified = os.path.getmtime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return time.time() - modified < GRACE_PERIOD.total_seconds()
+
+    def blobs(self, directory=""):
+        """Yield the names of all blobs below ``directory``."""
+        root = self.path(directory)
+        for path, _, filenames in os.walk(root):
+            relative = os.path.relpath(path, self.location)
+            for filename in filenames:
+                name = os.path.join(relative, filename).replace("\\", "/")
+                if is_blob(name):
+                    yield name
+
+
+def _referenced(names) -> set:
+    from theatre.models import Play
+
+    return set(
+        Play.objects.filter(image__in=list(names)).values_list(
+            "image", flat=True
+        )
+    )
+
+
+def release_blobs(storage, names, dry_run: bool = False) -> list:
+    """
+    Delete the blobs of ``names`` that no play references and that were
+    not written within the grace period. Return the deleted names.
+    """
+    names = {name for name in names if name and is_blob(name)}
+    if not names:
+        return []
+
+    deleted = []
+    for name in sorted(names - _referenced(names)):
+        if not storage.is_recent(name):
+            if not dry_run:
+                storage.delete(name)
+            deleted.append(name)
+
+    return deleted
@@ -0,0 +1,54 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework import mixins
+
+
+def _batches(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class StreamingListModelMixin(mixins.ListModelMixin):
+    """
+    Streams list responses when the negotiated renderer can, e.g.
+    ``StreamingJSONRenderer``: rows are read with ``iterator()`` and
+    serialized ``stream_chunk_size`` at a time, so a page of any size
+    keeps memory bounded. Other renderers get the regular response.
+
+    Paginators need a ``paginate_queryset_lazily`` method, as on
+    ``OptionalCountLimitOffsetPagination``, to be streamed.
+    """
+
+    stream_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        paginator = self.paginator
+        if not getattr(renderer, "streaming", False) or not (
+            paginator is None
+            or hasattr(paginator, "paginate_queryset_lazily")
+        ):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        envelope = None
+        if paginator is not None:
+            page = paginator.paginate_queryset_lazily(
+                queryset, request, view=self
+            )
+            if page is not None:
+                queryset = page
+                envelope = paginator.get_paginated_response([]).data
+
+        return StreamingHttpResponse(
+            renderer.render_stream(envelope, self._serialized(queryset)),
+            content_type=renderer.media_type
+        )
+
+    def _serialized(self, queryset):
+        context = self.get_serializer_context()
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        for batch in _batches(rows, self.stream_chunk_size):
+            yield self.get_serializer(batch, many=True, context=context).data
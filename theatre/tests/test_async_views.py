@@ -0,0 +1,121 @@
+from datetime import datetime
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.cache import get_cache
+from theatre.models import Genre, Performance, Play, TheatreHall
+from theatre.urls import async_urlpatterns
+from user.authentication import ClaimsRefreshToken
+
+PLAY_URL = reverse("theatre-api:play-list")
+PERFORMANCE_URL = reverse("theatre-api:performance-list")
+PLAY_LIST, PERFORMANCE_LIST, PERFORMANCE_DETAIL = (
+    pattern.callback for pattern in async_urlpatterns
+)
+
+
+class AsyncReadViewTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.authorization = (
+            f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}"
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+        hall = TheatreHall.objects.create(name="Main", rows=5, seats_in_row=4)
+        drama = Genre.objects.create(name="Drama")
+        for day in range(1, 5):
+            play = Play.objects.create(
+                title=f"Play {day}", description="Kings and ghosts"
+            )
+            play.genres.add(drama)
+            self.performance = Performance.objects.create(
+                play=play,
+                theatre_hall=hall,
+                show_time=timezone.make_aware(datetime(2023, 8, day, 19))
+            )
+        self.performance_id = self.performance.id
+
+    def call_async(self, view, url, data=None, **kwargs):
+        request = RequestFactory().get(
+            url, data, HTTP_AUTHORIZATION=self.authorization, **kwargs
+        )
+        path_kwargs = {}
+        if view is PERFORMANCE_DETAIL:
+            path_kwargs["pk"] = str(self.performance_id)
+        return async_to_sync(view)(request, **path_kwargs)
+
+    def assert_same_response(self, view, url, data=None):
+        sync_response = self.client.get(url, data)
+        async_response = self.call_async(view, url, data)
+
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(async_response["ETag"], sync_response["ETag"])
+
+    def test_play_list(self):
+        self.assert_same_response(PLAY_LIST, PLAY_URL, {"page_size": 2})
+
+    def test_play_search(self):
+        self.assert_same_response(PLAY_LIST, PLAY_URL, {"search": "ghost"})
+
+    def test_performance_list_follows_cursor(self):
+        first = self.client.get(PERFORMANCE_URL, {"page_size": 3})
+
+        self.assert_same_response(
+            PERFORMANCE_LIST, first.data["next"].replace("testserver", "")
+        )
+
+    def test_performance_detail(self):
+        self.assert_same_response(
+            PERFORMANCE_DETAIL,
+            reverse(
+                "theatre-api:performance-detail", args=[self.performance.id]
+            )
+        )
+
+    def test_unknown_performance_is_not_found(self):
+        self.performance.delete()
+
+        res = self.call_async(PERFORMANCE_DETAIL, "/")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_anonymous_is_rejected(self):
+        self.authorization = ""
+
+        res = self.call_async(PERFORMANCE_LIST, PERFORMANCE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.call_async(PERFORMANCE_LIST, PERFORMANCE_URL)["ETag"]
+
+        res = self.call_async(
+            PERFORMANCE_LIST, PERFORMANCE_URL, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_go_to_the_drf_view(self):
+        request = RequestFactory().delete(
+            "/", HTTP_AUTHORIZATION=self.authorization
+        )
+
+        res = async_to_sync(PERFORMANCE_DETAIL)(
+            request, pk=str(self.performance.id)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
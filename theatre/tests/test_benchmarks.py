@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+
+from theatre.benchmarks import compare
+
+
+def report(queries, p95_ms):
+    return {
+        "endpoints": {
+            "theatre-api:play-list": {"queries": queries, "p95_ms": p95_ms}
+        }
+    }
+
+
+class CompareTest(SimpleTestCase):
+    def test_same_numbers_pass(self):
+        self.assertEqual(compare(report(3, 10.0), report(3, 10.0)), [])
+
+    def test_extra_query_fails(self):
+        self.assertEqual(
+            compare(report(3, 10.0), report(4, 10.0)),
+            ["theatre-api:play-list: 3 -> 4 queries"]
+        )
+
+    def test_query_threshold_allows_extra_queries(self):
+        self.assertEqual(
+            compare(report(3, 10.0), report(4, 10.0), query_threshold=1), []
+        )
+
+    def test_latency_regression_fails(self):
+        self.assertEqual(
+            compare(report(3, 10.0), report(3, 20.0)),
+            ["theatre-api:play-list: p95 10.0ms -> 20.0ms"]
+        )
+
+    def test_jitter_on_fast_endpoints_is_ignored(self):
+        self.assertEqual(compare(report(3, 1.0), report(3, 1.9)), [])
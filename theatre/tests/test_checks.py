@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from theatre.checks import check_performance_settings, warn_at_startup
+
+
+def warning_ids():
+    return [warning.id for warning in check_performance_settings(None)]
+
+
+@override_settings(
+    DJANGO_PROFILE="production",
+    DEBUG=False,
+    ALLOWED_HOSTS=["theatre.example.com"],
+    INSTALLED_APPS=[
+        app for app in settings.INSTALLED_APPS if app != "debug_toolbar"
+    ],
+    CACHES={
+        **settings.CACHES,
+        "shared": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/theatre-cache",
+        },
+    },
+    THEATRE_RESPONSE_CACHE_ALIAS="shared",
+    THEATRE_THROTTLE_DB="/tmp/throttle.sqlite3",
+    MEDIA_SERVE_MODE="x-accel-redirect",
+)
+class PerformanceChecksTest(SimpleTestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.dict(
+            connection.settings_dict,
+            {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_production_profile_passes(self):
+        self.assertEqual(warning_ids(), [])
+
+    @override_settings(DJANGO_PROFILE="development", DEBUG=True)
+    def test_development_is_not_checked(self):
+        self.assertEqual(warning_ids(), [])
+
+    def test_debug_and_toolbar(self):
+        with override_settings(
+            DEBUG=True,
+            INSTALLED_APPS=[*settings.INSTALLED_APPS, "debug_toolbar"]
+        ):
+            self.assertEqual(warning_ids(), ["theatre.W001", "theatre.W002"])
+
+    def test_connections(self):
+        connection.settings_dict["CONN_HEALTH_CHECKS"] = False
+        self.assertEqual(warning_ids(), ["theatre.W004"])
+
+        connection.settings_dict["CONN_MAX_AGE"] = 0
+        self.assertEqual(warning_ids(), ["theatre.W003"])
+        with override_settings(THEATRE_ASYNC_READS=True):
+            self.assertEqual(warning_ids(), [])
+
+    def test_uncached_templates(self):
+        templates = [
+            {
+                **settings.TEMPLATES[0],
+                "APP_DIRS": False,
+                "OPTIONS": {
+                    "loaders": ["django.template.loaders.filesystem.Loader"]
+                },
+            }
+        ]
+        with override_settings(TEMPLATES=templates):
+            self.assertEqual(warning_ids(), ["theatre.W005"])
+
+    def test_query_logging(self):
+        logging = {
+            "version": 1,
+            "loggers": {"django.db.backends": {"level": "DEBUG"}},
+        }
+        with override_settings(LOGGING=logging):
+            self.assertEqual(warning_ids(), ["theatre.W006"])
+
+    @override_settings(
+        THEATRE_THROTTLE_DB="",
+        THEATRE_INSTRUMENTATION_SAMPLE_RATE=0.5,
+        MEDIA_SERVE_MODE="django",
+    )
+    def test_process_local_throttles_sampling_and_media(self):
+        self.assertEqual(
+            warning_ids(), ["theatre.W007", "theatre.W008", "theatre.W009"]
+        )
+
+    @override_settings(THEATRE_RESPONSE_CACHE_ALIAS="default")
+    def test_process_local_response_cache_is_an_error(self):
+        errors = [
+            message for message in check_performance_settings(None)
+            if message.is_serious()
+        ]
+
+        self.assertEqual([error.id for error in errors], ["theatre.E001"])
+        with self.assertLogs("theatre.checks", "WARNING"):
+            with self.assertRaisesMessage(
+                ImproperlyConfigured, "theatre.E001"
+            ):
+                warn_at_startup()
+
+    @override_settings(ALLOWED_HOSTS=[])
+    def test_empty_allowed_hosts_is_an_error(self):
+        self.assertEqual(warning_ids(), ["theatre.E002"])
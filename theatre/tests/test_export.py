@@ -0,0 +1,121 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.exporter import COLUMNS, export_tickets
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+EXPORT_URL = reverse("theatre-api:ticket-export")
+
+
+class TicketExportTest(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test12345pass",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        hall = TheatreHall.objects.create(name="Main", rows=5, seats_in_row=5)
+        play = Play.objects.create(title="Hamlet")
+        reservation = Reservation.objects.create(user=self.user)
+        for day, seats in ((1, 3), (2, 2), (5, 1)):
+            performance = Performance.objects.create(
+                play=play,
+                theatre_hall=hall,
+                show_time=timezone.make_aware(datetime(2023, 8, day, 19))
+            )
+            for seat in range(1, seats + 1):
+                Ticket.objects.create(
+                    performance=performance,
+                    reservation=reservation,
+                    row=1,
+                    seat=seat
+                )
+
+    def test_csv_in_date_range(self):
+        content = b"".join(
+            export_tickets(
+                "csv", date(2023, 8, 1), date(2023, 8, 2), chunk_size=2
+            )
+        )
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(list(rows[0]), list(COLUMNS))
+        self.assertEqual(rows[0]["play"], "Hamlet")
+        self.assertEqual(rows[0]["theatre_hall"], "Main")
+
+    def test_column_chunks(self):
+        lines = b"".join(export_tickets("columns", chunk_size=4)).splitlines()
+        chunks = [json.loads(line) for line in lines]
+
+        self.assertEqual([len(chunk["seat"]) for chunk in chunks], [4, 2])
+        self.assertEqual(chunks[0]["seat"], [1, 2, 3, 1])
+
+    def test_endpoint_streams_gzipped_jsonl(self):
+        res = self.client.get(
+            EXPORT_URL,
+            {"date_from": "2023-08-05", "file_format": "jsonl", "gzip": True}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertIn("tickets.jsonl.gz", res["Content-Disposition"])
+        records = [
+            json.loads(line)
+            for line in gzip.decompress(res.getvalue()).splitlines()
+        ]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["seat"], 1)
+
+    def test_endpoint_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@test.com", "test12345pass"
+            )
+        )
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reversed_date_range_is_rejected(self):
+        res = self.client.get(
+            EXPORT_URL, {"date_from": "2023-08-02", "date_to": "2023-08-01"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tickets.csv.gz")
+            call_command(
+                "export_tickets", "--to", "2023-08-01", "--gzip", "-o", path,
+                stderr=StringIO()
+            )
+            with gzip.open(path, "rt") as export_file:
+                rows = list(csv.DictReader(export_file))
+
+        self.assertEqual(len(rows), 3)
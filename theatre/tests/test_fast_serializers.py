@@ -0,0 +1,171 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from theatre.cache import get_cache
+from theatre.fast_serializers import RowConverter
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.serializers import (
+    PerformanceListSerializer,
+    PlayDetailSerializer,
+    PlayListSerializer,
+    ReservationListSerializer,
+)
+
+
+class RowConverterParityTest(TestCase):
+    """The fast path renders the same JSON bytes as the serializers."""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.request = Request(APIRequestFactory().get("/"))
+        hall = TheatreHall.objects.create(
+            name="Main", rows=5, seats_in_row=8
+        )
+        small_hall = TheatreHall.objects.create(
+            name="Small", rows=2, seats_in_row=3
+        )
+
+        hamlet = Play.objects.create(title="Hamlet", description="Denmark")
+        hamlet.genres.add(
+            Genre.objects.create(name="Tragedy"),
+            Genre.objects.create(name="Drama")
+        )
+        hamlet.actors.add(
+            Actor.objects.create(first_name="Ann", last_name="Lee"),
+            Actor.objects.create(first_name="Bob", last_name="Ray")
+        )
+        Play.objects.filter(id=hamlet.id).update(
+            image="uploads/plays/hamlet-poster.jpg"
+        )
+        lear = Play.objects.create(title="Lear", description="Britain")
+
+        show_time = timezone.make_aware(datetime(2023, 8, 1, 19, 30, 15))
+        performances = [
+            Performance.objects.create(
+                play=play, theatre_hall=theatre_hall, show_time=show_time
+            )
+            for play, theatre_hall in (
+                (hamlet, hall),
+                (lear, small_hall),
+                (hamlet, small_hall),
+            )
+        ]
+
+        for index, performance in enumerate(performances):
+            reservation = Reservation.objects.create(user=self.user)
+            for seat in range(1, index + 2):
+                Ticket.objects.create(
+                    performance=performance,
+                    reservation=reservation,
+                    row=1,
+                    seat=seat
+                )
+        Reservation.objects.create(user=self.user)
+
+    def assert_same_json(self, serializer_class, queryset):
+        context = {"request": self.request}
+        expected = serializer_class(
+            serializer_class.query_plan.apply(queryset),
+            many=True,
+            context=context
+        ).data
+        converter = RowConverter.for_serializer(serializer_class)
+        actual = converter.convert(converter.values(queryset), self.request)
+
+        self.assertEqual(
+            JSONRenderer().render(actual), JSONRenderer().render(expected)
+        )
+
+    def test_play_list(self):
+        self.assert_same_json(PlayListSerializer, Play.objects.all())
+
+    def test_performance_list(self):
+        self.assert_same_json(
+            PerformanceListSerializer, Performance.objects.all()
+        )
+
+    def test_reservation_list_with_nested_tickets(self):
+        self.assert_same_json(
+            ReservationListSerializer, Reservation.objects.all()
+        )
+
+    def test_unsupported_serializer_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            RowConverter(PlayDetailSerializer())
+
+    def test_property_without_row_expression_is_rejected(self):
+        class HallSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = TheatreHall
+                fields = ["id", "capacity"]
+
+        with self.assertRaises(ImproperlyConfigured):
+            RowConverter(HallSerializer())
+
+
+class FastListEndpointTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+        performance = Performance.objects.create(
+            play=Play.objects.create(title="Play"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Main", rows=2, seats_in_row=3
+            ),
+            show_time=timezone.make_aware(datetime(2023, 8, 1, 19))
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                Ticket.objects.create(
+                    performance=performance,
+                    reservation=Reservation.objects.create(user=self.user),
+                    row=1,
+                    seat=Ticket.objects.count() + 1
+                )
+
+    def test_reservation_page_takes_two_queries(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(reverse("theatre-api:reservation-list"))
+
+        self.assertEqual(len(res.data["results"]), 3)
+        self.assertEqual(
+            res.data["results"][0]["tickets"][0]["performance"][
+                "tickets_available"
+            ],
+            3
+        )
+
+    def test_cursor_pagination_follows_rows(self):
+        url = reverse("theatre-api:reservation-list")
+
+        first = self.client.get(url, {"page_size": 2})
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(len(second.data["results"]), 1)
+        self.assertIsNone(second.data["next"])
@@ -0,0 +1,140 @@
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from rest_framework.test import APIClient
+
+from theatre.cache import get_cache
+from theatre.images import get_storage, process_pending
+from theatre.models import ImageJob, Play
+
+PLAY_URL = reverse("theatre-api:play-list")
+
+
+def sample_jpeg(size=(1200, 800), name="poster.jpg", color="red"):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, format="JPEG", exif=exif)
+    return SimpleUploadedFile(name, output.getvalue(), "image/jpeg")
+
+
+@override_settings(
+    PLAY_IMAGE_VARIANTS={"thumbnail": 320, "full": None}
+)
+class PlayImageProcessingTest(TestCase):
+    def setUp(self) -> None:
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "test@test.com", "test12345pass"
+            )
+        )
+        self.play = Play.objects.create(title="Hamlet")
+
+    def upload(self, image):
+        self.play.image = image
+        self.play.save()
+
+    def test_saving_an_image_queues_one_job(self):
+        self.upload(sample_jpeg())
+        self.play.save()
+
+        self.assertEqual(
+            list(ImageJob.objects.values_list("status", flat=True)),
+            [ImageJob.PENDING]
+        )
+
+    def test_variants_are_resized_webp_without_metadata(self):
+        self.upload(sample_jpeg())
+
+        self.assertEqual(process_pending(), 1)
+
+        self.play.refresh_from_db()
+        self.assertEqual(list(self.play.image_variants), ["thumbnail", "full"])
+        with get_storage().open(self.play.image_variants["thumbnail"]) as file:
+            thumbnail = Image.open(file)
+            thumbnail.load()
+        self.assertEqual(thumbnail.format, "WEBP")
+        self.assertEqual(thumbnail.size, (320, 213))
+        self.assertFalse(thumbnail.getexif())
+        self.assertEqual(ImageJob.objects.get().status, ImageJob.DONE)
+
+    def test_list_exposes_variant_urls(self):
+        self.upload(sample_jpeg())
+
+        before = self.client.get(PLAY_URL).data["results"][0]
+        process_pending()
+        after = self.client.get(PLAY_URL).data["results"][0]
+
+        self.assertEqual(
+            before["image_variants"], {"thumbnail": None, "full": None}
+        )
+        self.assertTrue(
+            after["image_variants"]["thumbnail"].endswith(
+                "-thumbnail.webp"
+            )
+        )
+        self.assertTrue(
+            after["image_variants"]["thumbnail"].startswith("http://")
+        )
+
+    def test_replaced_image_drops_old_variants(self):
+        self.upload(sample_jpeg())
+        process_pending()
+        self.play.refresh_from_db()
+        old_variants = self.play.image_variants
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(sample_jpeg(name="new.jpg", color="blue"))
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.image_variants, {})
+        process_pending()
+
+        self.play.refresh_from_db()
+        self.assertNotEqual(self.play.image_variants, old_variants)
+        for name in old_variants.values():
+            self.assertFalse(get_storage().exists(name))
+
+    def test_restored_image_is_queued_again(self):
+        self.upload(sample_jpeg())
+        first_name = self.play.image.name
+        process_pending()
+        self.upload(sample_jpeg(name="new.jpg", color="blue"))
+        process_pending()
+
+        self.play.image = first_name
+        self.play.save()
+
+        self.assertEqual(
+            list(
+                ImageJob.objects.order_by("id").values_list(
+                    "source", "status"
+                )
+            )[-1],
+            (first_name, ImageJob.PENDING)
+        )
+        self.assertEqual(self.play.image_variants, {})
+
+    def test_broken_image_fails_after_retries(self):
+        self.upload(SimpleUploadedFile("broken.jpg", b"not an image"))
+
+        process_pending()
+
+        job = ImageJob.objects.get()
+        self.assertEqual(job.status, ImageJob.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIn("UnidentifiedImageError", job.error)
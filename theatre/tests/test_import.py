@@ -0,0 +1,218 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.importer import SeasonImporter, read_records
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+
+def import_url(kind: str):
+    return reverse("theatre-api:bulk-import", args=[kind])
+
+
+class SeasonImporterTest(TestCase):
+    def import_lines(self, kind, lines, file_format="csv", **kwargs):
+        return list(
+            SeasonImporter(kind, batch_size=2).import_records(
+                read_records(lines, file_format), **kwargs
+            )
+        )
+
+    def test_plays_link_genres_and_actors(self):
+        Actor.objects.create(first_name="Ann", last_name="Lee")
+        Genre.objects.create(name="Drama")
+
+        done = self.import_lines(
+            "plays",
+            [
+                "title,description,genres,actors\n",
+                "Hamlet,Denmark,Tragedy|Drama,Ann Lee\n",
+                "Lear,,,\n",
+                "Tempest,Island,Comedy,\n",
+            ]
+        )
+
+        self.assertEqual(done, [2, 3])
+        hamlet = Play.objects.get(title="Hamlet")
+        self.assertEqual(
+            sorted(hamlet.genres.values_list("name", flat=True)),
+            ["Drama", "Tragedy"]
+        )
+        self.assertEqual(hamlet.genre_names, ["Drama", "Tragedy"])
+        self.assertEqual(hamlet.actor_names, ["Ann Lee"])
+        self.assertEqual(Genre.objects.count(), 3)
+
+    def test_performances_resolve_names(self):
+        Play.objects.create(title="Hamlet")
+        TheatreHall.objects.create(name="Main", rows=5, seats_in_row=5)
+
+        self.import_lines(
+            "performances",
+            [
+                '{"play": "Hamlet", "theatre_hall": "Main", '
+                '"show_time": "2023-08-01T19:00:00"}\n',
+                "\n",
+            ],
+            file_format="jsonl"
+        )
+
+        self.assertEqual(Performance.objects.get().play.title, "Hamlet")
+
+    def test_failed_batch_is_rolled_back_and_resumable(self):
+        lines = [
+            "name,rows,seats_in_row\n",
+            "One,1,1\n",
+            "Two,2,2\n",
+            "Three,3,0\n",
+            "Four,4,4\n",
+        ]
+        importer = SeasonImporter("halls", batch_size=2).import_records(
+            read_records(lines, "csv")
+        )
+
+        self.assertEqual(next(importer), 2)
+        with self.assertRaisesMessage(ValueError, "Record 3"):
+            next(importer)
+        self.assertEqual(TheatreHall.objects.count(), 2)
+
+        lines[3] = "Three,3,3\n"
+        self.assertEqual(self.import_lines("halls", lines, skip=2), [4])
+        self.assertEqual(TheatreHall.objects.count(), 4)
+
+    def test_jsonl_records_must_be_objects(self):
+        for line in ("[1]\n", '"x"\n', "{\n"):
+            with self.assertRaisesMessage(ValueError, "Record 2"):
+                list(read_records(['{"name": "Main"}\n', line], "jsonl"))
+
+    def test_database_error_names_the_record(self):
+        bulk_create = TheatreHall.objects.bulk_create
+
+        def refuse_bad(halls):
+            halls = list(halls)
+            if any(hall.name == "Bad" for hall in halls):
+                raise IntegrityError("refused")
+            return bulk_create(halls)
+
+        lines = [
+            "name,rows,seats_in_row\n",
+            "One,1,1\n",
+            "Two,2,2\n",
+            "Three,3,3\n",
+            "Bad,4,4\n",
+        ]
+        with mock.patch.object(
+            TheatreHall.objects, "bulk_create", side_effect=refuse_bad
+        ):
+            with self.assertRaisesMessage(ValueError, "Record 4: refused"):
+                self.import_lines("halls", lines)
+
+        self.assertEqual(TheatreHall.objects.count(), 2)
+
+
+class ImportSeasonCommandTest(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "actors.csv")
+
+    def write(self, *lines):
+        with open(self.path, "w") as import_file:
+            import_file.write("first_name,last_name\n" + "".join(lines))
+
+    def test_resumes_from_checkpoint(self):
+        self.write("Ann,Lee\n", "Bob,\n")
+
+        with self.assertRaisesMessage(CommandError, "1 records"):
+            call_command(
+                "import_season", "actors", self.path,
+                batch_size=1, stdout=StringIO()
+            )
+        with open(f"{self.path}.checkpoint") as checkpoint_file:
+            self.assertEqual(checkpoint_file.read(), "1")
+
+        self.write("Ann,Lee\n", "Bob,Ray\n")
+        call_command(
+            "import_season", "actors", self.path,
+            batch_size=1, stdout=StringIO()
+        )
+
+        self.assertEqual(
+            list(Actor.objects.values_list("last_name", flat=True)),
+            ["Lee", "Ray"]
+        )
+        self.assertFalse(os.path.exists(f"{self.path}.checkpoint"))
+
+
+class BulkImportApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test12345pass",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def post(self, kind, name, content, **data):
+        return self.client.post(
+            import_url(kind),
+            {"upload": SimpleUploadedFile(name, content), **data},
+            format="multipart"
+        )
+
+    def test_import_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@test.com", "test12345pass"
+            )
+        )
+
+        res = self.post("actors", "actors.csv", b"first_name,last_name\n")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_jsonl(self):
+        res = self.post(
+            "halls",
+            "halls.jsonl",
+            b'{"name": "Main", "rows": 10, "seats_in_row": 12}\n'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data, {"kind": "halls", "imported": 1})
+        self.assertEqual(TheatreHall.objects.get().capacity, 120)
+
+    def test_error_reports_committed_records(self):
+        res = self.post(
+            "actors",
+            "actors.txt",
+            b"first_name,last_name\nAnn,Lee\n,Ray\n",
+            file_format="csv"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["imported"], 0)
+        self.assertIn("Record 2", res.data["detail"])
+        self.assertFalse(Actor.objects.exists())
+
+    def test_unknown_format_is_rejected(self):
+        res = self.post("actors", "actors.txt", b"first_name,last_name\n")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file_format", res.data)
+
+    def test_unknown_kind_is_not_found(self):
+        res = self.post("tickets", "tickets.csv", b"row,seat\n")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,114 @@
+import os
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre import instrumentation
+from theatre.cache import get_cache
+from theatre.models import Play
+from user.authentication import ClaimsRefreshToken
+
+PLAY_URL = reverse("theatre-api:play-list")
+METRICS_URL = reverse("theatre-api:metrics")
+
+
+class InstrumentationTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        patcher = mock.patch.dict(instrumentation._histograms, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test12345pass",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Play.objects.create(title="Hamlet", description="Ghosts")
+
+    def play_list_metrics(self):
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return next(
+            view for view in res.json()["views"]
+            if view["view"] == "theatre-api:play-list"
+        )
+
+    @override_settings(THEATRE_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_sampled_request_has_server_timing(self):
+        res = self.client.get(PLAY_URL)
+
+        phases = [
+            entry.split(";")[0] for entry in res["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(phases, ["total", "db", "view", "render"])
+        self.assertRegex(res["Server-Timing"], r'db;dur=[\d.]+;desc="\d+ q')
+
+    @override_settings(THEATRE_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_histograms_per_view_and_action(self):
+        for _ in range(2):
+            self.client.get(PLAY_URL)
+
+        metrics = self.play_list_metrics()
+
+        self.assertEqual(metrics["action"], "list")
+        self.assertEqual(metrics["requests"], 2)
+        self.assertEqual(metrics["seconds"]["db"]["buckets"]["+Inf"], 2)
+        self.assertGreater(metrics["queries"]["sum"], 0)
+
+    @override_settings(THEATRE_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_prometheus_export(self):
+        self.client.get(PLAY_URL)
+
+        res = self.client.get(METRICS_URL, {"format": "prometheus"})
+
+        self.assertEqual(res["Content-Type"], "text/plain; charset=utf-8")
+        self.assertIn(
+            "theatre_request_duration_seconds_bucket{"
+            f'pid="{os.getpid()}",'
+            'view="theatre-api:play-list",action="list",phase="total",'
+            'le="+Inf"} 1\n',
+            res.content.decode()
+        )
+        self.assertIn(
+            "# TYPE theatre_request_queries histogram", res.content.decode()
+        )
+
+    @override_settings(THEATRE_INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_measured(self):
+        res = self.client.get(PLAY_URL)
+
+        self.assertFalse(res.has_header("Server-Timing"))
+        self.assertEqual(instrumentation.snapshot()["views"], [])
+
+    def test_metrics_for_admins_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "pass12345")
+        )
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(THEATRE_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_async_handler(self):
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+
+        async def get():
+            return await AsyncClient().get(
+                PLAY_URL, headers={"Authorization": f"Bearer {token}"}
+            )
+
+        res = async_to_sync(get)()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("view;dur=", res["Server-Timing"])
+        metrics = self.play_list_metrics()
+        self.assertEqual(metrics["requests"], 1)
+        self.assertGreater(metrics["queries"]["sum"], 0)
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import shutil
+import tempfile
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from theatre.media import MediaApp, prepare, serve_media
+from theatre.storage import IMMUTABLE_CACHE_CONTROL
+
+BLOB = "uploads/plays/ab/" + "ab" * 32 + ".jpg"
+
+
+class MediaRootMixin:
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for name in ("poster.txt", BLOB):
+            path = os.path.join(self.media_root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as media_file:
+                media_file.write(b"0123456789")
+
+
+class MediaServingTest(MediaRootMixin, SimpleTestCase):
+    def test_full_file_has_cache_validators(self):
+        planned = prepare("poster.txt", {})
+
+        self.assertEqual(planned.status, 200)
+        self.assertEqual(planned.length, 10)
+        self.assertEqual(planned.headers["Content-Type"], "text/plain")
+        self.assertEqual(
+            planned.headers["Cache-Control"], "public, max-age=3600"
+        )
+        self.assertIn("ETag", planned.headers)
+        self.assertIn("Last-Modified", planned.headers)
+
+    def test_blob_is_immutable_with_digest_etag(self):
+        planned = prepare(BLOB, {})
+
+        self.assertEqual(
+            planned.headers["Cache-Control"], IMMUTABLE_CACHE_CONTROL
+        )
+        self.assertEqual(planned.headers["ETag"], f'"{"ab" * 32}"')
+
+    def test_matching_etag_is_not_modified(self):
+        etag = prepare("poster.txt", {}).headers["ETag"]
+
+        planned = prepare("poster.txt", {"if-none-match": f"W/{etag}"})
+
+        self.assertEqual(planned.status, 304)
+
+    def test_ranges(self):
+        for header, status, offset, length in (
+            ("bytes=2-5", 206, 2, 4),
+            ("bytes=-3", 206, 7, 3),
+            ("bytes=8-", 206, 8, 2),
+            ("bytes=20-", 416, 0, 0),
+            ("bytes=0-1,4-5", 200, 0, 10),
+        ):
+            with self.subTest(header):
+                planned = prepare("poster.txt", {"range": header})
+                self.assertEqual(
+                    (planned.status, planned.offset, planned.length),
+                    (status, offset, length)
+                )
+
+    def test_stale_if_range_serves_full_file(self):
+        planned = prepare(
+            "poster.txt", {"range": "bytes=2-5", "if-range": '"old"'}
+        )
+
+        self.assertEqual(planned.status, 200)
+
+    def test_paths_outside_media_root_are_not_found(self):
+        for path in ("../etc/passwd", "uploads", "missing.txt"):
+            with self.subTest(path):
+                self.assertEqual(prepare(path, {}).status, 404)
+
+    def test_view_serves_ranges(self):
+        request = RequestFactory().get("/", HTTP_RANGE="bytes=2-5")
+
+        response = serve_media(request, "poster.txt")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+
+    @override_settings(MEDIA_SERVE_MODE="x-accel-redirect")
+    def test_view_offloads_to_nginx(self):
+        response = serve_media(RequestFactory().get("/"), BLOB)
+
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{BLOB}"
+        )
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+
+
+class MediaAppTest(MediaRootMixin, SimpleTestCase):
+    def call(self, path, method="GET", headers=(), extensions=None):
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "headers": [
+                (name.encode(), value.encode()) for name, value in headers
+            ],
+        }
+        if extensions is not None:
+            scope["extensions"] = extensions
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(MediaApp()(scope, None, send))
+        return messages
+
+    def test_app_sends_range_in_chunks(self):
+        messages = self.call(
+            "/media/poster.txt", headers=[("Range", "bytes=1-3")]
+        )
+
+        self.assertEqual(messages[0]["status"], 206)
+        self.assertEqual(
+            b"".join(message.get("body", b"") for message in messages[1:]),
+            b"123"
+        )
+        self.assertFalse(messages[-1].get("more_body", False))
+
+    def test_app_uses_zero_copy_send(self):
+        messages = self.call(
+            f"/media/{BLOB}",
+            extensions={"http.response.zerocopysend": {}}
+        )
+
+        self.assertEqual(messages[1]["type"], "http.response.zerocopysend")
+        self.assertEqual(
+            (messages[1]["offset"], messages[1]["count"]), (0, 10)
+        )
+
+    def test_app_head_and_errors(self):
+        head = self.call("/media/poster.txt", method="HEAD")
+        missing = self.call("/media/missing.txt")
+        post = self.call("/media/poster.txt", method="POST")
+
+        self.assertEqual(head[0]["status"], 200)
+        self.assertEqual(head[1]["body"], b"")
+        self.assertEqual(missing[0]["status"], 404)
+        self.assertEqual(post[0]["status"], 405)
@@ -0,0 +1,128 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from theatre.models import Genre, Performance, Play, TheatreHall
+
+GENRE_URL = reverse("theatre-api:genre-list")
+PERFORMANCE_URL = reverse("theatre-api:performance-list")
+
+
+class PaginationTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_performances_cursor_walks_every_row_once(self):
+        play = Play.objects.create(title="Play")
+        theatre_hall = TheatreHall.objects.create(
+            name="Main", rows=1, seats_in_row=1
+        )
+        show_time = timezone.make_aware(datetime(2023, 8, 1, 19))
+        performances = [
+            Performance.objects.create(
+                play=play, theatre_hall=theatre_hall, show_time=show_time
+            )
+            for _ in range(5)
+        ]
+
+        seen = []
+        url = PERFORMANCE_URL + "?page_size=2"
+        while url:
+            res = self.client.get(url)
+            self.assertNotIn("count", res.data)
+            seen += [performance["id"] for performance in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(
+            seen,
+            sorted(
+                (performance.id for performance in performances),
+                reverse=True
+            )
+        )
+
+    def test_performances_sharing_show_time_are_sought_by_id(self):
+        play = Play.objects.create(title="Play")
+        theatre_hall = TheatreHall.objects.create(
+            name="Main", rows=1, seats_in_row=1
+        )
+        show_times = [
+            timezone.make_aware(datetime(2023, 8, day, 19))
+            for day in (1, 2, 2, 2, 2, 2, 2, 3)
+        ]
+        performances = [
+            Performance.objects.create(
+                play=play, theatre_hall=theatre_hall, show_time=show_time
+            )
+            for show_time in show_times
+        ]
+        expected = [
+            performance.id
+            for performance in sorted(
+                performances,
+                key=lambda performance: (
+                    performance.show_time, performance.id
+                ),
+                reverse=True
+            )
+        ]
+
+        seen = []
+        url = PERFORMANCE_URL + "?page_size=2"
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(url)
+            self.assertFalse(
+                any(
+                    "OFFSET" in query["sql"]
+                    for query in queries.captured_queries
+                )
+            )
+            seen += [performance["id"] for performance in res.data["results"]]
+            previous, url = res.data["previous"], res.data["next"]
+
+        self.assertEqual(seen, expected)
+
+        seen = []
+        url = previous
+        while url:
+            res = self.client.get(url)
+            seen = [
+                performance["id"] for performance in res.data["results"]
+            ] + seen
+            url = res.data["previous"]
+
+        self.assertEqual(seen, expected[:-2])
+
+    def test_limit_offset_without_count(self):
+        for name in ("Comedy", "Drama", "Tragedy"):
+            Genre.objects.create(name=name)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(GENRE_URL, {"limit": 2, "count": "false"})
+
+        self.assertIsNone(res.data["count"])
+        self.assertIsNotNone(res.data["next"])
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+
+        res = self.client.get(res.data["next"])
+
+        self.assertIsNone(res.data["next"])
+        self.assertEqual(
+            [genre["name"] for genre in res.data["results"]], ["Tragedy"]
+        )
@@ -0,0 +1,106 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+PERFORMANCE_URL = reverse("theatre-api:performance-list")
+
+
+def sample_performance(**params):
+    defaults = {
+        "show_time": timezone.make_aware(datetime(2023, 8, 1, 19)),
+    }
+    defaults.update(params)
+
+    return Performance.objects.create(**defaults)
+
+
+class PerformanceApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main", rows=5, seats_in_row=4
+        )
+        self.play1 = Play.objects.create(title="Play1")
+        self.play2 = Play.objects.create(title="Play2")
+
+    def test_list_tickets_available(self):
+        performance = sample_performance(
+            play=self.play1, theatre_hall=self.theatre_hall
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                performance=performance,
+                reservation=reservation,
+                row=1,
+                seat=1
+            )
+
+        res = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 19)
+
+    def test_list_filters_by_play_and_date(self):
+        expected = sample_performance(
+            play=self.play1, theatre_hall=self.theatre_hall
+        )
+        sample_performance(play=self.play2, theatre_hall=self.theatre_hall)
+        sample_performance(
+            play=self.play1,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.make_aware(datetime(2023, 8, 2, 19))
+        )
+
+        res = self.client.get(
+            PERFORMANCE_URL, {"play": self.play1.id, "date": "2023-08-01"}
+        )
+
+        self.assertEqual(
+            [performance["id"] for performance in res.data["results"]],
+            [expected.id]
+        )
+
+    def test_list_rejects_invalid_filters(self):
+        for params in ({"play": "x"}, {"date": "2023-02-30"}):
+            res = self.client.get(PERFORMANCE_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_recount_tickets_fixes_drift(self):
+        performance = sample_performance(
+            play=self.play1, theatre_hall=self.theatre_hall
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            performance=performance, reservation=reservation, row=2, seat=3
+        )
+        Performance.objects.update(seat_map=b"", tickets_sold=7)
+
+        call_command("recount_tickets", stdout=StringIO())
+        performance.refresh_from_db()
+
+        self.assertEqual(performance.tickets_sold, 1)
+        self.assertTrue(performance.get_seat_map().is_taken(2, 3))
@@ -5,6 +5,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from theatre.cache import get_cache
 from theatre.models import (
     Actor,
     Genre,
@@ -110,6 +111,73 @@ class AuthenticatedPlayApiTest(TestCase):
         self.assertIn(serializer2.data, result_data)
         self.assertNotIn(serializer3.data, result_data)
 
+    def test_filter_by_several_genres_returns_play_once(self):
+        play = sample_play()
+        genre1 = sample_genre(name="Genre1")
+        genre2 = sample_genre(name="Genre2")
+        play.genres.add(genre1, genre2)
+        play.actors.add(sample_actor(), sample_actor(first_name="Ann"))
+
+        res = self.client.get(
+            PLAY_URL,
+            {
+                "genres": f"{genre1.id},{genre2.id}",
+                "actors": ",".join(
+                    str(actor.id) for actor in play.actors.all()
+                ),
+            }
+        )
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [play.id]
+        )
+
+    def test_filter_play_by_all_genres(self):
+        genre1 = sample_genre(name="Genre1")
+        genre2 = sample_genre(name="Genre2")
+        both = sample_play(title="Both")
+        both.genres.add(genre1, genre2)
+        sample_play(title="One").genres.add(genre1)
+
+        res = self.client.get(
+            PLAY_URL, {"genres_all": f"{genre1.id},{genre2.id}"}
+        )
+
+        self.assertEqual(
+            [item["title"] for item in res.data["results"]], ["Both"]
+        )
+
+    def test_filter_play_by_any_genre_and_all_actors(self):
+        genre = sample_genre()
+        actor1 = sample_actor(first_name="Actor1")
+        actor2 = sample_actor(first_name="Actor2")
+        match = sample_play(title="Match")
+        match.genres.add(genre)
+        match.actors.add(actor1, actor2)
+        partial = sample_play(title="Partial")
+        partial.genres.add(genre)
+        partial.actors.add(actor1)
+
+        res = self.client.get(
+            PLAY_URL,
+            {"genres": genre.id, "actors_all": f"{actor1.id},{actor2.id}"}
+        )
+
+        self.assertEqual(
+            [item["title"] for item in res.data["results"]], ["Match"]
+        )
+
+    def test_malformed_ids_are_rejected(self):
+        for params in (
+            {"genres": "1,a"},
+            {"actors": "1,,2"},
+            {"genres_all": "x"},
+        ):
+            res = self.client.get(PLAY_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
+
     def test_retrieve_play(self):
         play = sample_play()
         play.genres.add(sample_genre(name="Genre1"))
@@ -177,3 +245,121 @@ class AdminApiTests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class PlaySearchApiTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, query):
+        res = self.client.get(PLAY_URL, {"search": query})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [play["title"] for play in res.data["results"]]
+
+    def test_search_matches_title_and_description(self):
+        sample_play(title="Hamlet", description="Prince of Denmark")
+        sample_play(title="Macbeth", description="A Scottish king")
+        sample_play(title="Lear", description="An old king of Britain")
+
+        self.assertEqual(self.search("denmark"), ["Hamlet"])
+        self.assertEqual(self.search("king"), ["Lear", "Macbeth"])
+
+    def test_title_matches_rank_first(self):
+        sample_play(title="Crown", description="Story of a king")
+        sample_play(title="The King", description="Coronation")
+
+        self.assertEqual(self.search("king"), ["The King", "Crown"])
+
+    def test_every_word_must_match_a_word_prefix(self):
+        sample_play(title="The Cherry Orchard", description="Estate")
+        sample_play(title="Orchard Tales", description="Apples")
+
+        self.assertEqual(self.search("orch cher"), ["The Cherry Orchard"])
+        self.assertEqual(self.search("rchard"), [])
+
+    def test_search_sees_new_and_changed_plays(self):
+        play = sample_play(title="Hamlet")
+        self.assertEqual(self.search("hamlet"), ["Hamlet"])
+
+        play.title = "Othello"
+        play.save()
+        sample_play(title="Hamlet returns")
+
+        self.assertEqual(self.search("hamlet"), ["Hamlet returns"])
+
+    def test_search_is_paged_by_offset(self):
+        for index in range(3):
+            sample_play(title=f"Tempest {index}")
+
+        res = self.client.get(PLAY_URL, {"search": "tempest", "limit": 2})
+
+        self.assertEqual(res.data["count"], 3)
+        self.assertEqual(len(res.data["results"]), 2)
+
+
+class PlaySummaryTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+        self.play = sample_play()
+
+    def summary(self):
+        self.play.refresh_from_db()
+        return self.play.genre_names, self.play.actor_names
+
+    def test_summary_follows_play_relations(self):
+        drama = sample_genre(name="Drama")
+        comedy = sample_genre(name="Comedy")
+        actor = sample_actor()
+
+        self.play.genres.add(drama, comedy)
+        self.play.actors.add(actor)
+        self.assertEqual(self.summary(), (["Comedy", "Drama"], ["Tom Timey"]))
+
+        self.play.genres.remove(comedy)
+        self.play.actors.clear()
+        self.assertEqual(self.summary(), (["Drama"], []))
+
+    def test_summary_follows_reverse_relations(self):
+        genre = sample_genre()
+
+        genre.plays.add(self.play)
+        self.assertEqual(self.summary(), (["Tragedy"], []))
+
+        genre.plays.clear()
+        self.assertEqual(self.summary(), ([], []))
+
+    def test_summary_follows_renames_and_deletes(self):
+        genre = sample_genre()
+        actor = sample_actor()
+        self.play.genres.add(genre)
+        self.play.actors.add(actor)
+
+        genre.name = "Farce"
+        genre.save()
+        actor.delete()
+
+        self.assertEqual(self.summary(), (["Farce"], []))
+
+    def test_list_page_is_one_query(self):
+        for index in range(5):
+            play = sample_play(title=f"Play {index}")
+            play.genres.add(sample_genre(name=f"Genre {index}"))
+            play.actors.add(sample_actor())
+
+        with self.assertNumQueries(1):
+            res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res.data["results"][0]["genres"], ["Genre 0"])
+        self.assertEqual(res.data["results"][0]["actors"], ["Tom Timey"])
@@ -0,0 +1,132 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from theatre.cache import get_cache
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.tests.utils import QueryCountAssertionsMixin
+
+
+class QueryPlanTest(QueryCountAssertionsMixin, TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main", rows=20, seats_in_row=20
+        )
+        self.show_time = timezone.make_aware(datetime(2023, 8, 1, 19))
+
+    def sample_play(self, size):
+        play = Play.objects.create(title=f"Play {size}")
+        for index in range(size):
+            play.genres.add(Genre.objects.create(name=f"{play.id}-{index}"))
+            play.actors.add(
+                Actor.objects.create(first_name="Actor", last_name=str(index))
+            )
+        return play
+
+    def sample_performance(self, play):
+        return Performance.objects.create(
+            play=play, theatre_hall=self.theatre_hall, show_time=self.show_time
+        )
+
+    def test_play_list(self):
+        def seed(size):
+            for _ in range(size):
+                self.sample_play(size)
+
+        self.assert_query_count_is_flat(reverse("theatre-api:play-list"), seed)
+
+    def test_play_retrieve(self):
+        self.assert_query_count_is_flat(
+            None,
+            lambda size: reverse(
+                "theatre-api:play-detail", args=[self.sample_play(size).id]
+            )
+        )
+
+    def test_genre_retrieve(self):
+        def seed(size):
+            genre = Genre.objects.create(name=f"Shared {size}")
+            for index in range(size):
+                Play.objects.create(title=str(index)).genres.add(genre)
+            return reverse("theatre-api:genre-detail", args=[genre.id])
+
+        self.assert_query_count_is_flat(None, seed)
+
+    def test_performance_list(self):
+        def seed(size):
+            for _ in range(size):
+                self.sample_performance(self.sample_play(1))
+
+        self.assert_query_count_is_flat(
+            reverse("theatre-api:performance-list"), seed
+        )
+
+    def test_performance_retrieve(self):
+        def seed(size):
+            performance = self.sample_performance(self.sample_play(size))
+            reservation = Reservation.objects.create(user=self.user)
+            for seat in range(1, size + 1):
+                Ticket.objects.create(
+                    performance=performance,
+                    reservation=reservation,
+                    row=1,
+                    seat=seat
+                )
+            return reverse(
+                "theatre-api:performance-detail", args=[performance.id]
+            )
+
+        self.assert_query_count_is_flat(None, seed)
+
+    def test_ticket_list(self):
+        def seed(size):
+            performance = self.sample_performance(self.sample_play(1))
+            reservation = Reservation.objects.create(user=self.user)
+            for seat in range(1, size + 1):
+                Ticket.objects.create(
+                    performance=performance,
+                    reservation=reservation,
+                    row=2,
+                    seat=seat
+                )
+
+        self.assert_query_count_is_flat(
+            reverse("theatre-api:ticket-list"), seed
+        )
+
+    def test_reservation_list(self):
+        def seed(size):
+            for _ in range(size):
+                performance = self.sample_performance(self.sample_play(1))
+                reservation = Reservation.objects.create(user=self.user)
+                for seat in range(1, 4):
+                    Ticket.objects.create(
+                        performance=performance,
+                        reservation=reservation,
+                        row=3,
+                        seat=seat
+                    )
+
+        self.assert_query_count_is_flat(
+            reverse("theatre-api:reservation-list"), seed
+        )
@@ -0,0 +1,246 @@
+import base64
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+RESERVATION_URL = reverse("theatre-api:reservation-list")
+
+
+def performance_detail_url(performance_id: int):
+    return reverse("theatre-api:performance-detail", args=[performance_id])
+
+
+def sample_performance(**params):
+    theatre_hall = TheatreHall.objects.create(
+        name="Main", rows=10, seats_in_row=10
+    )
+    play = Play.objects.create(title="PlayTest")
+    defaults = {
+        "play": play,
+        "theatre_hall": theatre_hall,
+        "show_time": timezone.make_aware(datetime(2023, 8, 1, 19)),
+    }
+    defaults.update(params)
+
+    return Performance.objects.create(**defaults)
+
+
+def tickets_payload(performance, count):
+    seats_in_row = performance.theatre_hall.seats_in_row
+    return [
+        {
+            "row": index // seats_in_row + 1,
+            "seat": index % seats_in_row + 1,
+            "performance": performance.id,
+        }
+        for index in range(count)
+    ]
+
+
+class ReservationApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def test_create_reservation(self):
+        payload = {"tickets": tickets_payload(self.performance, 3)}
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(reservation.tickets.count(), 3)
+
+    def test_round_trips_do_not_grow_with_seat_count(self):
+        query_counts = {}
+
+        for seat_count in (1, 10, 100):
+            Ticket.objects.all().delete()
+            payload = {
+                "tickets": tickets_payload(self.performance, seat_count)
+            }
+
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(RESERVATION_URL, payload, format="json")
+
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            query_counts[seat_count] = len(queries)
+
+        self.assertEqual(len(set(query_counts.values())), 1, query_counts)
+
+    def test_seat_out_of_hall_range(self):
+        payload = {
+            "tickets": [
+                {"row": 11, "seat": 1, "performance": self.performance.id}
+            ]
+        }
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["row"],
+            ["row number must be in available range: (1, rows): (1, 10)"]
+        )
+
+    def test_taken_seat_rejected(self):
+        payload = {"tickets": tickets_payload(self.performance, 2)}
+        self.client.post(RESERVATION_URL, payload, format="json")
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["taken"],
+            [
+                {"performance": self.performance.id, "row": 1, "seat": 1},
+                {"performance": self.performance.id, "row": 1, "seat": 2},
+            ]
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_seat_booked_during_validation_conflicts(self):
+        payload = {"tickets": tickets_payload(self.performance, 2)}
+        self.client.post(RESERVATION_URL, payload, format="json")
+        stale_seat_map = sample_performance().get_seat_map()
+
+        with mock.patch.object(
+            Performance, "get_seat_map", return_value=stale_seat_map
+        ):
+            res = self.client.post(
+                RESERVATION_URL,
+                {"tickets": tickets_payload(self.performance, 3)},
+                format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            [(seat["row"], seat["seat"]) for seat in res.data["taken"]],
+            [(1, 1), (1, 2)]
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_same_seat_twice_in_one_reservation(self):
+        ticket = tickets_payload(self.performance, 1)[0]
+
+        res = self.client.post(
+            RESERVATION_URL, {"tickets": [ticket, ticket]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_unknown_performance(self):
+        payload = {"tickets": [{"row": 1, "seat": 1, "performance": 999}]}
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", res.data["tickets"][0])
+
+    def test_seat_map_follows_reservations(self):
+        payload = {"tickets": tickets_payload(self.performance, 10)}
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = self.client.post(
+                RESERVATION_URL, payload, format="json"
+            ).data
+
+        res = self.client.get(performance_detail_url(self.performance.id))
+
+        self.assertEqual(res.data["tickets_available"], 90)
+        seat_map = base64.b64decode(res.data["seat_map"])
+        self.assertEqual(seat_map[:2], b"\xff\x03")
+        self.assertFalse(any(seat_map[2:]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(
+                reverse(
+                    "theatre-api:reservation-detail", args=[reservation["id"]]
+                )
+            )
+        self.performance.refresh_from_db()
+
+        self.assertEqual(self.performance.tickets_available, 100)
+
+    def test_seat_map_is_written_after_commit(self):
+        payload = {"tickets": tickets_payload(self.performance, 2)}
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertFalse(
+            any(
+                'UPDATE "theatre_performance"' in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+        for callback in callbacks:
+            callback()
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_deleting_reservation_updates_seat_map_once(self):
+        payload = {"tickets": tickets_payload(self.performance, 10)}
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = Reservation.objects.get(
+                id=self.client.post(RESERVATION_URL, payload, format="json")
+                .data["id"]
+            )
+
+        with mock.patch.object(
+            Performance, "_mark_seats", wraps=Performance._mark_seats
+        ) as mark_seats:
+            with self.captureOnCommitCallbacks(execute=True):
+                reservation.delete()
+
+        self.assertEqual(mark_seats.call_count, 1)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 0)
+        self.assertFalse(any(self.performance.seat_map))
+
+    def test_moved_ticket_moves_its_seat(self):
+        payload = {"tickets": tickets_payload(self.performance, 2)}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(RESERVATION_URL, payload, format="json")
+        ticket = Ticket.objects.get(row=1, seat=1)
+
+        ticket.row = 5
+        with mock.patch.object(Performance, "rebuild_seat_maps") as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                ticket.save()
+                ticket.save()
+
+        rebuild.assert_not_called()
+        seat_map = Performance.objects.get(
+            id=self.performance.id
+        ).get_seat_map()
+        self.assertFalse(seat_map.is_taken(1, 1))
+        self.assertTrue(seat_map.is_taken(1, 2))
+        self.assertTrue(seat_map.is_taken(5, 1))
+        self.assertEqual(seat_map.taken_count, 2)
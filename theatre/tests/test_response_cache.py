@@ -0,0 +1,154 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.cache import get_cache
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+GENRE_URL = reverse("theatre-api:genre-list")
+PLAY_URL = reverse("theatre-api:play-list")
+CACHE_STATS_URL = reverse("theatre-api:cache-stats")
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_second_request_is_served_from_cache(self):
+        Genre.objects.create(name="Drama")
+
+        first = self.client.get(GENRE_URL)
+        second = self.client.get(GENRE_URL)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get(GENRE_URL)
+
+        res = self.client.get(GENRE_URL, {"limit": 1})
+
+        self.assertEqual(res["X-Cache"], "MISS")
+
+    def test_write_invalidates_cached_list(self):
+        self.client.get(GENRE_URL)
+        Genre.objects.create(name="Comedy")
+
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["name"], "Comedy")
+
+    def test_m2m_change_invalidates_play_list(self):
+        play = Play.objects.create(title="Play")
+        actor = Actor.objects.create(first_name="Tom", last_name="Timey")
+        self.client.get(PLAY_URL)
+
+        play.actors.add(actor)
+        res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["actors"], ["Tom Timey"])
+
+    def test_stats_require_admin(self):
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stats_count_hits_and_misses(self):
+        self.client.get(GENRE_URL)
+        self.client.get(GENRE_URL)
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.data["hits"], 1)
+        self.assertEqual(res.data["misses"], 1)
+        self.assertEqual(res.data["hit_ratio"], 0.5)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Play"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Main", rows=2, seats_in_row=2
+            ),
+            show_time=timezone.make_aware(datetime(2023, 8, 1, 19))
+        )
+        self.url = reverse(
+            "theatre-api:performance-detail", args=[self.performance.id]
+        )
+
+    def test_matching_etag_short_circuits_before_queries(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_last_modified_short_circuits(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+
+        res = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_new_ticket_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                performance=self.performance,
+                reservation=Reservation.objects.create(user=self.user),
+                row=1,
+                seat=1
+            )
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["tickets_available"], 3)
+
+    def test_other_performance_keeps_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        Performance.objects.create(
+            play=self.performance.play,
+            theatre_hall=self.performance.theatre_hall,
+            show_time=self.performance.show_time
+        )
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
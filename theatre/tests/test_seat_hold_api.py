@@ -0,0 +1,335 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import StringIO
+from threading import Barrier
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    SeatHold,
+    TheatreHall,
+    Ticket,
+)
+
+RESERVATION_URL = reverse("theatre-api:reservation-list")
+
+
+def hold_url(performance_id: int):
+    return reverse("theatre-api:performance-hold", args=[performance_id])
+
+
+def sample_performance():
+    return Performance.objects.create(
+        play=Play.objects.create(title="Premiere"),
+        theatre_hall=TheatreHall.objects.create(
+            name="Main", rows=10, seats_in_row=10
+        ),
+        show_time=timezone.make_aware(datetime(2023, 8, 1, 19))
+    )
+
+
+def seats_payload(*seats):
+    return {"seats": [{"row": row, "seat": seat} for row, seat in seats]}
+
+
+class SeatHoldApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "test12345pass"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+        self.url = hold_url(self.performance.id)
+
+    def hold_as_other_user(self, *seats):
+        client = APIClient()
+        client.force_authenticate(self.other_user)
+        return client.post(self.url, seats_payload(*seats), format="json")
+
+    def test_hold_seats(self):
+        res = self.client.post(
+            self.url, seats_payload((1, 1), (1, 2)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["seats"]), 2)
+        self.assertIn("expires_at", res.data)
+        self.assertEqual(
+            SeatHold.objects.filter(user=self.user).count(), 2
+        )
+
+    def test_hold_requires_authentication(self):
+        res = APIClient().post(
+            self.url, seats_payload((1, 1)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_seat_out_of_hall_is_rejected(self):
+        res = self.client.post(
+            self.url, seats_payload((11, 1)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seats_held_by_other_user_conflict(self):
+        self.hold_as_other_user((1, 2))
+
+        res = self.client.post(
+            self.url, seats_payload((1, 1), (1, 2)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["taken"], [{"row": 1, "seat": 2}])
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_sold_seats_conflict(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                performance=self.performance,
+                reservation=Reservation.objects.create(user=self.other_user),
+                row=1,
+                seat=1
+            )
+
+        res = self.client.post(
+            self.url, seats_payload((1, 1)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["taken"], [{"row": 1, "seat": 1}])
+
+    def test_seat_sold_before_seat_map_update_conflicts(self):
+        # The seat map is only updated once the booking commits.
+        Ticket.objects.create(
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.other_user),
+            row=1,
+            seat=1
+        )
+
+        res = self.client.post(
+            self.url, seats_payload((1, 1)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["taken"], [{"row": 1, "seat": 1}])
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_expired_hold_can_be_taken_over(self):
+        self.hold_as_other_user((1, 1))
+        SeatHold.objects.update(expires_at=timezone.now())
+
+        res = self.client.post(
+            self.url, seats_payload((1, 1)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_holding_again_extends_expiry(self):
+        self.client.post(self.url, seats_payload((1, 1)), format="json")
+        SeatHold.objects.update(
+            expires_at=timezone.now() + timedelta(minutes=1)
+        )
+
+        self.client.post(self.url, seats_payload((1, 1)), format="json")
+
+        self.assertGreater(
+            SeatHold.objects.get().expires_at,
+            timezone.now() + timedelta(minutes=5)
+        )
+
+    def test_release_seats(self):
+        self.client.post(
+            self.url, seats_payload((1, 1), (1, 2)), format="json"
+        )
+
+        res = self.client.delete(
+            self.url, seats_payload((1, 1)), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(SeatHold.objects.values_list("row", "seat")), [(1, 2)]
+        )
+
+    def test_reservation_confirms_own_hold(self):
+        self.client.post(self.url, seats_payload((1, 1)), format="json")
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "performance": self.performance.id}
+                ]
+            },
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_reservation_of_seat_held_by_other_user_is_rejected(self):
+        self.hold_as_other_user((1, 1))
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 2, "performance": self.performance.id},
+                    {"row": 1, "seat": 1, "performance": self.performance.id},
+                ]
+            },
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["taken"],
+            [{"performance": self.performance.id, "row": 1, "seat": 1}]
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_purge_seat_holds_command(self):
+        self.client.post(
+            self.url, seats_payload((1, 1), (1, 2)), format="json"
+        )
+        SeatHold.objects.filter(seat=1).update(expires_at=timezone.now())
+
+        call_command("purge_seat_holds", stdout=StringIO())
+
+        self.assertEqual(
+            list(SeatHold.objects.values_list("seat", flat=True)), [2]
+        )
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class SeatHoldConcurrencyTest(TransactionTestCase):
+    """Many customers racing for the same seats get exactly one winner."""
+
+    customers = 20
+
+    def setUp(self) -> None:
+        self.performance = sample_performance()
+        self.users = [
+            get_user_model().objects.create_user(
+                f"customer{index}@test.com", "test12345pass"
+            )
+            for index in range(self.customers)
+        ]
+
+    def race(self, request):
+        return self.race_each([(user, request) for user in self.users])
+
+    def race_each(self, attempts):
+        """Run ``(user, request)`` attempts at once, return the statuses."""
+        barrier = Barrier(len(attempts))
+
+        def run(attempt):
+            user, request = attempt
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                return request(client).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(attempts)) as executor:
+            return list(executor.map(run, attempts))
+
+    def test_one_customer_wins_each_hold(self):
+        statuses = self.race(
+            lambda client: client.post(
+                hold_url(self.performance.id),
+                seats_payload((1, 1), (1, 2), (1, 3)),
+                format="json"
+            )
+        )
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(
+            statuses.count(status.HTTP_409_CONFLICT), self.customers - 1
+        )
+        self.assertEqual(SeatHold.objects.count(), 3)
+        self.assertEqual(
+            SeatHold.objects.values("user").distinct().count(), 1
+        )
+
+    def test_one_customer_books_each_seat(self):
+        payload = {
+            "tickets": [
+                {"row": 2, "seat": seat, "performance": self.performance.id}
+                for seat in (1, 2)
+            ]
+        }
+
+        statuses = self.race(
+            lambda client: client.post(RESERVATION_URL, payload, format="json")
+        )
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(
+            statuses.count(status.HTTP_409_CONFLICT), self.customers - 1
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_hold_and_reservation_never_share_a_seat(self):
+        holder, booker = self.users[:2]
+        for seat in range(1, 6):
+            statuses = self.race_each(
+                [
+                    (
+                        holder,
+                        lambda client: client.post(
+                            hold_url(self.performance.id),
+                            seats_payload((3, seat)),
+                            format="json"
+                        )
+                    ),
+                    (
+                        booker,
+                        lambda client: client.post(
+                            RESERVATION_URL,
+                            {
+                                "tickets": [
+                                    {
+                                        "row": 3,
+                                        "seat": seat,
+                                        "performance": self.performance.id,
+                                    }
+                                ]
+                            },
+                            format="json"
+                        )
+                    ),
+                ]
+            )
+
+            self.assertEqual(
+                sorted(statuses),
+                [status.HTTP_201_CREATED, status.HTTP_409_CONFLICT]
+            )
+            sold = Ticket.objects.filter(row=3, seat=seat).exists()
+            held = SeatHold.objects.filter(row=3, seat=seat).exists()
+            self.assertNotEqual(sold, held)
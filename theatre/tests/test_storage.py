@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+
+from theatre.models import Play
+from theatre.media import serve_media
+from theatre.storage import IMMUTABLE_CACHE_CONTROL
+
+
+def age(storage, name):
+    old = time.time() - 2 * 60 * 60
+    os.utime(storage.path(name), (old, old))
+
+
+class ContentAddressedStorageTest(TestCase):
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = Play._meta.get_field("image").storage
+
+    def create_play(self, title, content=b"poster"):
+        play = Play(title=title)
+        play.image.save("poster.JPG", ContentFile(content))
+        return play
+
+    def test_same_content_is_stored_once(self):
+        hamlet = self.create_play("Hamlet")
+        lear = self.create_play("Lear")
+
+        self.assertEqual(hamlet.image.name, lear.image.name)
+        self.assertRegex(
+            hamlet.image.name, r"^uploads/plays/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$"
+        )
+        self.assertEqual(
+            list(self.storage.blobs()), [hamlet.image.name]
+        )
+
+    def test_blob_is_deleted_with_its_last_reference(self):
+        hamlet = self.create_play("Hamlet")
+        lear = self.create_play("Lear")
+        name = hamlet.image.name
+        age(self.storage, name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            hamlet.image.save("new.jpg", ContentFile(b"new poster"))
+        self.assertTrue(self.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Play.objects.get(id=lear.id).delete()
+        self.assertFalse(self.storage.exists(name))
+
+    def test_recent_blob_is_kept(self):
+        hamlet = self.create_play("Hamlet")
+        name = hamlet.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            hamlet.delete()
+
+        self.assertTrue(self.storage.exists(name))
+
+    def test_collect_media_deletes_old_orphans(self):
+        referenced = self.create_play("Hamlet").image.name
+        orphan = self.storage.save("uploads/plays/a.jpg", ContentFile(b"a"))
+        recent = self.storage.save("uploads/plays/b.jpg", ContentFile(b"b"))
+        for name in (referenced, orphan):
+            age(self.storage, name)
+
+        out = StringIO()
+        call_command("collect_media", "--dry-run", stdout=out)
+        self.assertIn("Would delete 1", out.getvalue())
+        self.assertTrue(self.storage.exists(orphan))
+
+        call_command("collect_media", stdout=StringIO())
+        self.assertFalse(self.storage.exists(orphan))
+        self.assertTrue(self.storage.exists(referenced))
+        self.assertTrue(self.storage.exists(recent))
+
+    def test_blobs_are_served_as_immutable(self):
+        name = self.create_play("Hamlet").image.name
+        request = RequestFactory().get(f"/media/{name}")
+
+        response = serve_media(request, name, document_root=self.media_root)
+
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
@@ -0,0 +1,121 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from theatre.cache import get_cache
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.renderers import FastJSONRenderer, StreamingJSONRenderer
+from theatre.serializers import TicketSerializer
+from theatre.views import TicketViewsSet
+
+TICKET_URL = reverse("theatre-api:ticket-list")
+
+
+class StreamingTicketListTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test12345pass",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        performance = Performance.objects.create(
+            play=Play.objects.create(title="Play"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Main", rows=1, seats_in_row=10
+            ),
+            show_time=timezone.make_aware(datetime(2023, 8, 1, 19))
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        self.tickets = [
+            Ticket.objects.create(
+                performance=performance,
+                reservation=reservation,
+                row=1,
+                seat=seat
+            )
+            for seat in range(1, 6)
+        ]
+
+    def test_list_is_streamed_as_regular_json(self):
+        res = self.client.get(TICKET_URL, {"limit": 2})
+
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertEqual(
+            res.getvalue(),
+            JSONRenderer().render(
+                {
+                    "count": 5,
+                    "next": f"http://testserver{TICKET_URL}?limit=2&offset=2",
+                    "previous": None,
+                    "results": TicketSerializer(
+                        self.tickets[:2], many=True
+                    ).data,
+                }
+            )
+        )
+
+    def test_rows_are_serialized_in_chunks(self):
+        with mock.patch.object(TicketViewsSet, "stream_chunk_size", 2):
+            res = self.client.get(TICKET_URL, {"limit": 100})
+            chunks = list(res.streaming_content)
+
+        self.assertEqual(len(chunks), 5)
+        data = json.loads(b"".join(chunks))
+        self.assertEqual(
+            [ticket["seat"] for ticket in data["results"]], [1, 2, 3, 4, 5]
+        )
+
+    def test_streamed_page_without_count(self):
+        res = self.client.get(
+            TICKET_URL, {"limit": 3, "offset": 3, "count": "false"}
+        )
+        data = json.loads(res.getvalue())
+
+        self.assertIsNone(data["count"])
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
+        self.assertEqual(len(data["results"]), 2)
+
+    def test_browsable_api_is_not_streamed(self):
+        res = self.client.get(TICKET_URL, HTTP_ACCEPT="text/html")
+
+        self.assertFalse(res.streaming)
+
+
+class RendererTest(SimpleTestCase):
+    data = {
+        "title": "Line\u2028separator \u00e9",
+        "show_time": timezone.make_aware(datetime(2023, 8, 1, 19, 0, 0, 1234)),
+        "results": [1, 2.5, None, True],
+    }
+
+    def test_fast_renderer_matches_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(self.data),
+            JSONRenderer().render(self.data)
+        )
+
+    def test_stream_without_envelope_is_a_list(self):
+        chunks = StreamingJSONRenderer().render_stream(
+            None, [[1, 2], [], [3]]
+        )
+
+        self.assertEqual(b"".join(chunks), b"[1,2,3]")
@@ -0,0 +1,145 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from theatre.cache import get_cache
+from theatre.tests.test_reservation_api import (
+    sample_performance,
+    tickets_payload,
+)
+from theatre.throttling import (
+    CacheCounterStore,
+    SQLiteCounterStore,
+    UserSlidingThrottle,
+    get_store,
+)
+
+RESERVATION_URL = reverse("theatre-api:reservation-list")
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SlidingWindowThrottleTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.request = RequestFactory().get("/")
+        self.request.user = get_user_model()(id=1)
+        self.clock = Clock(600.0)
+
+    def throttle(self):
+        throttle = UserSlidingThrottle()
+        throttle.rate = "3/minute"
+        throttle.num_requests, throttle.duration = 3, 60
+        throttle.timer = self.clock
+        return throttle
+
+    def allowed(self):
+        return self.throttle().allow_request(self.request, None)
+
+    def test_limits_rate_over_sliding_window(self):
+        self.assertEqual(
+            [self.allowed() for _ in range(4)], [True, True, True, False]
+        )
+
+        # Half way through the next window the previous one counts half.
+        self.clock.now += 90
+        self.assertEqual(
+            [self.allowed() for _ in range(3)], [True, True, False]
+        )
+
+        self.clock.now += 120
+        self.assertTrue(self.allowed())
+
+    def test_wait_until_request_is_allowed(self):
+        for _ in range(3):
+            self.allowed()
+        throttle = self.throttle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+
+        self.clock.now += throttle.wait() - 1
+        self.assertFalse(self.allowed())
+        self.clock.now += 1.5
+        self.assertTrue(self.allowed())
+
+    def test_limit_holds_against_counts_read_concurrently(self):
+        for _ in range(3):
+            self.allowed()
+
+        # Other workers incremented after this one read the counters.
+        with mock.patch.object(
+            CacheCounterStore, "get_many", return_value={}
+        ):
+            self.assertFalse(self.allowed())
+
+    def test_rejected_requests_are_not_counted(self):
+        for _ in range(5):
+            self.allowed()
+
+        self.assertEqual(get_cache().get("throttle:user:1:10"), 3)
+
+    def test_sqlite_store_is_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "throttle.sqlite3")
+            with override_settings(THEATRE_THROTTLE_DB=path):
+                for _ in range(2):
+                    self.allowed()
+                # Another worker opens the same file.
+                other = SQLiteCounterStore(path)
+                self.assertEqual(
+                    sum(other.get_many(["throttle:user:1:10"]).values()), 2
+                )
+                self.assertIsInstance(get_store(), SQLiteCounterStore)
+                self.assertTrue(self.allowed())
+                self.assertFalse(self.allowed())
+
+    def test_expired_sqlite_counter_restarts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteCounterStore(os.path.join(directory, "t.sqlite3"))
+            self.assertEqual(store.incr("key", timeout=60), 1)
+            self.assertEqual(store.incr("key", timeout=60), 2)
+            self.assertEqual(store.incr("key", timeout=-1), 3)
+            self.assertEqual(store.get_many(["key"]), {})
+            self.assertEqual(store.incr("key", timeout=60), 1)
+
+
+class ReservationThrottleTest(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def test_create_has_tighter_scope(self):
+        rates = {**api_settings.DEFAULT_THROTTLE_RATES, "reservation": "2/min"}
+        with mock.patch.object(SimpleRateThrottle, "THROTTLE_RATES", rates):
+            statuses = [
+                self.client.post(
+                    RESERVATION_URL,
+                    {"tickets": tickets_payload(self.performance, 1)},
+                    format="json"
+                ).status_code
+                for _ in range(3)
+            ]
+            listed = self.client.get(RESERVATION_URL)
+
+        self.assertNotIn(status.HTTP_429_TOO_MANY_REQUESTS, statuses[:2])
+        self.assertEqual(statuses[2], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(listed.status_code, status.HTTP_200_OK)
@@ -0,0 +1,31 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+    """TestCase mixin for checking that endpoints do not issue N+1 queries."""
+
+    def assert_query_count_is_flat(self, url, seed, sizes=(1, 10)):
+        """
+        Call ``seed(size)`` for every size, GET ``url`` (or the URL
+        returned by ``seed``) and assert the number of queries does not
+        depend on the size.
+        """
+        query_counts = {}
+
+        for size in sizes:
+            seeded_url = seed(size) or url
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(seeded_url)
+                content = res.getvalue()
+
+            self.assertEqual(res.status_code, 200, content)
+            query_counts[size] = len(queries)
+
+        self.assertEqual(
+            len(set(query_counts.values())),
+            1,
+            f"Query count grows with result size: {query_counts}"
+        )
+
+        return query_counts[sizes[0]]
@@ -0,0 +1,192 @@
+"""
+Sliding-window rate throttles with counters in a shared store.
+
+DRF's throttles keep a list of request timestamps per client in the
+process-local default cache: every worker process counts on its own, and
+the list grows with the rate. These throttles keep one counter per
+client and fixed window instead, and estimate the rate over the last
+``duration`` seconds from the current and the previous window::
+
+    previous * (1 - elapsed fraction of the current window) + current
+
+A request is counted before it is checked, against the value ``incr``
+returns, so concurrent requests cannot all pass on the same count; a
+rejected request is taken back out.
+
+Counters live in the ``THEATRE_THROTTLE_CACHE_ALIAS`` cache, which should
+be redis or memcached: ``add`` and ``incr`` are atomic there, so all
+workers share one count. ``THEATRE_THROTTLE_DB`` keeps them in a SQLite
+file instead, shared by the workers of one host, for deployments without
+such a cache; it costs a write to that file per request. Either way a
+client costs at most two small counters per scope.
+
+``ScopedSlidingThrottle`` limits views, or actions of a viewset (see
+``ReservationViewSet.get_throttles``), with a ``throttle_scope``.
+"""
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import throttling
+
+# Expired SQLite counters are deleted every this many increments.
+PRUNE_EVERY = 1000
+
+
+class CacheCounterStore:
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_many(self, keys) -> dict:
+        return self.cache.get_many(keys)
+
+    def incr(self, key: str, timeout: float) -> int:
+        self.cache.add(key, 0, timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr().
+            self.cache.set(key, 1, timeout)
+            return 1
+
+    def decr(self, key: str) -> None:
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+
+
+class SQLiteCounterStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.writes = 0
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Counters need not survive a power loss: no fsync per write.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_counter ("
+                "key TEXT PRIMARY KEY, "
+                "count INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            self.local.connection = connection
+        return connection
+
+    def get_many(self, keys) -> dict:
+        keys = list(keys)
+        rows = self.connection().execute(
+            "SELECT key, count FROM throttle_counter "
+            f"WHERE key IN ({', '.join('?' * len(keys))}) AND expires_at > ?",
+            (*keys, time.time())
+        )
+        return dict(rows)
+
+    def incr(self, key: str, timeout: float) -> int:
+        now = time.time()
+        connection = self.connection()
+        (count,) = connection.execute(
+            "INSERT INTO throttle_counter (key, count, expires_at) "
+            "VALUES (?, 1, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "count = CASE WHEN expires_at > ? THEN count + 1 ELSE 1 END, "
+            "expires_at = excluded.expires_at "
+            "RETURNING count",
+            (key, now + timeout, now)
+        ).fetchone()
+        self.writes += 1
+        if self.writes % PRUNE_EVERY == 0:
+            connection.execute(
+                "DELETE FROM throttle_counter WHERE expires_at <= ?", (now,)
+            )
+        return count
+
+    def decr(self, key: str) -> None:
+        self.connection().execute(
+            "UPDATE throttle_counter SET count = count - 1 "
+            "WHERE key = ? AND count > 0",
+            (key,)
+        )
+
+
+_stores = {}
+
+
+def get_store():
+    """Return the counter store configured in the settings."""
+    path = settings.THEATRE_THROTTLE_DB
+    key = ("db", path) if path else (
+        "cache", settings.THEATRE_THROTTLE_CACHE_ALIAS
+    )
+    if key not in _stores:
+        _stores[key] = (
+            SQLiteCounterStore(path) if path
+            else CacheCounterStore(settings.THEATRE_THROTTLE_CACHE_ALIAS)
+        )
+    return _stores[key]
+
+
+class SlidingWindowThrottle(throttling.SimpleRateThrottle):
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window, offset = divmod(self.timer(), self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        previous_key = f"{self.key}:{int(window) - 1}"
+        store = get_store()
+        self.previous = store.get_many([previous_key]).get(previous_key, 0)
+        # The requests before this one in the current window.
+        self.current = store.incr(current_key, timeout=2 * self.duration) - 1
+        self.elapsed = offset / self.duration
+
+        estimated = self.previous * (1 - self.elapsed) + self.current
+        if estimated >= self.num_requests:
+            store.decr(current_key)
+            return self.throttle_failure()
+
+        return True
+
+    def wait(self):
+        """Seconds until the estimated rate allows another request."""
+        if self.current < self.num_requests and self.previous:
+            # Wait for the previous window to weigh less.
+            fraction = 1 - (self.num_requests - self.current) / self.previous
+            return max(fraction - self.elapsed, 0) * self.duration
+
+        # Wait for the current window to become the previous one.
+        fraction = max(1 - self.num_requests / max(self.current, 1), 0)
+        return (1 - self.elapsed + fraction) * self.duration
+
+
+class AnonSlidingThrottle(SlidingWindowThrottle, throttling.AnonRateThrottle):
+    pass
+
+
+class UserSlidingThrottle(SlidingWindowThrottle, throttling.UserRateThrottle):
+    pass
+
+
+class ScopedSlidingThrottle(
+    throttling.ScopedRateThrottle, SlidingWindowThrottle
+):
+    pass
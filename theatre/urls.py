@@ -1,6 +1,9 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework import routers
 
+from theatre.async_views import async_route
+
 from theatre.views import (
     ActorViewSet,
     GenreViewSet,
@@ -9,6 +12,10 @@ from theatre.views import (
     PerformanceViewSet,
     PlayViewSet,
     ReservationViewSet,
+    BulkImportView,
+    CacheStatsView,
+    MetricsView,
+    TicketExportView,
 )
 
 router = routers.DefaultRouter()
@@ -21,6 +28,55 @@ router.register("tickets", TicketViewsSet)
 router.register("reservations", ReservationViewSet)
 
 urlpatterns = [
-    path("", include(router.urls))
+    path("", include(router.urls)),
+    path("cache_stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path(
+        "import/<str:kind>/", BulkImportView.as_view(), name="bulk-import"
+    ),
+    path(
+        "export/tickets/",
+        TicketExportView.as_view(),
+        name="ticket-export"
+    ),
+]
+
+# The hot read endpoints on the event loop, see theatre.async_views.
+async_urlpatterns = [
+    path(
+        "plays/",
+        async_route(
+            PlayViewSet,
+            {"get": "list", "post": "create"},
+            basename="play",
+            detail=False
+        )
+    ),
+    path(
+        "performances/",
+        async_route(
+            PerformanceViewSet,
+            {"get": "list", "post": "create"},
+            basename="performance",
+            detail=False
+        )
+    ),
+    re_path(
+        r"^performances/(?P<pk>[^/.]+)/$",
+        async_route(
+            PerformanceViewSet,
+            {
+                "get": "retrieve",
+                "put": "update",
+                "patch": "partial_update",
+                "delete": "destroy",
+            },
+            basename="performance",
+            detail=True
+        )
+    ),
 ]
+if settings.THEATRE_ASYNC_READS:
+    urlpatterns = async_urlpatterns + urlpatterns
+
 app_name = "theatre"
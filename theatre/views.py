@@ -1,14 +1,33 @@
-from datetime import datetime
+import csv
+import io
+from datetime import datetime, timedelta
 
-from django.db.models import F, Count
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from theatre import cache, instrumentation
+from theatre.cache import (
+    CachedListModelMixin,
+    CachedRetrieveModelMixin,
+    ConditionalListModelMixin,
+    ConditionalRetrieveModelMixin,
+)
+from theatre.exporter import CONTENT_TYPES, export_tickets, gzip_chunks
+from theatre.fast_serializers import RowListModelMixin
+from theatre.filters import filter_related
+from theatre.holds import hold_seats, release_seats
+from theatre.importer import SeasonImporter, read_records
 from theatre.models import (
     Actor,
     Genre,
@@ -18,12 +37,27 @@ from theatre.models import (
     Performance,
     Reservation,
 )
+from theatre.pagination import (
+    OptionalCountLimitOffsetPagination,
+    PerformanceCursorPagination,
+    PlayCursorPagination,
+    ReservationCursorPagination,
+)
 from theatre.permissions import IsAdminOrIsAuthenticatedReadOnly
+from theatre.query_plan import QueryPlanMixin
+from theatre.renderers import (
+    FastJSONRenderer,
+    PrometheusRenderer,
+    StreamingJSONRenderer,
+)
+from theatre.search import search_plays
 from theatre.serializers import (
     ActorSerializer,
+    BulkImportSerializer,
     GenreSerializer,
     GenreDetailSerializer,
     TicketSerializer,
+    TicketExportSerializer,
     TheatreHallSerializer,
     PerformanceSerializer,
     PerformanceListSerializer,
@@ -33,25 +67,33 @@ from theatre.serializers import (
     PlayDetailSerializer,
     ReservationSerializer,
     ReservationListSerializer,
+    SeatHoldSerializer,
 )
+from theatre.streaming import StreamingListModelMixin
 
 
 class ActorViewSet(
-    mixins.ListModelMixin,
+    QueryPlanMixin,
+    CachedListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet
 ):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
     permission_classes = (IsAdminOrIsAuthenticatedReadOnly,)
+    cache_models = (Actor,)
 
 
 class GenreViewSet(
+    QueryPlanMixin,
+    CachedListModelMixin,
+    CachedRetrieveModelMixin,
     viewsets.ModelViewSet
 ):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrIsAuthenticatedReadOnly,)
+    cache_models = (Genre, Play)
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -61,48 +103,78 @@ class GenreViewSet(
 
 
 class TheatreHallViewSet(
-    mixins.ListModelMixin,
+    QueryPlanMixin,
+    CachedListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet
 ):
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
     permission_classes = (IsAdminOrIsAuthenticatedReadOnly,)
+    cache_models = (TheatreHall,)
 
 
 class PlayViewSet(
-    mixins.ListModelMixin,
+    QueryPlanMixin,
+    CachedListModelMixin,
+    RowListModelMixin,
     mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
+    ConditionalRetrieveModelMixin,
     GenericViewSet
 ):
     queryset = Play.objects.all()
     serializer_class = PlaySerializer
     permission_classes = (IsAdminOrIsAuthenticatedReadOnly,)
+    pagination_class = PlayCursorPagination
+    cache_models = (Play, Genre, Actor)
+
+    def _params_in_int(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            return [int(obj_id) for obj_id in value.split(",")]
+        except ValueError:
+            raise ValidationError(
+                {name: [f"Expected comma separated ids, got '{value}'."]}
+            )
+
+    @property
+    def paginator(self):
+        """
+        Search results are ordered by rank, which cursors cannot follow,
+        so they are paged by offset instead.
+        """
+        if not hasattr(self, "_paginator"):
+            if self.request.query_params.get("search"):
+                self._paginator = OptionalCountLimitOffsetPagination()
+            else:
+                self._paginator = self.pagination_class()
 
-    @staticmethod
-    def _params_in_int(qs):
-        return [int(obj_id) for obj_id in qs.split(",")]
+        return self._paginator
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
+        search = self.request.query_params.get("search")
         title = self.request.query_params.get("title")
-        genres = self.request.query_params.get("genres")
-        actors = self.request.query_params.get("actors")
 
         if title:
             queryset = queryset.filter(title__icontains=title)
 
-        if genres:
-            genres_id = self._params_in_int(genres)
-            queryset = queryset.filter(genres__id__in=genres_id)
+        for relation in ("genres", "actors"):
+            any_ids = self._params_in_int(relation)
+            if any_ids:
+                queryset = filter_related(queryset, relation, any_ids)
 
-        if actors:
-            actors_id = self._params_in_int(actors)
-            queryset = queryset.filter(actors__id__in=actors_id)
+            all_ids = self._params_in_int(f"{relation}_all")
+            if all_ids:
+                queryset = filter_related(
+                    queryset, relation, all_ids, match_all=True
+                )
 
-        if self.action == "list":
-            queryset = queryset.prefetch_related("genres", "actors")
+        if search:
+            queryset = search_plays(queryset, search)
 
         return queryset
 
@@ -130,6 +202,14 @@ class PlayViewSet(
 
     @extend_schema(
         parameters=[
+            OpenApiParameter(
+                name="search",
+                type=str,
+                description=(
+                    "Search titles and descriptions, best match first "
+                    "(ex. ?search=hamlet)"
+                )
+            ),
             OpenApiParameter(
                 name="title",
                 type=str,
@@ -143,6 +223,16 @@ class PlayViewSet(
                 },
                 description="Filter by genres (ex. ?genres=1,2)"
             ),
+            OpenApiParameter(
+                name="genres_all",
+                type={
+                    "type": "list",
+                    "items": {"type": "number"}
+                },
+                description=(
+                    "Plays having all of the genres (ex. ?genres_all=1,2)"
+                )
+            ),
             OpenApiParameter(
                 name="actors",
                 type={
@@ -150,6 +240,16 @@ class PlayViewSet(
                     "items": {"type": "number"}
                 },
                 description="Filter by actors (ex. ?actors=1,2)"
+            ),
+            OpenApiParameter(
+                name="actors_all",
+                type={
+                    "type": "list",
+                    "items": {"type": "number"}
+                },
+                description=(
+                    "Plays having all of the actors (ex. ?actors_all=1,2)"
+                )
             )
         ]
     )
@@ -158,34 +258,44 @@ class PlayViewSet(
 
 
 class PerformanceViewSet(
+    QueryPlanMixin,
+    ConditionalListModelMixin,
+    ConditionalRetrieveModelMixin,
+    RowListModelMixin,
     viewsets.ModelViewSet
 ):
     queryset = Performance.objects.all()
     serializer_class = PerformanceSerializer
     permission_classes = (IsAdminOrIsAuthenticatedReadOnly,)
+    pagination_class = PerformanceCursorPagination
+    cache_models = (Performance, Play, Genre, Actor, TheatreHall)
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
 
         play = self.request.query_params.get("play")
         date = self.request.query_params.get("date")
 
         if play:
-            queryset = queryset.filter(play__id=play)
+            try:
+                queryset = queryset.filter(play__id=int(play))
+            except ValueError:
+                raise ValidationError(
+                    {"play": [f"Expected a play id, got '{play}'."]}
+                )
 
         if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
-
-        if self.action == "list":
-            queryset = (
-                Performance.objects.select_related("play", "theatre_hall")
-                .annotate(
-                    tickets_available=F("theatre_hall__rows")
-                    * F("theatre_hall__seats_in_row")
-                    - Count("tickets")
-
+            try:
+                day_start = timezone.make_aware(
+                    datetime.strptime(date, "%Y-%m-%d")
                 )
+            except ValueError:
+                raise ValidationError(
+                    {"date": [f"Expected a YYYY-MM-DD date, got '{date}'."]}
+                )
+            queryset = queryset.filter(
+                show_time__gte=day_start,
+                show_time__lt=day_start + timedelta(days=1)
             )
 
         return queryset
@@ -197,8 +307,48 @@ class PerformanceViewSet(
         if self.action == "retrieve":
             return PerformanceDetailSerializer
 
+        if self.action == "hold":
+            return SeatHoldSerializer
+
         return PerformanceSerializer
 
+    @action(
+        methods=["POST", "DELETE"],
+        detail=True,
+        url_path="hold",
+        permission_classes=(IsAuthenticated,)
+    )
+    def hold(self, request, pk=None):
+        """
+        Hold seats for ``SEAT_HOLD_MINUTES`` (POST) or release them
+        (DELETE). Booking held seats through reservations confirms them.
+        """
+        performance = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data,
+            context={
+                **self.get_serializer_context(),
+                "performance": performance
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        seats = [
+            (seat["row"], seat["seat"])
+            for seat in serializer.validated_data["seats"]
+        ]
+
+        if request.method == "DELETE":
+            release_seats(performance, request.user, seats)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer.validated_data["expires_at"] = hold_seats(
+            performance, request.user, seats
+        )
+        return Response(
+            serializer.to_representation(serializer.validated_data),
+            status=status.HTTP_201_CREATED
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -217,27 +367,40 @@ class PerformanceViewSet(
         return super().list(request, *args, **kwargs)
 
 
-class TicketViewsSet(viewsets.ModelViewSet):
+class TicketViewsSet(
+    QueryPlanMixin,
+    ConditionalListModelMixin,
+    ConditionalRetrieveModelMixin,
+    StreamingListModelMixin,
+    viewsets.ModelViewSet
+):
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
     permission_classes = (IsAdminOrIsAuthenticatedReadOnly,)
+    renderer_classes = (StreamingJSONRenderer, BrowsableAPIRenderer)
+    cache_models = (Ticket,)
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(
+    QueryPlanMixin,
+    ConditionalListModelMixin,
+    ConditionalRetrieveModelMixin,
+    RowListModelMixin,
+    viewsets.ModelViewSet
+):
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = ReservationCursorPagination
+    cache_models = (Reservation, Ticket, Performance, Play, TheatreHall)
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
 
-        if self.action == "list":
-            queryset = queryset.prefetch_related(
-                "tickets__performance__theatre_hall",
-                "tickets__performance__play"
-            )
-
-        return queryset
+    def get_throttles(self):
+        if self.action == "create":
+            self.throttle_scope = "reservation"
+        return super().get_throttles()
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -247,3 +410,100 @@ class ReservationViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class CacheStatsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(cache.get_stats())
+
+
+class MetricsView(APIView):
+    """
+    Request histograms of the worker process that answers (see
+    theatre.instrumentation), as JSON or, with ?format=prometheus, as
+    Prometheus text labelled with its pid.
+    """
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (FastJSONRenderer, PrometheusRenderer)
+
+    def get(self, request):
+        return Response(instrumentation.snapshot())
+
+
+class BulkImportView(APIView):
+    """
+    Import a CSV or JSONL file of actors, halls, plays or performances,
+    see ``theatre.importer``. A failed import reports how many records
+    are committed; send the file again with that ``skip`` to resume.
+    """
+
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+    serializer_class = BulkImportSerializer
+
+    def post(self, request, kind):
+        if kind not in SeasonImporter.kinds:
+            raise NotFound(f"Unknown kind, use one of {SeasonImporter.kinds}")
+
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["upload"]
+        done = skip = serializer.validated_data["skip"]
+        lines = io.TextIOWrapper(
+            upload.file, encoding="utf-8-sig", newline=""
+        )
+
+        try:
+            for done in SeasonImporter(kind).import_records(
+                read_records(lines, serializer.validated_data["file_format"]),
+                skip=skip
+            ):
+                pass
+        except (ValueError, csv.Error) as error:
+            return Response(
+                {"detail": str(error), "imported": done},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {"kind": kind, "imported": done}, status=status.HTTP_201_CREATED
+        )
+
+
+class TicketExportView(APIView):
+    """
+    Stream every ticket of performances shown between ``date_from`` and
+    ``date_to`` as a file, see ``theatre.exporter``.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = TicketExportSerializer
+
+    @extend_schema(
+        parameters=[TicketExportSerializer],
+        responses={(200, "application/octet-stream"): OpenApiTypes.BINARY},
+    )
+    def get(self, request):
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        file_format = options["file_format"]
+
+        chunks = export_tickets(
+            file_format, options.get("date_from"), options.get("date_to")
+        )
+        extension = "csv" if file_format == "csv" else "jsonl"
+        content_type = CONTENT_TYPES[file_format]
+        if options["gzip"]:
+            chunks = gzip_chunks(chunks)
+            extension += ".gz"
+            content_type = "application/gzip"
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="tickets.{extension}"'
+        )
+        return response
@@ -3,6 +3,10 @@ ASGI config for theatre_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+It defaults to the ASGI deployment profile, theatre_api.settings_asgi:
+
+    uvicorn theatre_api.asgi:application --workers 1
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -11,6 +15,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api.settings_asgi")
 
 application = get_asgi_application()
+
+from theatre.checks import warn_at_startup  # noqa: E402
+
+warn_at_startup()
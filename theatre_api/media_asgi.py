@@ -0,0 +1,15 @@
+"""
+Standalone ASGI application serving uploaded media, see theatre.media.
+
+Run it next to the API so that no API worker sends image bytes, e.g.
+``uvicorn theatre_api.media_asgi:application --port 8001`` behind a
+proxy routing MEDIA_URL to it.
+"""
+
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api.settings")
+
+from theatre.media import MediaApp  # noqa: E402
+
+application = MediaApp()
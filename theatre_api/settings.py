@@ -27,8 +27,11 @@ load_dotenv()
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
 
+# "development" or "production" (see the end of this file).
+DJANGO_PROFILE = os.getenv("DJANGO_PROFILE", "development")
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = DJANGO_PROFILE != "production"
 
 ALLOWED_HOSTS = []
 
@@ -46,8 +49,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
-    "debug_toolbar",
     "drf_spectacular",
     "theatre",
     "user"
@@ -55,8 +58,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    "theatre.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -65,6 +68,19 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# The debug toolbar is for development only.
+if DEBUG:
+    INSTALLED_APPS.insert(
+        INSTALLED_APPS.index("rest_framework") + 1, "debug_toolbar"
+    )
+    MIDDLEWARE.insert(2, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+# Share of requests measured by theatre.instrumentation (Server-Timing
+# header, histograms at /api/theatre/metrics/).
+THEATRE_INSTRUMENTATION_SAMPLE_RATE = float(
+    os.getenv("THEATRE_INSTRUMENTATION_SAMPLE_RATE", "0.01")
+)
+
 ROOT_URLCONF = "theatre_api.urls"
 
 TEMPLATES = [
@@ -100,6 +116,49 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory is per process; with several workers point the cache at a
+# shared backend, e.g. FileBasedCache with a directory or RedisCache with
+# a redis:// URL (requires the redis package). The production profile
+# refuses to start with the response cache in local memory.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "DJANGO_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
+THEATRE_RESPONSE_CACHE_ALIAS = "default"
+THEATRE_RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+# Serve the hot read endpoints with async views (theatre.async_views).
+# Only worth it under ASGI, see theatre_api/settings_asgi.py.
+THEATRE_ASYNC_READS = False
+
+
+# Seat holds
+# How long POST /api/theatre/performances/<id>/hold/ keeps seats for a
+# customer before anyone else may hold or book them.
+SEAT_HOLD_MINUTES = 10
+
+
+# Play images
+# WebP variants made by `python manage.py process_images` for every
+# uploaded play image: name -> longest side in pixels (None: full size).
+PLAY_IMAGE_VARIANTS = {
+    "thumbnail": 320,
+    "medium": 960,
+    "full": None,
+}
+PLAY_IMAGE_WEBP_QUALITY = 80
+PLAY_IMAGE_MAX_ATTEMPTS = 3
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -120,6 +179,32 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "user.User"
 
+# Password hashing profile: "scrypt", "argon2" (pip install argon2-cffi)
+# or "pbkdf2". Passwords hashed by the other profiles still verify and
+# are rehashed with the chosen one on the next login (see user.hashers).
+PASSWORD_HASHING_PROFILE = os.getenv("PASSWORD_HASHING_PROFILE", "scrypt")
+PASSWORD_HASHING_PROFILES = {
+    "scrypt": "user.hashers.ScryptPasswordHasher",
+    "argon2": "user.hashers.Argon2PasswordHasher",
+    "pbkdf2": "user.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    PASSWORD_HASHING_PROFILES[PASSWORD_HASHING_PROFILE],
+    *(
+        hasher for profile, hasher in PASSWORD_HASHING_PROFILES.items()
+        if profile != PASSWORD_HASHING_PROFILE
+    ),
+]
+PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 14
+PASSWORD_SCRYPT_BLOCK_SIZE = 8
+PASSWORD_ARGON2_TIME_COST = 2
+PASSWORD_ARGON2_MEMORY_COST = 64 * 1024  # KiB
+PASSWORD_ARGON2_PARALLELISM = 1
+# Threads per process that hash passwords; about the cores of the host
+# divided by the worker processes.
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", "2"))
+PASSWORD_HASHING_TIMEOUT = 10
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -141,6 +226,15 @@ STATIC_URL = "static/"
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
+# How media is sent: "django" (the worker sends the file, for
+# development), "x-accel-redirect" (nginx sends MEDIA_ACCEL_PREFIX + path
+# from an internal location aliased to MEDIA_ROOT) or "x-sendfile"
+# (Apache/lighttpd). In production prefer the standalone ASGI media app,
+# theatre_api.media_asgi:application, or the web server itself.
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+MEDIA_CACHE_CONTROL = "public, max-age=3600"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -148,21 +242,34 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "theatre.pagination.OptionalCountLimitOffsetPagination",
     "PAGE_SIZE": 10,
+    "DEFAULT_RENDERER_CLASSES": (
+        "theatre.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "theatre.throttling.AnonSlidingThrottle",
+        "theatre.throttling.UserSlidingThrottle",
+        "theatre.throttling.ScopedSlidingThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/day",
-        "user": "1000/day"
+        "user": "1000/day",
+        "reservation": "30/minute",
     }
 }
 
+# Throttle counters (theatre.throttling) are kept in this cache, which
+# must be redis or memcached to limit all workers together. Without such
+# a cache, THEATRE_THROTTLE_DB can name a SQLite file for the counters,
+# shared by the workers of one host but written on every request.
+THEATRE_THROTTLE_CACHE_ALIAS = "default"
+THEATRE_THROTTLE_DB = os.getenv("THEATRE_THROTTLE_DB", "")
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Your Project API",
     "DESCRIPTION": "Your project description",
@@ -179,4 +286,43 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
 }
+
+# Users changed within ACCESS_TOKEN_LIFETIME that every process remembers,
+# to refuse their outdated access tokens (see user.authentication).
+JWT_CHANGED_USERS = 10000
+
+# Production profile: persistent database connections that are checked
+# before reuse, cached templates and no query logging. theatre.checks
+# warns at startup about settings that cost performance in production.
+if DJANGO_PROFILE == "production":
+    ALLOWED_HOSTS = [
+        host.strip()
+        for host in os.getenv("DJANGO_ALLOWED_HOSTS", "").split(",")
+        if host.strip()
+    ]
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.getenv("DJANGO_CONN_MAX_AGE", "60")
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        ),
+    ]
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": {"console": {"class": "logging.StreamHandler"}},
+        "root": {"handlers": ["console"], "level": "WARNING"},
+        "loggers": {
+            "django.db.backends": {"level": "WARNING"},
+        },
+    }
@@ -0,0 +1,24 @@
+"""
+ASGI deployment profile: ``theatre_api.asgi:application`` under uvicorn.
+
+Read endpoints with async views (see theatre.async_views) keep one
+worker process responsive to many concurrent slow clients.
+"""
+from theatre_api.settings import *  # noqa: F401,F403
+from theatre_api.settings import DATABASES, INSTALLED_APPS, MIDDLEWARE
+
+# The hot read endpoints run on the event loop.
+THEATRE_ASYNC_READS = True
+
+# The debug toolbar middleware is sync only and would push every request
+# back onto the sync thread.
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware != "debug_toolbar.middleware.DebugToolbarMiddleware"
+]
+
+# Persistent connections are per thread and async views hop threads, so
+# under ASGI they pile up instead of being reused; use a pooler such as
+# PgBouncer instead.
+DATABASES["default"]["CONN_MAX_AGE"] = 0
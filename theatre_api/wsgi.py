@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api.settings")
 
 application = get_wsgi_application()
+
+from theatre.checks import warn_at_startup  # noqa: E402
+
+warn_at_startup()
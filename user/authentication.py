@@ -0,0 +1,118 @@
+"""
+JWT authentication without a user lookup per request.
+
+Access tokens issued by ``/api/user/token/`` carry the user's
+``is_staff`` and ``token_version`` next to ``user_id``.
+``StatelessJWTAuthentication`` builds a ``TokenUser`` from those claims,
+which is all the permissions need, instead of reading the user row on
+every call.
+
+A token stays valid until it expires, so changes to users are tracked in
+a small in-process LRU (``JWT_CHANGED_USERS``): saving a user (through
+``/api/user/me/``, the admin, or anything else) records its current
+version, staff flag and whether it is active, and deleting it revokes
+it. Tokens of a recorded user with another version (the password
+changed) or of an inactive user are refused, and ``is_staff`` comes
+from the record. Other processes learn about a change only when the
+token is refreshed, which reloads the user; keep
+``ACCESS_TOKEN_LIFETIME`` short accordingly.
+
+Tokens without a ``token_version`` claim (issued before this mode) are
+authenticated against the database as before.
+"""
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.models import TokenUser
+
+IS_STAFF_CLAIM = "is_staff"
+TOKEN_VERSION_CLAIM = "token_version"
+
+
+class UserState(NamedTuple):
+    token_version: int
+    is_staff: bool
+    is_active: bool
+
+
+_changed_users = OrderedDict()
+_lock = threading.Lock()
+
+
+def remember_user(user, deleted: bool = False) -> None:
+    """Record the current state of a changed or deleted ``user``."""
+    state = UserState(
+        user.token_version, user.is_staff, user.is_active and not deleted
+    )
+    with _lock:
+        _changed_users[user.pk] = state
+        _changed_users.move_to_end(user.pk)
+        while len(_changed_users) > settings.JWT_CHANGED_USERS:
+            _changed_users.popitem(last=False)
+
+
+def changed_user(user_id):
+    """Return the recorded ``UserState`` of ``user_id``, or None."""
+    with _lock:
+        state = _changed_users.get(user_id)
+        if state is not None:
+            _changed_users.move_to_end(user_id)
+    return state
+
+
+def clear_changed_users() -> None:
+    with _lock:
+        _changed_users.clear()
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[IS_STAFF_CLAIM] = user.is_staff
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def is_stateless(self, validated_token) -> bool:
+        return TOKEN_VERSION_CLAIM in validated_token
+
+    def get_user(self, validated_token):
+        if not self.is_stateless(validated_token):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        token_version = validated_token[TOKEN_VERSION_CLAIM]
+        is_staff = bool(validated_token.get(IS_STAFF_CLAIM, False))
+        state = changed_user(user_id)
+        if state is not None:
+            if not state.is_active or state.token_version != token_version:
+                raise AuthenticationFailed(
+                    _("Token is no longer valid"), code="token_revoked"
+                )
+            is_staff = state.is_staff
+
+        return TokenUser(
+            **{jwt_settings.USER_ID_FIELD: user_id},
+            is_staff=is_staff,
+            is_active=True,
+            token_version=token_version
+        )
@@ -0,0 +1,110 @@
+"""
+Password hashers of the hashing profiles (``PASSWORD_HASHING_PROFILE``).
+
+The costs of scrypt and Argon2 come from the ``PASSWORD_SCRYPT_*`` and
+``PASSWORD_ARGON2_*`` settings. A password hashed by another profile or
+with other costs is rehashed by ``User.check_password`` on the next
+successful login.
+
+Hashes are computed in a process-wide pool of
+``PASSWORD_HASHING_WORKERS`` threads (scrypt, Argon2 and PBKDF2 release
+the GIL), so signup bursts and credential stuffing keep at most that
+many cores busy however many requests are in flight. A request that
+waits longer than ``PASSWORD_HASHING_TIMEOUT`` seconds for a worker is
+answered with 503 instead of queueing up.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many password checks in progress, try again later."
+    default_code = "password_hashing_busy"
+
+
+_local = threading.local()
+_lock = threading.Lock()
+_pool = None
+
+
+def _mark_worker():
+    _local.in_pool = True
+
+
+def get_pool():
+    """Return ``(executor, slots)`` for the configured number of workers."""
+    global _pool
+    workers = settings.PASSWORD_HASHING_WORKERS
+    with _lock:
+        if _pool is None or _pool[0] != workers:
+            _pool = (
+                workers,
+                ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="password-hashing",
+                    initializer=_mark_worker
+                ),
+                threading.BoundedSemaphore(workers),
+            )
+        return _pool[1:]
+
+
+def run(func, *args, **kwargs):
+    """Call ``func`` in the hashing pool and return its result."""
+    if getattr(_local, "in_pool", False):
+        return func(*args, **kwargs)
+
+    executor, slots = get_pool()
+    if not slots.acquire(timeout=settings.PASSWORD_HASHING_TIMEOUT):
+        raise PasswordHashingBusy()
+    try:
+        return executor.submit(func, *args, **kwargs).result()
+    finally:
+        slots.release()
+
+
+class PooledHasherMixin:
+    def encode(self, *args, **kwargs):
+        return run(super().encode, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return run(super().verify, password, encoded)
+
+
+class ScryptPasswordHasher(PooledHasherMixin, hashers.ScryptPasswordHasher):
+    # An upper bound only: OpenSSL refuses more than 32 MiB by default.
+    maxmem = 2 ** 30
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+
+class Argon2PasswordHasher(PooledHasherMixin, hashers.Argon2PasswordHasher):
+    """Argon2id, needs ``pip install argon2-cffi``."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class PBKDF2PasswordHasher(PooledHasherMixin, hashers.PBKDF2PasswordHasher):
+    pass
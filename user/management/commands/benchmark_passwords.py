@@ -0,0 +1,140 @@
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from user.views import CreateUserView
+
+PASSWORD = "benchmark-password-1"
+# Profiles whose hasher needs a package that may be missing.
+REQUIRED_MODULES = {"argon2": "argon2"}
+
+
+def hashers_for(profile: str) -> list:
+    """``PASSWORD_HASHERS`` preferring the hasher of ``profile``."""
+    preferred = settings.PASSWORD_HASHING_PROFILES[profile]
+    return [preferred] + [
+        hasher for hasher in settings.PASSWORD_HASHING_PROFILES.values()
+        if hasher != preferred
+    ]
+
+
+def per_second(count: int, elapsed: float) -> float:
+    return round(count / elapsed, 1)
+
+
+class Command(BaseCommand):
+    """
+    Measure signup and login throughput of every password hashing
+    profile in a throwaway test database, through the real views
+    (without throttling). Requests run one at a time, so the rates are
+    per core; --threads adds the rate of raw hashing in that many
+    threads to show how the hashing pool scales.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            choices=sorted(settings.PASSWORD_HASHING_PROFILES),
+            help="Profile to measure, repeatable (default: all installed)"
+        )
+        parser.add_argument("--requests", type=int, default=20)
+        parser.add_argument(
+            "--threads", type=int, default=os.cpu_count() or 1
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profile"] or [
+            profile for profile in settings.PASSWORD_HASHING_PROFILES
+            if importlib.util.find_spec(
+                REQUIRED_MODULES.get(profile, "hashlib")
+            )
+        ]
+
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            report = {
+                "cpu_count": os.cpu_count(),
+                "threads": options["threads"],
+                "profiles": {
+                    profile: self.measure(profile, options)
+                    for profile in profiles
+                },
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, profile: str, options) -> dict:
+        factory = APIRequestFactory()
+        signup = CreateUserView.as_view(throttle_classes=())
+        login = TokenObtainPairView.as_view(throttle_classes=())
+        count = options["requests"]
+        emails = [f"{profile}-{index}@example.com" for index in range(count)]
+
+        with override_settings(
+            PASSWORD_HASHERS=hashers_for(profile),
+            PASSWORD_HASHING_WORKERS=max(options["threads"], 1)
+        ):
+            started = time.perf_counter()
+            for email in emails:
+                self.expect(
+                    signup(
+                        factory.post(
+                            "/", {"email": email, "password": PASSWORD}
+                        )
+                    ),
+                    status.HTTP_201_CREATED
+                )
+            signup_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for email in emails:
+                self.expect(
+                    login(
+                        factory.post(
+                            "/", {"email": email, "password": PASSWORD}
+                        )
+                    ),
+                    status.HTTP_200_OK
+                )
+            login_elapsed = time.perf_counter() - started
+
+            hashes = count * options["threads"]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options["threads"]) as executor:
+                list(executor.map(make_password, [PASSWORD] * hashes))
+            hash_elapsed = time.perf_counter() - started
+
+        return {
+            "signups_per_second": per_second(count, signup_elapsed),
+            "logins_per_second": per_second(count, login_elapsed),
+            "threaded_hashes_per_second": per_second(hashes, hash_elapsed),
+        }
+
+    @staticmethod
+    def expect(response, expected: int) -> None:
+        if response.status_code != expected:
+            raise CommandError(
+                f"Expected {expected}, got {response.status_code}: "
+                f"{response.data}"
+            )
@@ -1,4 +1,5 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils.translation import gettext as _
@@ -45,8 +46,41 @@ class UserManager(BaseUserManager):
 class User(AbstractUser):
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    # Stamped into access tokens, which stop working when it changes.
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        self.token_version += 1
+
+    def check_password(self, raw_password):
+        def upgrade(raw_password):
+            # A new hash of the same password keeps issued tokens valid.
+            self.password = make_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return check_password(raw_password, self.password, upgrade)
+
+
+class TokenUser(User):
+    """
+    A user built from the claims of an access token, without reading its
+    row; see ``user.authentication.StatelessJWTAuthentication``. Only
+    ``id``, ``is_staff`` and ``token_version`` are known, so it can be
+    compared and assigned to foreign keys but never saved.
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise NotImplementedError("Token users are never saved")
+
+    def delete(self, *args, **kwargs):
+        raise NotImplementedError("Token users are never deleted")
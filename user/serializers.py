@@ -1,6 +1,15 @@
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext as _
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from user.authentication import (
+    IS_STAFF_CLAIM,
+    TOKEN_VERSION_CLAIM,
+    ClaimsRefreshToken,
+)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -60,3 +69,40 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh against the user row: refuse refresh tokens of inactive or
+    deleted users and of older token versions, and stamp the current
+    ``is_staff`` into the new access token.
+    """
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh[jwt_settings.USER_ID_CLAIM]
+        user = get_user_model().objects.filter(
+            **{jwt_settings.USER_ID_FIELD: user_id}, is_active=True
+        ).first()
+        if user is None or refresh.get(
+            TOKEN_VERSION_CLAIM, user.token_version
+        ) != user.token_version:
+            raise InvalidToken(_("Token is no longer valid"))
+
+        refresh[IS_STAFF_CLAIM] = user.is_staff
+        refresh[TOKEN_VERSION_CLAIM] = user.token_version
+        data = {"access": str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
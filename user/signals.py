@@ -0,0 +1,16 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import remember_user
+
+
+@receiver(post_save, sender=get_user_model())
+def remember_changed_user(sender, instance, created, **kwargs):
+    if not created:
+        remember_user(instance)
+
+
+@receiver(post_delete, sender=get_user_model())
+def revoke_deleted_user(sender, instance, **kwargs):
+    remember_user(instance, deleted=True)
@@ -1,3 +1,215 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from theatre.models import Reservation
+from theatre.tests.test_reservation_api import (
+    sample_performance,
+    tickets_payload,
+)
+from user import hashers
+from user.authentication import (
+    StatelessJWTAuthentication,
+    clear_changed_users,
+)
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+ME_URL = reverse("user:manage")
+RESERVATION_URL = reverse("theatre-api:reservation-list")
+
+
+class StatelessJWTAuthenticationTest(TestCase):
+    def setUp(self) -> None:
+        clear_changed_users()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.tokens = self.obtain_tokens()
+
+    def obtain_tokens(self, password="test12345pass"):
+        res = self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": password}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def authenticate(self, access_token):
+        request = RequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {access_token}"
+        )
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def test_authenticates_from_claims_without_queries(self):
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(self.tokens["access"])
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.is_authenticated)
+        self.assertTrue(user.is_staff)
+
+    def test_token_user_is_usable_as_foreign_key(self):
+        performance = sample_performance()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {"tickets": tickets_payload(performance, 2)},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.get().user, self.user)
+
+    def test_password_change_revokes_tokens(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+        res = self.client.patch(ME_URL, {"password": "new12345pass"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        res = self.client.post(
+            REFRESH_URL, {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        tokens = self.obtain_tokens("new12345pass")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {tokens['access']}"
+        )
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+    def test_changed_staff_flag_overrides_claim(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        user, _ = self.authenticate(self.tokens["access"])
+
+        self.assertFalse(user.is_staff)
+
+    def test_refresh_stamps_current_staff_flag(self):
+        self.user.is_staff = False
+        self.user.save()
+        clear_changed_users()
+
+        res = self.client.post(
+            REFRESH_URL, {"refresh": self.tokens["refresh"]}
+        )
+        user, _ = self.authenticate(res.data["access"])
+
+        self.assertFalse(user.is_staff)
+
+    def test_deactivated_and_deleted_users_are_refused(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(
+            self.client.get(
+                ME_URL, HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+            ).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+        clear_changed_users()
+        self.user.delete()
+        self.assertEqual(
+            self.client.get(
+                ME_URL, HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+            ).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_tokens_without_claims_are_checked_against_database(self):
+        access_token = RefreshToken.for_user(self.user).access_token
+
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(access_token)
+
+        self.assertEqual(user, self.user)
+
+
+class PasswordHashingTest(TestCase):
+    def setUp(self) -> None:
+        clear_changed_users()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345pass"
+        )
+        self.client = APIClient()
+
+    def login(self):
+        return self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": "test12345pass"}
+        )
+
+    def test_new_passwords_use_profile_hasher(self):
+        self.assertTrue(self.user.password.startswith("scrypt$16384$"))
+
+    def test_login_upgrades_old_hash_and_keeps_tokens(self):
+        with override_settings(
+            PASSWORD_HASHERS=["user.hashers.PBKDF2PasswordHasher"]
+        ):
+            pbkdf2_hash = make_password("test12345pass")
+        get_user_model().objects.filter(id=self.user.id).update(
+            password=pbkdf2_hash
+        )
+        access_token = RefreshToken.for_user(self.user).access_token
+
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$"))
+        self.assertEqual(self.user.token_version, 1)
+        self.assertEqual(
+            self.client.get(
+                ME_URL, HTTP_AUTHORIZATION=f"Bearer {access_token}"
+            ).status_code,
+            status.HTTP_200_OK
+        )
+
+    def test_login_upgrades_hash_cost(self):
+        with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 12):
+            self.user.set_password("test12345pass")
+            self.user.save()
+        self.assertTrue(self.user.password.startswith("scrypt$4096$"))
+
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$16384$"))
+
+    def test_busy_hashing_pool_answers_503(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def occupy():
+            started.set()
+            release.wait()
+
+        with override_settings(
+            PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_TIMEOUT=0.01
+        ):
+            occupier = threading.Thread(target=hashers.run, args=(occupy,))
+            occupier.start()
+            started.wait()
+            try:
+                res = self.login()
+            finally:
+                release.set()
+                occupier.join()
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)